@@ -1,3 +1,13 @@
 from .clients import ToolKitClient, LLMClient
+from .async_clients import AsyncLLMClient, AsyncToolKitClient
+from .cache import RegistrationCache
+from .openapi import OpenAPIToolkit
+from .sessions import (
+    CachedSessionStore,
+    InMemorySessionStore,
+    RedisSessionStore,
+    SessionStore,
+    SQLiteSessionStore,
+)
 
 __version__ = "0.2.3"
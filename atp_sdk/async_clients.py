@@ -0,0 +1,788 @@
+"""
+AsyncToolKitClient and AsyncLLMClient
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from atp_ui.utils import to_json
+
+from .clients import HTTPException, LLMClient, ToolKitClient, WebSocketException
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError(
+            "The asyncio clients require aiohttp. Install it with: pip install AgentToolProtocol[async]"
+        )
+
+
+class _LoopWebSocket:
+    """
+    Adapter exposing websocket-client's blocking `send` on top of an aiohttp WebSocket,
+    so the ToolKitClient handlers can reply from worker threads.
+    """
+    def __init__(self, ws, loop):
+        self.ws = ws
+        self.loop = loop
+
+    def send(self, message):
+        _run_on_loop(self.ws.send_str(message), self.loop)
+
+
+def _run_on_loop(coro, loop, timeout=30):
+    """
+    Run `coro` on `loop` from any thread. From a worker thread this waits for the
+    result; on the loop thread itself it only schedules the coroutine.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(coro)
+        return None
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=timeout)
+
+
+class AsyncToolKitClient(ToolKitClient):
+    """
+    AsyncToolKitClient runs the whole ToolKitClient transport on one asyncio event loop:
+    WebSocket receive/send, inbox polling and idle watching. Files are watched by the
+    shared FileWatcher thread (inotify where available), whose change events are handed to
+    the loop; batched inbox results, queue timeouts and reload debouncing still use the
+    same helper threads as ToolKitClient.
+
+    Tools are registered exactly as with ToolKitClient. `async def` tools run directly on
+    the loop; plain functions run on the client's executor. Use `await client.serve()` to
+    embed the toolkit in an existing async application (FastAPI, aiohttp, ...), or
+    `client.start()` to run it standalone.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize the AsyncToolKitClient. Accepts the same arguments as ToolKitClient.
+        """
+        super().__init__(*args, **kwargs)
+        if self._reused_by_reload():
+            return
+        self.aio_session = None  # aiohttp session for the transport; self.session serves registration
+        self._tasks = []
+        if self.file_watcher:
+            self.file_watcher.callback = self._on_file_event
+
+    def start(self):
+        """
+        Run the client until it is stopped or interrupted.
+        """
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            logger.info("WebSocket connection stopped.")
+
+    async def serve(self):
+        """
+        Serve tool requests on the running event loop until `stop()` is called.
+        """
+        _require_aiohttp()
+        self.loop = asyncio.get_running_loop()
+        self.running = True
+        self.last_activity_time = time.time()
+        self.aio_session = aiohttp.ClientSession(
+            json_serialize=to_json  # reuses the cached JSON of atp_ui components
+        )
+        self._ensure_executor()
+        if self.inbox_batcher:
+            self.inbox_batcher.open()
+        if self._registration_pending:
+            await self.loop.run_in_executor(None, self.register_toolkit)
+        self._resume_queue_reaper()
+
+        if self.protocol.startswith("http"):
+            transport = self._poll_inbox_loop_async()
+        else:
+            transport = self._run_ws_loop_async()
+        self._tasks = [asyncio.ensure_future(transport), asyncio.ensure_future(self._watch_idle_async())]
+        if self.file_watcher:
+            self.file_watcher.start()
+
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.running = False
+            self._stop_queue_reaper()
+            if self.file_watcher:
+                await self.loop.run_in_executor(None, self.file_watcher.stop)
+            if self.inbox_batcher:
+                # The flush thread sends through this loop, so the final flush happens here
+                self.inbox_batcher.close(flush=False)
+                pending = self.inbox_batcher.drain()
+                for start in range(0, len(pending), self.inbox_batcher.max_batch):
+                    await self._send_tool_results_inbox_batch_async(
+                        pending[start : start + self.inbox_batcher.max_batch]
+                    )
+            await self.aio_session.close()
+            self.aio_session = None
+            self._shutdown_executor()
+            logger.info("WebSocket connection stopped.")
+
+    def stop(self):
+        """
+        Stop serving. Safe to call from any thread.
+        """
+        self.running = False
+        if self.loop is None or self.loop.is_closed():
+            return
+        for task in self._tasks:
+            self.loop.call_soon_threadsafe(task.cancel)
+
+    def _ws_url(self):
+        if self.base_url.startswith("https://"):
+            ws_url = self.base_url.replace("https://", "wss://")
+        else:
+            ws_url = self.base_url.replace("http://", "ws://")
+        return f"{ws_url}/ws/v1/atp/toolkit-client/{self.api_key}/"
+
+    async def _run_ws_loop_async(self):
+        url = self._ws_url()
+        while self.running:
+            try:
+                logger.info(f"Connecting to: {url}")
+                async with self.aio_session.ws_connect(url, heartbeat=30) as ws:
+                    logger.info("WebSocket connection established.")
+                    adapter = _LoopWebSocket(ws, self.loop)
+                    self.ws = adapter  # lets session evictions reach the server
+                    try:
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._handle_ws_message(adapter, msg.data)
+                            elif msg.type == aiohttp.WSMsgType.ERROR:
+                                logger.error(f"WebSocket error: {ws.exception()}")
+                                break
+                    finally:
+                        self.ws = None
+                logger.warning("WebSocket disconnected. Reconnecting in 5 seconds...")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Exception in WebSocket task")
+            await asyncio.sleep(5)  # delay before trying again
+
+    def _handle_ws_message(self, ws, message):
+        """
+        Route an incoming frame. Tool requests and app messages are both handed to the
+        worker pool by `on_message`, so the loop is never blocked by user code.
+        """
+        self.on_message(ws, message)
+
+    async def _poll_inbox_async(self):
+        """
+        Claim up to `inbox_batch_size` pending requests in one inbox poll.
+
+        Returns:
+            list: The claimed requests, empty when the inbox is empty.
+        """
+        url = f"{self.base_url}/api/v1/toolkit/{self.api_key}/inbox"
+        params = {"limit": self.inbox_batch_size}
+        if self.inbox_wait:
+            params["wait"] = self.inbox_wait
+        timeout = aiohttp.ClientTimeout(total=(self.inbox_wait or 0) + 30)
+        try:
+            async with self.aio_session.get(url, params=params, timeout=timeout) as resp:
+                text = await resp.text()
+                if resp.status != 200:
+                    logger.warning(f"Inbox poll failed: status={resp.status}, response={text}")
+                    return []
+                return self._normalize_inbox_batch(json.loads(text) if text else None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"Error polling inbox: {e}")
+            return []
+
+    async def _send_tool_result_inbox_async(self, request_id, result):
+        url = f"{self.base_url}/api/v1/toolkit/{self.api_key}/inbox/respond"
+        payload = {"request_id": request_id, "response": result}
+        try:
+            async with self.aio_session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+                if resp.status >= 400:
+                    logger.error(f"Error sending result to inbox: {resp.status} {await resp.text()}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error sending result to inbox: {e}")
+
+    async def _send_tool_results_inbox_batch_async(self, responses):
+        if self._inbox_batch_supported:
+            url = f"{self.base_url}/api/v1/toolkit/{self.api_key}/inbox/respond/batch"
+            try:
+                async with self.aio_session.post(
+                    url, json={"responses": responses}, timeout=aiohttp.ClientTimeout(total=30)
+                ) as resp:
+                    if resp.status in (404, 405):
+                        logger.info(
+                            "Server does not support batched inbox responses, sending them one by one"
+                        )
+                        self._inbox_batch_supported = False
+                    elif resp.status < 400:
+                        return
+                    else:
+                        logger.error(
+                            f"Error sending batched results to inbox: {resp.status} {await resp.text()}"
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Error sending batched results to inbox: {e}")
+
+        await asyncio.gather(
+            *(
+                self._send_tool_result_inbox_async(item["request_id"], item["response"])
+                for item in responses
+            )
+        )
+
+    def _send_tool_results_inbox_batch(self, responses):
+        """Flush a batch of inbox results through the loop's HTTP session."""
+        _run_on_loop(self._send_tool_results_inbox_batch_async(responses), self.loop, timeout=60)
+
+    def _respond_inbox(self, request_id, result):
+        """Send an inbox result through the loop's HTTP session; callable from any thread."""
+        if self.inbox_batcher:
+            self.inbox_batcher.add(request_id, result)
+        else:
+            _run_on_loop(self._send_tool_result_inbox_async(request_id, result), self.loop, timeout=60)
+
+    async def _poll_inbox_loop_async(self):
+        logger.info("Starting inbox polling loop")
+        while self.running:
+            try:
+                started = time.monotonic()
+                batch = await self._poll_inbox_async()
+                if batch:
+                    self.last_activity_time = time.time()
+                    for req in batch:
+                        self._handle_inbox_request(req)
+                delay = self._next_inbox_poll_delay(bool(batch), time.monotonic() - started)
+                if delay:
+                    await asyncio.sleep(delay)
+            except asyncio.CancelledError:  # an Exception subclass before Python 3.8
+                raise
+            except Exception as e:
+                logger.error(f"Inbox polling loop error: {e}", exc_info=True)
+                await asyncio.sleep(self.max_poll_interval)  # Wait longer after an error
+
+    async def _watch_idle_async(self):
+        while self.running:
+            self.active_app_sessions.evict_expired()
+            if time.time() - self.last_activity_time > self.idle_timeout:
+                logger.info("WebSocket idle timeout reached. Closing connection...")
+                self.stop()
+                break
+            await asyncio.sleep(10)  # Check every 10 seconds
+
+    def _on_file_event(self, file_path):
+        """FileWatcher callback, called on the watcher thread: hand the change to the loop."""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._on_code_change, file_path)
+        except RuntimeError:  # the loop closed in between
+            pass
+
+
+class AsyncLLMClient(LLMClient):
+    """
+    AsyncLLMClient is the asyncio counterpart of LLMClient, with the same methods as coroutines.
+
+    Over WebSocket every request is correlated by its request_id with a future that the
+    reader task resolves, so any number of requests can be in flight on one connection.
+    Use it as an async context manager, or call `close()` when done.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        protocol: str = "https",
+        base_url: str = "https://api.chat-atp.com",
+        idle_timeout: int = 300,
+        max_parallel_calls: int = 8,
+    ):
+        """
+        Initialize the AsyncLLMClient. The connection is opened on first use.
+
+        Args:
+            api_key (str): ATP API key for authentication.
+            protocol (str): Connection protocol. Options: "ws", "wss", "http", "https".
+                          Defaults to "https".
+            base_url (str): Server URL. Defaults to "https://api.chat-atp.com".
+            idle_timeout (int): Idle timeout in seconds. Defaults to 300.
+            max_parallel_calls (int): Maximum number of HTTP tool calls in flight at once for
+                          a non-sequential `call_tool`. Defaults to 8; 1 disables fan-out.
+        """
+        _require_aiohttp()
+        super().__init__(api_key, protocol, base_url, idle_timeout, max_parallel_calls=max_parallel_calls)
+
+        self.aio_session = None  # aiohttp session; `self.session` is the requests session on LLMClient
+        self._reader_task = None
+        self._connect_lock = None
+        self._auth_future = None
+        # {request_id: future} of the current connection; each connection gets a new map so
+        # a closing reader only fails the requests that were sent over its own socket
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def _init_websocket(self):
+        """Only build the WebSocket URL; `_connect()` is awaited on first use."""
+        if self.base_url.startswith("https://"):
+            ws_url = self.base_url.replace("https://", "wss://")
+        elif self.base_url.startswith("http://"):
+            ws_url = self.base_url.replace("http://", "ws://")
+        else:
+            raise ValueError("Invalid base URL for WebSocket.")
+        self.ws_url = f"{ws_url}/ws/v1/atp/llm-client/{self.api_key}/"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the WebSocket connection and the HTTP sessions."""
+        await self._drop_connection()
+        if self.aio_session is not None:
+            await self.aio_session.close()
+            self.aio_session = None
+        LLMClient.close(self)
+
+    def _get_session(self):
+        if self.aio_session is None or self.aio_session.closed:
+            self.aio_session = aiohttp.ClientSession()
+        return self.aio_session
+
+    async def _drop_connection(self):
+        """Close the current WebSocket and wait for its reader task to finish."""
+        ws, reader = self.ws, self._reader_task
+        self.ws, self._reader_task = None, None
+        self.authenticated = False
+        if ws is not None:
+            await ws.close()
+        if reader is not None:
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.debug(f"WebSocket reader ended with {e!r}")
+
+    async def _connect(self):
+        """Establish an authenticated WebSocket connection if there is none."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.ws is not None and not self.ws.closed and self.authenticated:
+                return
+            await self._drop_connection()
+            try:
+                self.ws = await self._get_session().ws_connect(self.ws_url, heartbeat=30)
+                self._auth_future = asyncio.get_running_loop().create_future()
+                self._pending = {}
+                self._reader_task = asyncio.ensure_future(
+                    self._read_loop(self.ws, self._pending, self._auth_future)
+                )
+                await self.ws.send_str(json.dumps({"type": "auth", "api_key": self.api_key}))
+                logger.info("WebSocket connection established and authentication sent.")
+                await asyncio.wait_for(self._auth_future, timeout=10)
+            except asyncio.TimeoutError:
+                await self._drop_connection()
+                raise WebSocketException("Authentication timed out.")
+            except WebSocketException:
+                await self._drop_connection()
+                raise
+            except Exception as e:
+                await self._drop_connection()
+                logger.error(f"Failed to initiate WebSocket connection: {e}")
+                raise WebSocketException(
+                    f"Failed to initiate WebSocket connection: {e}"
+                )
+
+    async def _read_loop(self, ws, pending, auth_future):
+        """Resolve the pending request futures of one connection as their responses arrive."""
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    self._on_message(ws, msg.data, pending, auth_future)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    logger.error(f"WebSocket error: {ws.exception()}")
+                    break
+        finally:
+            logger.info(f"WebSocket closed with code {ws.close_code}")
+            if self.ws is ws:
+                self.authenticated = False
+            error = WebSocketException("WebSocket connection is closed.")
+            if not auth_future.done():
+                auth_future.set_exception(error)
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            pending.clear()
+
+    def _on_message(self, ws, message: str, pending, auth_future):
+        """Handle incoming WebSocket messages."""
+        self.last_activity_time = time.time()
+        try:
+            data = json.loads(message)
+            message_type = data.get("type")
+            request_id = data.get("request_id")
+            if message_type == "auth_response":
+                if not data.get("success"):
+                    error = data.get("error", "Unknown error")
+                    logger.error(f"Authentication failed: {error}")
+                    if not auth_future.done():
+                        auth_future.set_exception(
+                            WebSocketException(f"Authentication failed: {error}")
+                        )
+                else:
+                    logger.info("Authentication successful.")
+                    if self.ws is ws:
+                        self.authenticated = True
+                    if not auth_future.done():
+                        auth_future.set_result(True)
+            elif message_type in ["toolkit_context", "task_response"]:
+                future = pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(data)
+                else:
+                    logger.debug(f"Dropping response for unknown or expired request {request_id}")
+            else:
+                logger.warning(f"Received unknown message type: {message_type}")
+        except json.JSONDecodeError:
+            logger.error("Failed to parse WebSocket message as JSON.")
+        except Exception as e:
+            logger.error(f"Error processing WebSocket message: {e}")
+
+    async def _ws_request(self, request_id: str, message: dict, timeout: float) -> dict:
+        """Send a WebSocket request and wait for the response with the same request_id."""
+        await self._connect()
+        ws, pending = self.ws, self._pending
+        future = asyncio.get_running_loop().create_future()
+        pending[request_id] = future
+        try:
+            try:
+                await ws.send_str(json.dumps(message))
+            except Exception as e:
+                logger.error(f"Error sending {message.get('type')} message: {e}")
+                raise WebSocketException(f"Failed to send request: {e}")
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            pending.pop(request_id, None)
+
+    async def _http_request(
+        self, endpoint: str, payload: dict, method: str = "POST", stream: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Make an HTTP request to the server. `timeout` bounds the whole request, or the
+        wait between chunks of a stream.
+        """
+        url = f"{self.http_url}{endpoint}"
+        headers = {
+            "Authorization": f"ApiKey {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json" if not stream else "text/event-stream",
+        }
+
+        # Add API key to payload
+        payload["api_key"] = self.api_key
+
+        kwargs = {"headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(sock_read=timeout) if stream else aiohttp.ClientTimeout(total=timeout)
+        if method in ["POST", "PUT", "PATCH"]:
+            kwargs["json"] = payload
+        try:
+            resp = await self._get_session().request(method, url, **kwargs)
+            if stream:
+                return resp
+            async with resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
+        except aiohttp.ClientError as e:
+            logger.error(f"HTTP request failed: {e}")
+            raise
+
+    async def _http_stream_request(self, endpoint: str, payload: dict, timeout: int):
+        """Make an HTTP POST request and yield SSE events as dicts."""
+        resp = await self._http_request(endpoint, payload, stream=True, timeout=timeout)
+        async with resp:
+            if resp.status != 200:
+                raise HTTPException(f"Streaming request failed: {resp.status} {await resp.text()}")
+            async for line in resp.content:
+                line = line.strip()
+                if line.startswith(b"data: "):
+                    try:
+                        yield json.loads(line[len(b"data: "):].decode("utf-8"))
+                    except Exception as e:
+                        logger.warning(f"Failed to parse SSE event: {e}")
+
+    async def _call_endpoint(self, endpoint: str, payload: dict, method: str, error: str):
+        try:
+            return await self._http_request(endpoint, payload, method=method)
+        except aiohttp.ClientError as e:
+            logger.error(f"{error}: {e}")
+            raise Exception(f"{error}: {e}")
+
+    # OAuth
+
+    async def initiate_oauth_connection(self, platform_id: str, external_user_id: str, developer_redirect_url: Optional[str] = None) -> Dict:
+        """Async version of LLMClient.initiate_oauth_connection."""
+        payload = {"external_user_id": external_user_id}
+        if developer_redirect_url:
+            payload["developer_redirect_url"] = developer_redirect_url
+        return await self._call_endpoint(
+            f"oauth/confirmation/{platform_id}/", payload, "POST", "Failed to initiate OAuth connection"
+        )
+
+    async def wait_for_connection(self, platform_id: str, external_user_id: str, timeout: int = 300, poll_interval: int = 2) -> Dict:
+        """Async version of LLMClient.wait_for_connection."""
+        start_time = time.time()
+        endpoint = f"oauth/tokens/{platform_id}/{external_user_id}/"
+
+        while time.time() - start_time < timeout:
+            try:
+                response = await self._http_request(endpoint, {}, method="GET")
+                return {
+                    "status": "completed",
+                    "integration_id": response.get("integration_id"),
+                    "external_user_id": response.get("external_user_id"),
+                    "external_user_email": response.get("external_user_email"),
+                    "access_token": response.get("access_token"),
+                    "refresh_token": response.get("refresh_token"),
+                    "expires_at": response.get("expires_at"),
+                    "scope": response.get("scope")
+                }
+            except aiohttp.ClientResponseError as e:
+                if e.status == 404:
+                    # Account not yet connected, continue polling
+                    await asyncio.sleep(poll_interval)
+                    continue
+                logger.error(f"Error polling for connection: {e}")
+                raise Exception(f"Error polling for connection: {e}")
+            except aiohttp.ClientError as e:
+                logger.error(f"Error polling for connection: {e}")
+                raise Exception(f"Error polling for connection: {e}")
+
+        raise TimeoutError(f"Timed out waiting for OAuth connection for platform {platform_id} and user {external_user_id}")
+
+    async def get_user_tokens(self, platform_id: str, external_user_id: str) -> Dict:
+        """Async version of LLMClient.get_user_tokens."""
+        return await self._call_endpoint(
+            f"oauth/tokens/{platform_id}/{external_user_id}/", {}, "GET", "Failed to fetch user tokens"
+        )
+
+    async def register_webhook(self, url: str, events: List[str] = ['connection_success']) -> Dict:
+        """Async version of LLMClient.register_webhook."""
+        return await self._call_endpoint(
+            "webhooks/register/", {"url": url, "events": events}, "POST", "Failed to register webhook"
+        )
+
+    async def list_webhooks(self) -> List[Dict]:
+        """Async version of LLMClient.list_webhooks."""
+        return await self._call_endpoint("webhooks/", {}, "GET", "Failed to list webhooks")
+
+    async def delete_webhook(self, webhook_id: str) -> None:
+        """Async version of LLMClient.delete_webhook."""
+        await self._call_endpoint(
+            f"webhooks/{webhook_id}/delete/", {}, "DELETE", "Failed to delete webhook"
+        )
+
+    # Toolkit context
+
+    async def get_toolkit_context(
+        self, toolkit_id: str, user_prompt: str, provider: str = "openai"
+    ) -> dict:
+        """Async version of LLMClient.get_toolkit_context."""
+        message = {
+            "type": "get_toolkit_context",
+            "toolkit_id": toolkit_id,
+            "request_id": f"context_{toolkit_id}_{str(uuid.uuid4())}",
+            "provider": provider,
+            "user_prompt": user_prompt,
+        }
+        if self.protocol in ["ws", "wss"]:
+            message["api_key"] = self.api_key
+            try:
+                response = await self._ws_request(message["request_id"], message, timeout=30)
+            except asyncio.TimeoutError:
+                raise TimeoutError("Timed out waiting for toolkit context response.")
+        else:
+            response = await self._http_request("process/", message)
+        return response.get("payload", {})
+
+    def get_toolkit_context_streaming(
+        self, toolkit_id: str, user_prompt: str, provider: str = "openai"
+    ):
+        """Async version of LLMClient.get_toolkit_context_streaming; returns an async iterator."""
+        if self.protocol not in ["http", "https"]:
+            raise ValueError("Streaming only supported for HTTP protocol")
+        payload = {
+            "type": "get_toolkit_context",
+            "toolkit_id": toolkit_id,
+            "request_id": str(uuid.uuid4()),
+            "provider": provider,
+            "user_prompt": user_prompt,
+        }
+        return self._http_stream_request("process/", payload, timeout=30)
+
+    # Tool calls
+
+    async def call_tool(
+        self,
+        toolkit_id: str,
+        tool_calls: list,
+        provider: str = "openai",
+        auth_token: str = None,
+        user_prompt: str = None,
+        timeout: int = 120,
+        sequential: bool = False,
+        total_timeout: Optional[float] = None,
+    ) -> list:
+        """
+        Async version of LLMClient.call_tool.
+
+        Unless `sequential` is set, all tool calls are sent at once (HTTP calls at most
+        `max_parallel_calls` at a time) and awaited together; results keep the order of
+        `tool_calls`. `total_timeout` is an overall deadline in seconds for a non-sequential
+        batch; a call that misses it gets an error result instead of failing the batch.
+        """
+        if not tool_calls:
+            logger.warning("No tool calls provided")
+            return []
+
+        formatted_calls = self._format_tool_calls(tool_calls, provider)
+        if sequential:
+            tool_results = [
+                await self._call_single_tool(toolkit_id, i, tool_call, auth_token, user_prompt, timeout)
+                for i, tool_call in enumerate(formatted_calls)
+            ]
+        else:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + total_timeout if total_timeout is not None else None
+            limiter = asyncio.Semaphore(max(1, self.max_parallel_calls))
+            tool_results = await asyncio.gather(*[
+                self._call_single_tool(
+                    toolkit_id, i, tool_call, auth_token, user_prompt, timeout, deadline, limiter
+                )
+                for i, tool_call in enumerate(formatted_calls)
+            ])
+        return self._format_tool_results(tool_results, provider)
+
+    async def _call_single_tool(
+        self, toolkit_id: str, index: int, tool_call: dict, auth_token: str, user_prompt: str,
+        timeout: int, deadline: Optional[float] = None, limiter: Optional[asyncio.Semaphore] = None,
+    ) -> dict:
+        """
+        Execute one formatted tool call and return {"tool_call_id", "result"}.
+
+        `deadline` (loop time) caps `timeout`; `limiter` bounds concurrent HTTP calls.
+        """
+        request_id = f"task_{toolkit_id}_{index}_{str(uuid.uuid4())}"
+        payload = self._build_task_request(request_id, toolkit_id, tool_call, auth_token, user_prompt)
+        loop = asyncio.get_running_loop()
+        try:
+            if self.protocol in ["ws", "wss"]:
+                if deadline is not None:
+                    timeout = max(0, min(timeout, deadline - loop.time()))
+                response = await self._ws_request(request_id, payload, timeout=timeout)
+            else:
+                async with limiter or _no_limit():
+                    if deadline is not None:
+                        timeout = max(0, min(timeout, deadline - loop.time()))
+                    response = await asyncio.wait_for(
+                        self._http_request("process/", payload), timeout=timeout
+                    )
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out waiting for task response {index + 1}.")
+            return {
+                "tool_call_id": tool_call["tool_call_id"],
+                "result": {"error": f"Timed out waiting for task response {index + 1}."},
+            }
+        except Exception as e:
+            logger.error(f"Error executing tool call {index + 1}: {e}")
+            return {"tool_call_id": tool_call["tool_call_id"], "result": {"error": str(e)}}
+
+        if response.get("status") == "error":
+            logger.error(f"Task response error: {response.get('message')}")
+            return {
+                "tool_call_id": tool_call["tool_call_id"],
+                "result": {"error": response.get("message", "Unknown error")},
+            }
+        return {"tool_call_id": tool_call["tool_call_id"], "result": response.get("result", "")}
+
+    def call_tool_streaming(
+        self,
+        toolkit_id: str,
+        tool_calls: list,
+        provider: str = "openai",
+        auth_token: str = None,
+        user_prompt: str = None,
+        timeout: int = 120,
+    ):
+        """Async version of LLMClient.call_tool_streaming; returns an async iterator."""
+        if self.protocol not in ["http", "https"]:
+            raise ValueError("Streaming only supported for HTTP protocol")
+
+        formatted_calls = self._format_tool_calls(tool_calls or [], provider)
+        if not formatted_calls:
+            logger.warning("No tool calls provided")
+            return _empty_async_iterator()
+        tool_call = formatted_calls[0]  # Support one tool call for streaming
+        request_id = f"task_{toolkit_id}_{str(uuid.uuid4())}"
+        payload = self._build_task_request(request_id, toolkit_id, tool_call, auth_token, user_prompt)
+        return self._http_stream_request("process/", payload, timeout)
+
+    # Toolkits
+
+    async def list_store_toolkits(self, page: int = 1, page_size: int = 10) -> Dict:
+        """Async version of LLMClient.list_store_toolkits."""
+        return await self._call_endpoint(
+            "store/toolkits/list/", {"page": page, "page_size": page_size}, "GET", "Failed to list toolkits"
+        )
+
+    async def list_my_toolkits(self, page: int = 1, page_size: int = 10) -> Dict:
+        """Async version of LLMClient.list_my_toolkits."""
+        return await self._call_endpoint(
+            "developers/toolkits/", {"page": page, "page_size": page_size}, "GET", "Failed to list developer toolkits"
+        )
+
+    async def get_toolkit_details(self, toolkit_id: str) -> Dict:
+        """Async version of LLMClient.get_toolkit_details."""
+        return await self._call_endpoint(
+            f"store/toolkits/{toolkit_id}/", {}, "GET", "Failed to get toolkit details"
+        )
+
+    async def get_developer_profile(self, display_name: str) -> Dict:
+        """Async version of LLMClient.get_developer_profile."""
+        return await self._call_endpoint(
+            f"store/developers/{display_name}/", {}, "GET", "Failed to get developer profile"
+        )
+
+
+@asynccontextmanager
+async def _no_limit():
+    yield
+
+
+async def _empty_async_iterator():
+    return
+    yield
@@ -0,0 +1,172 @@
+"""
+RegistrationCache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_path():
+    """Return the default cache file, under $XDG_CACHE_HOME or ~/.cache."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return os.path.join(base, "atp_sdk", "registrations.json")
+
+
+class RegistrationCache:
+    """
+    Small JSON file remembering what the ATP server last acknowledged for a toolkit:
+    the toolkit hash, the per-tool code hashes and the unused exchange tokens.
+
+    Entries are keyed by a hash of api_key and app_name, so the API key itself is never
+    written to disk. Writes go to a temporary file that atomically replaces the cache,
+    so concurrent workers never read a half-written file. Tokens are kept until they are
+    used or replaced; the server rejects a token it no longer accepts.
+    """
+    def __init__(self, path=None, flush_delay=1.0):
+        """
+        Args:
+            path (str, optional): Cache file location. Defaults to `default_cache_path()`.
+            flush_delay (float, optional): Seconds used tokens are collected before they are
+                removed from the file in one write (see `discard_token`). Defaults to 1.
+        """
+        self.path = str(path or default_cache_path())
+        self.flush_delay = flush_delay
+        self.lock = threading.Lock()
+        self._tokens = {}  # {entry key: {name: token}} as this process last read or wrote them
+        self._discarded = {}  # {entry key: {name: token}} waiting for the next flush
+        self._flush_timer = None
+
+    @staticmethod
+    def _key(api_key, app_name):
+        return hashlib.sha256(f"{api_key}:{app_name}".encode("utf-8")).hexdigest()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable registration cache {self.path}: {e}")
+            return {}
+
+    def _write(self, data):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".registrations-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self, api_key, app_name):
+        """
+        Return the cached registration of a toolkit.
+
+        Returns:
+            dict: {"toolkit_hash": str, "tool_hashes": {name: code_hash},
+                   "exchange_tokens": {name: token}}, or None if nothing is cached.
+        """
+        key = self._key(api_key, app_name)
+        with self.lock:
+            entry = self._read().get(key)
+            if not entry:
+                return None
+            tokens = {
+                name: token
+                for name, token in (entry.get("exchange_tokens") or {}).items()
+                if isinstance(token, str) and self._discarded.get(key, {}).get(name) != token
+            }
+            self._tokens[key] = dict(tokens)
+        return {
+            "toolkit_hash": entry.get("toolkit_hash"),
+            "tool_hashes": dict(entry.get("tool_hashes") or {}),
+            "exchange_tokens": tokens,
+        }
+
+    def save(self, api_key, app_name, toolkit_hash, tool_hashes, exchange_tokens):
+        """Store the registration the server just acknowledged."""
+        key = self._key(api_key, app_name)
+        tokens = {name: token for name, token in exchange_tokens.items() if token}
+        try:
+            with self.lock:
+                data = self._read()
+                data[key] = {
+                    "toolkit_hash": toolkit_hash,
+                    "tool_hashes": dict(tool_hashes),
+                    "exchange_tokens": tokens,
+                    "saved_at": time.time(),
+                }
+                self._write(data)
+                self._tokens[key] = dict(tokens)
+        except OSError as e:
+            logger.warning(f"Could not write registration cache {self.path}: {e}")
+
+    def discard_token(self, api_key, app_name, name, token):
+        """
+        Forget a used exchange token: tokens are single-use, so a restart must not pick
+        it up again.
+
+        Nothing is written for a token this cache never stored. Otherwise the removal is
+        written together with the others used within `flush_delay` seconds; `flush()`
+        writes pending removals right away.
+        """
+        key = self._key(api_key, app_name)
+        with self.lock:
+            cached = self._tokens.get(key, {})
+            if cached.get(name) != token:
+                return
+            del cached[name]
+            self._discarded.setdefault(key, {})[name] = token
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """Remove the tokens passed to `discard_token` from the file in one write."""
+        with self.lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            discarded, self._discarded = self._discarded, {}
+            if not discarded:
+                return
+            try:
+                data = self._read()
+                changed = False
+                for key, used in discarded.items():
+                    tokens = (data.get(key) or {}).get("exchange_tokens") or {}
+                    for name, token in used.items():
+                        if tokens.get(name) == token:  # not replaced by a newer save()
+                            del tokens[name]
+                            changed = True
+                if changed:
+                    self._write(data)
+            except OSError as e:
+                logger.warning(f"Could not write registration cache {self.path}: {e}")
+
+    def clear(self, api_key, app_name):
+        """Forget the cached registration of a toolkit."""
+        try:
+            with self.lock:
+                data = self._read()
+                if data.pop(self._key(api_key, app_name), None) is not None:
+                    self._write(data)
+        except OSError as e:
+            logger.warning(f"Could not write registration cache {self.path}: {e}")
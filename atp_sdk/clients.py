@@ -2,82 +2,598 @@
 ToolKitClient and LLMClient
 """
 
+import asyncio
+import ctypes
+import ctypes.util
+import fnmatch
+import importlib
+import select
+import struct
+import sys
 import threading
 import inspect
 import hashlib
 import uuid
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import websocket
 import json
 import logging
 import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
 from websocket import WebSocketException, WebSocketConnectionClosedException
 import os
 import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+from atp_ui.diff import UIDeltaEncoder
+from atp_ui.tables import DataTable, is_window_action, parse_window_action
+from atp_ui.utils import to_json
+
+from .sessions import InMemorySessionStore
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def create_http_session(pool_size=10, max_retries=3, backoff_factor=0.3):
+    """
+    Create a requests.Session with a keep-alive connection pool and retries.
+
+    Connections are reused across calls, so only the first request to a host pays the
+    TCP and TLS handshake. The session can be shared by worker threads.
+
+    Args:
+        pool_size (int, optional): Maximum number of pooled connections per host. Defaults to 10.
+        max_retries (int, optional): Retries for connection errors and 502/503/504 responses.
+            Non-idempotent requests (POST) are only retried when the connection failed. Defaults to 3.
+        backoff_factor (float, optional): Exponential back-off factor between retries. Defaults to 0.3.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _mount_without_read_retries(session, prefix, pool_size=10):
+    """
+    Make `session` retry requests to URLs starting with `prefix` only when the connection
+    failed, keeping its other retry settings.
+
+    Used for polls that claim work on the server: retrying a GET after a read timeout or a
+    502/503/504 would claim a second batch while the first one is lost.
+    """
+    if not isinstance(session, requests.Session):
+        return  # a custom client handles its own retries
+    retry = session.get_adapter(prefix).max_retries.new(read=0, status=0)
+    session.mount(prefix, HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry))
+
+
+# Set while a ToolKitClient reloads modules, so that the tools they register are staged
+# on that client instead of being registered right away.
+_reload_state = threading.local()
+
+
+DEFAULT_WATCH_EXCLUDE = (
+    "*/.git/*",
+    "*/.hg/*",
+    "*/__pycache__/*",
+    "*/node_modules/*",
+    "*/site-packages/*",
+    "*/dist-packages/*",
+    "*/venv/*",
+    "*/.venv/*",
+    "*/.tox/*",
+    "*/.nox/*",
+    "*/build/*",
+    "*/dist/*",
+)
+
+
+def _matches_any(path, patterns):
+    path = Path(path).as_posix()
+    return any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+
+
+class _Inotify:
+    """
+    Minimal inotify binding (Linux, via ctypes) that reports changed files inside
+    watched directories. Directories are watched instead of files so that editors
+    that save by writing a new file and renaming it over the old one are noticed.
+    """
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.directories = {}  # {wd: directory}
+
+    def watch_directory(self, directory):
+        if directory in self.directories.values():
+            return
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        self.directories[wd] = directory
+
+    def read_changes(self, timeout):
+        """Wait up to `timeout` seconds and return the paths that were written or replaced."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset + self._EVENT_HEADER.size <= len(data):
+            wd, _, _, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            directory = self.directories.get(wd)
+            if directory and name:
+                paths.add(os.path.join(directory, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
 class FileWatcher:
     """
     Monitors Python files for changes and triggers callbacks when code is modified.
+
+    Uses inotify on Linux and falls back to polling os.stat() elsewhere. In both modes
+    a file is only read and hashed when its mtime or size changed, and the callback
+    only fires when its contents really differ.
     """
-    def __init__(self, callback):
+    def __init__(self, callback, use_inotify=True, poll_interval=1, exclude=DEFAULT_WATCH_EXCLUDE):
         self.callback = callback
         self.file_hashes: Dict[str, str] = {}
+        self.file_stats: Dict[str, tuple] = {}
         self.watched_files: Set[str] = set()
+        self.exclude = tuple(exclude or ())
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.inotify = None
+        self.lock = threading.Lock()
         self.running = False
         self.watcher_thread = None
+
     def add_file(self, file_path: str):
-        """Add a file to watch for changes."""
-        if os.path.exists(file_path):
+        """Add a file to watch for changes; files matching an exclude pattern are ignored."""
+        file_path = os.path.abspath(file_path)
+        if not os.path.isfile(file_path) or _matches_any(file_path, self.exclude):
+            return
+        with self.lock:
+            if file_path in self.watched_files:
+                return
             self.watched_files.add(file_path)
+            self.file_stats[file_path] = self._get_file_stat(file_path)
             self.file_hashes[file_path] = self._get_file_hash(file_path)
+            if self.inotify:
+                self._watch_directory(os.path.dirname(file_path))
+
+    def add_glob(self, pattern: str, root=None):
+        """Watch every file under `root` (default: cwd) matching a glob such as "src/**/*.py"."""
+        for path in Path(root or Path.cwd()).glob(pattern):
+            self.add_file(str(path))
+
+    @staticmethod
+    def _get_file_stat(file_path: str):
+        try:
+            st = os.stat(file_path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
 
     def _get_file_hash(self, file_path: str) -> str:
         """Get the hash of a file's contents."""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                return hashlib.sha256(content.encode("utf-8")).hexdigest()
+            with open(file_path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
         except Exception:
             return ""
 
+    def _watch_directory(self, directory):
+        try:
+            self.inotify.watch_directory(directory)
+        except OSError as e:
+            logger.warning(f"inotify cannot watch {directory} ({e}); falling back to stat polling")
+            self.inotify.close()
+            self.inotify = None
+
     def start(self):
         """Start the file watcher thread."""
         self.running = True
+        if self.use_inotify and self.inotify is None:
+            try:
+                inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logger.debug(f"inotify unavailable ({e}); using stat polling")
+            else:
+                with self.lock:
+                    self.inotify = inotify
+                    for directory in {os.path.dirname(p) for p in self.watched_files}:
+                        if self.inotify:
+                            self._watch_directory(directory)
         self.watcher_thread = threading.Thread(target=self._watch_loop, daemon=True)
         self.watcher_thread.start()
 
     def stop(self):
         """Stop the file watcher."""
         self.running = False
-        if self.watcher_thread:
+        if self.watcher_thread and self.watcher_thread is not threading.current_thread():
             self.watcher_thread.join()
+        with self.lock:
+            if self.inotify:
+                self.inotify.close()
+                self.inotify = None
+
+    def check_file(self, file_path: str):
+        """Re-check one watched file and trigger the callback if its contents changed."""
+        current_stat = self._get_file_stat(file_path)
+        if current_stat is None or current_stat == self.file_stats.get(file_path):
+            return
+        self.file_stats[file_path] = current_stat
+
+        current_hash = self._get_file_hash(file_path)
+        if current_hash != self.file_hashes.get(file_path):
+            logger.info(f"Code change detected in {file_path}")
+            self.file_hashes[file_path] = current_hash
+            self.callback(file_path)
+
+    def check_for_changes(self):
+        """Check every watched file once and trigger the callback for the ones that changed."""
+        for file_path in list(self.watched_files):
+            self.check_file(file_path)
 
     def _watch_loop(self):
-        """Main watching loop that checks for file changes."""
+        """Main watching loop: waits for inotify events, or polls file stats."""
         while self.running:
             try:
-                for file_path in list(self.watched_files):
-                    if not os.path.exists(file_path):
-                        continue
-
-                    current_hash = self._get_file_hash(file_path)
-                    if current_hash != self.file_hashes.get(file_path):
-                        logger.info(f"Code change detected in {file_path}")
-                        self.file_hashes[file_path] = current_hash
-                        self.callback(file_path)
-
-                time.sleep(1)  # Check every second
+                inotify = self.inotify
+                if inotify:
+                    for file_path in inotify.read_changes(timeout=self.poll_interval):
+                        if file_path in self.watched_files:
+                            self.check_file(file_path)
+                else:
+                    self.check_for_changes()
+                    time.sleep(self.poll_interval)
             except Exception as e:
                 logger.error(f"Error in file watcher: {e}")
                 time.sleep(5)  # Wait longer on error
 
 
+_ToolJob = namedtuple("_ToolJob", ["request_id", "run", "reject", "is_async"])
+
+
+class ToolLimiter:
+    """
+    Admission control for a single tool: caps concurrent executions, the number of
+    calls waiting for a slot, and how long a call may wait.
+    """
+    def __init__(self, max_concurrency=None, max_queue=0, queue_timeout=None):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue or 0
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = deque()  # (enqueued_at, job)
+        self.lock = threading.Lock()
+
+    def admit(self, job):
+        """
+        Try to admit a call.
+
+        Returns:
+            str: "run" if the call may start now, "queued" if it is waiting for a slot,
+                 or "busy" if both the slots and the queue are full.
+        """
+        with self.lock:
+            if self.max_concurrency is None or self.active < self.max_concurrency:
+                self.active += 1
+                return "run"
+            if len(self.waiting) < self.max_queue:
+                self.waiting.append((time.monotonic(), job))
+                return "queued"
+            return "busy"
+
+    def release(self):
+        """
+        Mark one execution as finished.
+
+        Returns:
+            tuple: (next_job, expired_jobs). `next_job` inherits the freed slot and must be
+                   started by the caller; `expired_jobs` waited longer than `queue_timeout`.
+        """
+        with self.lock:
+            expired = self._pop_expired()
+            if self.waiting:
+                _, job = self.waiting.popleft()
+                return job, expired
+            self.active -= 1
+            return None, expired
+
+    def expire(self):
+        """Remove and return the queued jobs that waited longer than `queue_timeout`."""
+        with self.lock:
+            return self._pop_expired()
+
+    def _pop_expired(self):
+        if self.queue_timeout is None:
+            return []
+        now = time.monotonic()
+        expired = []
+        while self.waiting and now - self.waiting[0][0] > self.queue_timeout:
+            expired.append(self.waiting.popleft()[1])
+        return expired
+
+
+class SessionScheduler:
+    """
+    Runs the jobs of one app session strictly in arrival order while jobs of different
+    sessions run in parallel on an executor.
+
+    Each busy session has a mailbox; only one job per session is on the executor at a
+    time, and the next one is submitted when it finishes, so a chatty session cannot
+    monopolize a worker.
+    """
+    def __init__(self, executor):
+        self.executor = executor
+        self.mailboxes = {}  # {session_id: deque of pending jobs}; present while a job runs
+        self.lock = threading.Lock()
+
+    def submit(self, session_id, job):
+        """Queue `job` (a no-argument callable) behind the session's earlier jobs."""
+        with self.lock:
+            mailbox = self.mailboxes.get(session_id)
+            if mailbox is not None:
+                mailbox.append(job)
+                return
+            self.mailboxes[session_id] = deque()
+        self._start(session_id, job)
+
+    def pending(self, session_id):
+        """Number of jobs of a session that are running or waiting."""
+        with self.lock:
+            mailbox = self.mailboxes.get(session_id)
+            return 0 if mailbox is None else len(mailbox) + 1
+
+    def _start(self, session_id, job):
+        try:
+            self.executor.submit(self._run, session_id, job)
+        except RuntimeError:  # executor shut down
+            with self.lock:
+                self.mailboxes.pop(session_id, None)
+            raise
+
+    def _run(self, session_id, job):
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"App session job for {session_id} failed: {e}", exc_info=True)
+        with self.lock:
+            mailbox = self.mailboxes[session_id]
+            if not mailbox:
+                del self.mailboxes[session_id]
+                return
+            next_job = mailbox.popleft()
+        self._start(session_id, next_job)
+
+
+class _HashLeaf:
+    __slots__ = ("key", "name", "digest")
+
+    def __init__(self, key, name, digest):
+        self.key = key
+        self.name = name
+        self.digest = digest
+
+
+class _HashBranch:
+    __slots__ = ("children", "digest")
+
+    def __init__(self):
+        self.children = [None, None]
+        self.digest = None
+
+    def rehash(self):
+        left, right = (child.digest if child else _EMPTY_DIGEST for child in self.children)
+        self.digest = hashlib.sha256(b"\x01" + left + right).digest()
+
+
+_EMPTY_DIGEST = bytes(32)
+
+
+class ToolkitHasher:
+    """
+    Toolkit hash as a Merkle tree over the tools' (name, code_hash) pairs, maintained
+    incrementally.
+
+    Tools sit in a binary trie keyed by the bits of sha256(name), each at the shallowest
+    depth where it is alone, so the tree's shape depends only on the set of names and its
+    expected depth is log2(n). Adding, changing or removing a tool rehashes the path from
+    its leaf to the root: O(log n), without re-reading any source code.
+    """
+    def __init__(self):
+        self.root = None
+        self.count = 0
+
+    @staticmethod
+    def _key(function_name):
+        return int.from_bytes(hashlib.sha256(function_name.encode("utf-8")).digest(), "big")
+
+    @staticmethod
+    def _bit(key, depth):
+        return (key >> (255 - depth)) & 1
+
+    def update(self, function_name, code_hash):
+        """Add a tool, or replace the hash of an existing one."""
+        digest = hashlib.sha256(f"\x00{function_name}\0{code_hash}".encode("utf-8")).digest()
+        self.root = self._insert(self.root, _HashLeaf(self._key(function_name), function_name, digest), 0)
+
+    def _insert(self, node, leaf, depth):
+        if node is None:
+            self.count += 1
+            return leaf
+        if isinstance(node, _HashLeaf):
+            if node.name == leaf.name:
+                return leaf
+            branch = _HashBranch()
+            branch.children[self._bit(node.key, depth)] = node
+            node = branch
+        bit = self._bit(leaf.key, depth)
+        node.children[bit] = self._insert(node.children[bit], leaf, depth + 1)
+        node.rehash()
+        return node
+
+    def remove(self, function_name):
+        """Drop a tool from the hash; unknown names are ignored."""
+        self.root = self._remove(self.root, self._key(function_name), function_name, 0)
+
+    def _remove(self, node, key, function_name, depth):
+        if node is None:
+            return None
+        if isinstance(node, _HashLeaf):
+            if node.name != function_name:
+                return node
+            self.count -= 1
+            return None
+        bit = self._bit(key, depth)
+        node.children[bit] = self._remove(node.children[bit], key, function_name, depth + 1)
+        left, right = node.children
+        remaining = left if right is None else right if left is None else None
+        if (left is None or right is None) and (remaining is None or isinstance(remaining, _HashLeaf)):
+            return remaining  # a lone leaf moves up to where a fresh build would put it
+        node.rehash()
+        return node
+
+    def hexdigest(self):
+        """Return the toolkit hash as a hex string."""
+        root = self.root.digest if self.root else _EMPTY_DIGEST
+        return hashlib.sha256(root + self.count.to_bytes(8, "big")).hexdigest()
+
+
+class InboxResponseBatcher:
+    """
+    Buffers inbox results and hands them to `send_batch` in groups, flushing as soon as
+    `max_batch` results are waiting or the oldest one has waited `max_delay` seconds.
+    """
+    def __init__(self, send_batch, max_batch=20, max_delay=0.05):
+        self.send_batch = send_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = []  # [{"request_id": ..., "response": ...}]
+        self.oldest = None  # monotonic time the oldest pending result was added
+        self.cond = threading.Condition()
+        self.thread = None
+        self.closed = False
+
+    def add(self, request_id, result):
+        """Queue one result for the next batch; once closed, send it right away instead."""
+        item = {"request_id": request_id, "response": result}
+        with self.cond:
+            if not self.closed:
+                self.pending.append(item)
+                if self.oldest is None:
+                    self.oldest = time.monotonic()
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(
+                        target=self._flush_loop, name="atp-inbox-flush", daemon=True
+                    )
+                    self.thread.start()
+                self.cond.notify()
+                return
+        self._send([item])
+
+    def open(self):
+        """Buffer results again after `close()`."""
+        with self.cond:
+            self.closed = False
+
+    def close(self, flush=True):
+        """
+        Stop the flush thread and, unless `flush` is False, send what is still buffered.
+        Results added afterwards are sent one by one until `open()` is called.
+        """
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if flush:
+            self.flush()
+
+    def drain(self):
+        """Remove and return everything that is buffered, without sending it."""
+        with self.cond:
+            pending, self.pending, self.oldest = self.pending, [], None
+        return pending
+
+    def flush(self):
+        """Send everything that is buffered right now, from the calling thread."""
+        pending = self.drain()
+        for start in range(0, len(pending), self.max_batch):
+            self._send(pending[start : start + self.max_batch])
+
+    def _take_batch(self):
+        batch = self.pending[: self.max_batch]
+        self.pending = self.pending[self.max_batch :]
+        self.oldest = time.monotonic() if self.pending else None
+        return batch
+
+    def _send(self, batch):
+        try:
+            self.send_batch(batch)
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} inbox result(s): {e}")
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                while len(self.pending) < self.max_batch and not self.closed:
+                    remaining = self.oldest + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                if self.closed:
+                    return  # close() sends whatever is left
+                batch = self._take_batch()
+            self._send(batch)
+
+
 class ToolKitClient:
     """
     ToolKitClient manages registration and execution of remote tools via WebSocket for the ATP Toolkit platform.
@@ -89,6 +605,22 @@ class ToolKitClient:
         registered_tools (dict): Registered tool metadata.
     """
 
+    def __new__(cls, *args, **kwargs):
+        # A module reloaded by the hot reload re-runs its module-level
+        # `client = ToolKitClient(...)`: hand back the running client instead of starting
+        # a second one with its own executor, HTTP session and file watcher.
+        reloading = getattr(_reload_state, "client", None)
+        if isinstance(reloading, cls):
+            api_key = args[0] if args else kwargs.get("api_key")
+            app_name = args[1] if len(args) > 1 else kwargs.get("app_name")
+            if (api_key, app_name) == (reloading.api_key, reloading.app_name):
+                return reloading
+            logger.warning(
+                f"A reloaded module creates a new {cls.__name__} for app '{app_name}'; "
+                "it is not stopped by the reload and keeps its own threads and connections"
+            )
+        return super().__new__(cls)
+
     def __init__(
         self,
         api_key,
@@ -98,6 +630,32 @@ class ToolKitClient:
         auto_restart=True,
         protocol="http",
         idle_timeout=300,
+        max_workers=8,
+        max_queue_size=64,
+        executor=None,
+        max_async_calls=1000,
+        session=None,
+        http_pool_size=None,
+        http_max_retries=3,
+        inbox_wait=25,
+        min_poll_interval=1,
+        max_poll_interval=30,
+        inbox_batch_size=10,
+        inbox_flush_size=20,
+        inbox_flush_interval=0.05,
+        deferred_registration=False,
+        registration_cache=None,
+        verify_cached_registration=True,
+        toolkit_hash_scheme="legacy",
+        watch_paths=None,
+        watch_exclude=None,
+        reload_debounce=0.5,
+        reload_drain_timeout=30,
+        max_app_sessions=1000,
+        app_session_ttl=1800,
+        session_store=None,
+        ui_delta=False,
+        ui_resync_every=20,
     ):
         """
         Initialize the ToolKitClient.
@@ -110,7 +668,36 @@ class ToolKitClient:
             auto_restart (bool, optional): Whether to auto-restart on code changes. Defaults to True.
             protocol (str, optional): Connection protocol, either "ws(s)" or "http(s)". Defaults to "https" use wss for development and http for production.
             idle_timeout (int, optional): Idle timeout in seconds before disconnecting. Defaults to 300 seconds (5 minutes).
+            max_workers (int, optional): Maximum number of tool calls executed in parallel. Defaults to 8.
+            max_queue_size (int, optional): Maximum number of tool calls waiting for a free worker before new requests are rejected. Defaults to 64.
+            executor (concurrent.futures.Executor, optional): Custom executor used to run tool calls; it is left running by `stop()`. Defaults to a thread pool of `max_workers` threads, shut down by `stop()` and recreated by `start()`.
+            max_async_calls (int, optional): Maximum number of `async def` tool calls in flight on the client's event loop. Defaults to 1000.
+            session (requests.Session, optional): HTTP session used for all calls to the ATP server. Defaults to a pooled keep-alive session from `create_http_session`. Inbox and message polls claim requests, so they are only retried when the connection failed; an adapter doing that is mounted on the session for their URLs.
+            http_pool_size (int, optional): Connection pool size of the default session. Defaults to `max(10, max_workers)`.
+            http_max_retries (int, optional): Retries of the default session for connection errors and 502/503/504 responses. Defaults to 3.
+            inbox_wait (float, optional): Seconds the server may hold an inbox poll open until work arrives (long-poll). Set to 0 to disable. Defaults to 25.
+            min_poll_interval (float, optional): Inbox poll interval when the server does not long-poll and work is flowing. Defaults to 1 second.
+            max_poll_interval (float, optional): Upper bound of the idle back-off between inbox polls. Defaults to 30 seconds.
+            inbox_batch_size (int, optional): Maximum number of pending requests claimed per inbox poll. Defaults to 10.
+            inbox_flush_size (int, optional): Number of finished inbox results that triggers a batched `inbox/respond` post. Set to 1 to post every result on its own. Defaults to 20.
+            inbox_flush_interval (float, optional): Longest time in seconds a finished inbox result waits for its batch to fill up. Defaults to 0.05.
+            deferred_registration (bool, optional): Only record tools in `register_tool` and register the whole toolkit in one bulk request from `start()` (or an explicit `register_toolkit()` call). Defaults to False (register each tool as it is decorated).
+            registration_cache (RegistrationCache, optional): Local cache of the last acknowledged registration. When the cached toolkit hash matches, startup skips the network handshake. Implies `deferred_registration`. Defaults to None (no cache).
+            verify_cached_registration (bool, optional): After a cache hit, still verify with the server in a background thread while already serving. Defaults to True.
+            toolkit_hash_scheme (str, optional): How the toolkit hash is computed. "legacy" hashes the concatenated sources of all tools, as earlier releases did, so existing registrations stay valid; "merkle" uses the incremental `ToolkitHasher` (O(log n) per tool change), which changes every toolkit hash once. Defaults to "legacy".
+            watch_paths (list, optional): Extra glob patterns, relative to the working directory, of files that trigger a reload when `auto_restart` is on (e.g. ["src/**/*.py"]). Defaults to None (only the main script and the modules defining registered tools).
+            watch_exclude (list, optional): Glob patterns of files never watched. Defaults to `DEFAULT_WATCH_EXCLUDE` (VCS folders, virtualenvs, site-packages, node_modules, build output).
+            reload_debounce (float, optional): Seconds to wait for further file changes before reloading, so one save touching several files reloads once. Defaults to 0.5.
+            reload_drain_timeout (float, optional): Longest time in seconds a reload waits for calls running the old code to finish. Defaults to 30.
+            max_app_sessions (int, optional): Maximum number of live interactive app sessions; the least recently used one is evicted beyond that. Defaults to 1000.
+            app_session_ttl (float, optional): Seconds an app session may stay idle before it is evicted. None disables expiry. Defaults to 1800.
+            session_store (SessionStore, optional): Where app sessions are kept, e.g. a `RedisSessionStore` shared by several replicas. Its `on_evict` is set to notify the server unless already set. Defaults to an `InMemorySessionStore` bounded by `max_app_sessions` and `app_session_ttl`.
+            ui_delta (bool, optional): Send app UI updates as JSON-Patch deltas against the previous UI of the session instead of full trees. The receiving side must understand the `atp_ui.diff` message format. Defaults to False.
+            ui_resync_every (int, optional): With `ui_delta`, send a full snapshot after this many deltas. Defaults to 20.
         """
+        if self._reused_by_reload():
+            logger.info(f"Reloaded module reuses the running client of app '{app_name}'")
+            return
         self.idle_timeout = idle_timeout  # Default: 300 seconds (5 minutes)
         self.last_activity_time = time.time()
         self.protocol = protocol  # "ws" or "http"
@@ -118,29 +705,119 @@ class ToolKitClient:
         self.app_name = app_name
         self.base_url = base_url.rstrip("/")
         self.endpoint_url = endpoint_url  # <-- Add this
+        self.session = session or create_http_session(
+            pool_size=http_pool_size or max(10, max_workers),
+            max_retries=http_max_retries,
+        )
+        for poll_path in (f"/api/v1/toolkit/{api_key}/inbox", f"/api/v1/atp/toolkit-client/{api_key}/messages/"):
+            _mount_without_read_retries(self.session, self.base_url + poll_path, http_pool_size or max(10, max_workers))
+        self.inbox_wait = inbox_wait
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self._poll_interval = min_poll_interval
+        self.inbox_batch_size = inbox_batch_size
+        self.inbox_batcher = (
+            InboxResponseBatcher(
+                self._send_tool_results_inbox_batch,
+                max_batch=inbox_flush_size,
+                max_delay=inbox_flush_interval,
+            )
+            if inbox_flush_size > 1
+            else None
+        )
+        self._inbox_batch_supported = True
         self.registered_tools = {}
         self.exchange_tokens = {}
         self.toolkit_hash = None # <--- Initialize this
-        self.active_app_sessions = {} # {request_id: session_data}
+        if toolkit_hash_scheme not in ("legacy", "merkle"):
+            raise ValueError("toolkit_hash_scheme must be 'legacy' or 'merkle'.")
+        self.toolkit_hash_scheme = toolkit_hash_scheme
+        self._toolkit_hasher = ToolkitHasher()
+        self.deferred_registration = deferred_registration
+        self._registration_pending = False
+        self._acknowledged_hashes = {}  # {function_name: code_hash} last accepted by the server
+        self.registration_cache = registration_cache
+        self.verify_cached_registration = verify_cached_registration
+        self._verify_thread = None
+        if session_store is None:
+            session_store = InMemorySessionStore(max_entries=max_app_sessions, ttl=app_session_ttl)
+        if session_store.on_evict is None:
+            session_store.on_evict = self._on_app_session_evicted
+        self.active_app_sessions = session_store  # {request_id: session_data}
+        self.ui_encoder = UIDeltaEncoder(resync_every=ui_resync_every) if ui_delta else None
+        self.data_tables = {}  # {table_id: DataTable}, answered by `table_window` app actions
         self.lock = threading.Lock()
         self.ws = None
         self.ws_thread = None
+        self._transport_stop = threading.Event()  # set by stop(); ends the WebSocket/inbox loop
         self.auto_restart = auto_restart
 
         self.programming_language = "Python"
 
-        self.loop = None
+        self.loop = None  # asyncio loop for async tools, started on first use
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
         self.running = False
 
+        # Tool execution pool: requests are taken off the socket right away and run here
+        self.max_workers = max_workers
+        self._owns_executor = executor is None  # only our own pool is shut down by stop()
+        self._executor_stopped = False
+        self.executor = executor or self._new_executor()
+        self._admission = threading.BoundedSemaphore(max_workers + max_queue_size)
+        self._async_admission = threading.BoundedSemaphore(max_async_calls)
+        self._send_lock = threading.Lock()
+        self.tool_limiters = {}  # {function_name: ToolLimiter}
+        self._reaper_thread = None
+        self._reaper_stop = threading.Event()  # set by stop(); start() clears it again
+        # App session messages: in order per session, in parallel across sessions
+        self.app_scheduler = SessionScheduler(self.executor)
+
+        # Hot reload: changed files are collected for `reload_debounce` seconds, then the
+        # affected modules are reloaded and their tools swapped in while serving.
+        self.reload_debounce = reload_debounce
+        self.reload_drain_timeout = reload_drain_timeout
+        self._changed_files = set()
+        self._reload_timer = None
+        self._reload_lock = threading.Lock()  # guards _changed_files and _reload_timer
+        self._reload_run_lock = threading.Lock()  # one reload at a time
+        self._staged_tools = None
+        self._code_generation = 0
+        self._inflight = {}  # {code generation: running calls}
+        self._inflight_cond = threading.Condition()
+
         # File watching for auto-restart
         if self.auto_restart:
-            self.file_watcher = FileWatcher(self._on_code_change)
-            self._setup_file_watching()
+            self.file_watcher = FileWatcher(
+                self._on_code_change,
+                exclude=DEFAULT_WATCH_EXCLUDE if watch_exclude is None else watch_exclude,
+            )
+            self._setup_file_watching(watch_paths)
         else:
             self.file_watcher = None
 
-    def _setup_file_watching(self):
-        """Setup file watching for all registered tool files."""
+    def _reused_by_reload(self):
+        """Return True if this client was handed back by `__new__` to a module being reloaded."""
+        return getattr(_reload_state, "client", None) is self
+
+    def _new_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="atp-tool")
+
+    def _ensure_executor(self):
+        """Replace the client's own thread pool if a previous stop() shut it down."""
+        if self._executor_stopped:
+            self._executor_stopped = False
+            self.executor = self._new_executor()
+            self.app_scheduler.executor = self.executor
+
+    def _shutdown_executor(self):
+        """Shut down the client's own thread pool; running calls finish, no new ones start."""
+        if self._owns_executor and not self._executor_stopped:
+            self._executor_stopped = True
+            self.executor.shutdown(wait=False)
+
+    def _setup_file_watching(self, watch_paths=None):
+        """Watch the main script and any extra glob patterns; tool modules are added as tools register."""
         if not self.file_watcher:
             return
 
@@ -149,54 +826,162 @@ class ToolKitClient:
         if main_file and main_file != "<string>":
             self.file_watcher.add_file(main_file)
 
-        # Watch current working directory for Python files
-        current_dir = Path.cwd()
-        for py_file in current_dir.rglob("*.py"):
-            if py_file.is_file():
-                self.file_watcher.add_file(str(py_file))
+        for pattern in watch_paths or ():
+            self.file_watcher.add_glob(pattern)
 
         logger.info(
             f"Watching {len(self.file_watcher.watched_files)} Python files for changes"
         )
 
-    def _on_code_change(self, file_path: str):
-        """Handle code changes by restarting the toolkit client."""
-        logger.info(
-            f"Code change detected in {file_path}. Restarting toolkit client..."
-        )
+    def _watch_tool_source(self, func):
+        """Watch the file defining a tool function."""
+        if not self.file_watcher:
+            return
+        try:
+            source_file = inspect.getsourcefile(func)
+        except TypeError:  # builtins and callable objects such as OpenAPI operations
+            return
+        if source_file:
+            self.file_watcher.add_file(source_file)
 
-        # Stop current connection
-        self.stop()
+    def _on_code_change(self, file_path: str):
+        """Record a changed file and (re)arm the debounce timer; the reload runs once changes settle."""
+        with self._reload_lock:
+            self._changed_files.add(os.path.abspath(file_path))
+            if self._reload_timer:
+                self._reload_timer.cancel()
+            self._reload_timer = threading.Timer(self.reload_debounce, self._reload_changed_code)
+            self._reload_timer.daemon = True
+            self._reload_timer.start()
+
+    def _reload_changed_code(self):
+        """Reload the modules behind the collected file changes, keeping the connection up."""
+        with self._reload_lock:
+            changed, self._changed_files = self._changed_files, set()
+            self._reload_timer = None
+        if not changed:
+            return
 
-        # Wait a moment for cleanup
-        time.sleep(2)
+        with self._reload_run_lock:
+            main_file = getattr(sys.modules.get("__main__"), "__file__", None)
+            if main_file and os.path.abspath(main_file) in changed:
+                self._main_script_changed(main_file)
+                changed.discard(os.path.abspath(main_file))
+                if not changed:
+                    return
+
+            modules = [
+                module
+                for name, module in list(sys.modules.items())
+                if name != "__main__"
+                and getattr(module, "__file__", None)
+                and os.path.abspath(module.__file__) in changed
+            ]
+            if not modules:
+                logger.info(f"Changed files {sorted(changed)} define no loaded module; nothing to reload")
+                return
+            self.reload_modules(modules)
 
-        # Re-register all tools
-        self._re_register_tools()
+    def reload_modules(self, modules):
+        """
+        Reload modules with importlib and swap the tools they register into the running client.
 
-        # Restart the client
-        self.start()
+        Tools registered while the modules re-execute are staged, then replace the tools
+        of those modules in one atomic swap; tools the modules no longer define are
+        dropped. Only changed tools are re-registered with the server. Calls that started
+        on the old code are allowed to finish (up to `reload_drain_timeout`) before the
+        reload completes.
 
-        logger.info("Toolkit client restarted successfully after code change")
+        Args:
+            modules (list): Module objects to reload.
 
-    def _re_register_tools(self):
-        """Re-register all tools after code changes."""
+        Returns:
+            bool: True if every module reloaded; on error the current tools stay in place.
+        """
+        names = {module.__name__ for module in modules}
+        self._staged_tools = {}
+        _reload_state.client = self
+        try:
+            for module in modules:
+                logger.info(f"Reloading module {module.__name__}")
+                importlib.reload(module)
+        except Exception as e:
+            logger.error(f"Reload failed, keeping the current tools: {e}", exc_info=True)
+            return False
+        finally:
+            _reload_state.client = None
+            staged, self._staged_tools = self._staged_tools, None
 
-        # 🌟 NEW: Compute the combined hash before verification
-        self.toolkit_hash = self._compute_toolkit_hash()
+        generation = self._swap_tools(staged, names)
+        logger.info(f"Swapped in {len(staged)} reloaded tool(s) from {sorted(names)}")
+        self.register_toolkit()
 
-        if self._verify_toolkit_hash():
-            return  # No need to re-register, toolkit is identical
+        if self._drain_calls(generation, self.reload_drain_timeout):
+            logger.info("Calls on the previous code finished; old code retired")
         else:
-            logger.info("Re-registering tools after code change...")
-            # Clear existing exchange tokens
-            with self.lock:
-                self.exchange_tokens.clear()
-            # Re-register each tool
-            for function_name in list(self.registered_tools.keys()):
-                self._register_with_server(function_name, self.toolkit_hash)
+            logger.warning(
+                f"Calls on the previous code still running after {self.reload_drain_timeout}s"
+            )
+        return True
 
-        logger.info(f"Re-registered {len(self.registered_tools)} tools")
+    def _swap_tools(self, staged, module_names):
+        """
+        Atomically replace the tools of `module_names` with the staged ones.
+
+        Returns:
+            int: The new code generation; calls of earlier generations run old code.
+        """
+        with self.lock:
+            tools = dict(self.registered_tools)
+            for function_name, tool_data in list(tools.items()):
+                module_name = getattr(tool_data["function"], "__module__", None)
+                if module_name in module_names and function_name not in staged:
+                    logger.info(f"Tool '{function_name}' no longer defined; removing it")
+                    del tools[function_name]
+                    self._toolkit_hasher.remove(function_name)
+                    self.tool_limiters.pop(function_name, None)
+            for function_name, (tool_data, limits) in staged.items():
+                tools[function_name] = tool_data
+                self._toolkit_hasher.update(function_name, tool_data["code_hash"])
+                self._set_tool_limits(function_name, *limits)
+            self.registered_tools = tools
+
+        with self._inflight_cond:
+            self._code_generation += 1
+            return self._code_generation
+
+    def _main_script_changed(self, main_file):
+        """The main script cannot be reloaded in place; ask for a manual restart instead."""
+        logger.warning(
+            f"Main script {main_file} changed; restart the process to apply the change "
+            "(only imported modules are reloaded automatically)"
+        )
+
+    @contextmanager
+    def _tracked_call(self):
+        """Count a tool call against the code generation it started on."""
+        with self._inflight_cond:
+            generation = self._code_generation
+            self._inflight[generation] = self._inflight.get(generation, 0) + 1
+        try:
+            yield
+        finally:
+            with self._inflight_cond:
+                self._inflight[generation] -= 1
+                if not self._inflight[generation]:
+                    del self._inflight[generation]
+                    self._inflight_cond.notify_all()
+
+    def _drain_calls(self, generation, timeout):
+        """Wait until no call from a generation older than `generation` is running."""
+        deadline = time.monotonic() + timeout
+        with self._inflight_cond:
+            while any(g < generation for g in self._inflight):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._inflight_cond.wait(remaining)
+        return True
 
     def register_tool(
         self,
@@ -207,6 +992,9 @@ class ToolKitClient:
         auth_provider,
         auth_type,
         auth_with,
+        max_concurrency=None,
+        max_queue=0,
+        queue_timeout=None,
     ):
         """
         Register a Python function as a remote tool.
@@ -219,83 +1007,430 @@ class ToolKitClient:
             auth_provider (str): Name of the auth provider.
             auth_type (str): Type of authentication.
             auth_with (str): How authentication is performed.
+            max_concurrency (int, optional): Maximum number of concurrent executions of this tool. Defaults to None (no per-tool limit).
+            max_queue (int, optional): Number of calls allowed to wait for a free slot once `max_concurrency` is reached. Defaults to 0.
+            queue_timeout (float, optional): Seconds a queued call may wait before it fails with a busy error. Defaults to None (wait indefinitely).
 
         Returns:
             decorator: A decorator to wrap the tool function.
         """
 
         def decorator(func):
-            # Ensure 'access_token' is NOT in user function signature
-            sig = inspect.signature(func)
-            if "access_token" in sig.parameters or "api_key" in sig.parameters:
-                raise ValueError(
-                    f"In tool '{function_name}': 'access_token' or 'api_key' must not be declared in your function signature.\n"
-                    "ChatATP handles this securely and automatically."
-                )
+            self.add_tool(
+                function_name,
+                func,
+                params,
+                required_params,
+                description,
+                auth_provider,
+                auth_type,
+                auth_with,
+                max_concurrency=max_concurrency,
+                max_queue=max_queue,
+                queue_timeout=queue_timeout,
+            )
+            return func
+
+        return decorator
+
+    def add_tool(
+        self,
+        function_name,
+        func,
+        params,
+        required_params,
+        description,
+        auth_provider,
+        auth_type,
+        auth_with,
+        max_concurrency=None,
+        max_queue=0,
+        queue_timeout=None,
+        source_code=None,
+        code_hash=None,
+        defer_registration=False,
+    ):
+        """
+        Register a callable as a remote tool without using the decorator form.
 
-            # Get source code and hash it
+        Takes the same arguments as `register_tool`, plus:
+
+        Args:
+            func (callable): The tool implementation.
+            source_code (str or callable, optional): Source shown to the server and hashed for
+                change detection, or a function returning it. A function is only called when the
+                tool is uploaded (and to compute `code_hash` if that is not given), so the text is
+                not kept in memory. Defaults to `inspect.getsource(func)`.
+            code_hash (str, optional): Precomputed hash of `source_code`. Defaults to its sha256.
+            defer_registration (bool, optional): Only record the tool and leave the upload
+                to `register_toolkit()`. Defaults to False.
+        """
+        # Ensure 'access_token' is NOT in user function signature
+        sig = inspect.signature(func)
+        if "access_token" in sig.parameters or "api_key" in sig.parameters:
+            raise ValueError(
+                f"In tool '{function_name}': 'access_token' or 'api_key' must not be declared in your function signature.\n"
+                "ChatATP handles this securely and automatically."
+            )
+
+        # Get source code and hash it
+        if source_code is None:
             source_code = inspect.getsource(func)
-            code_hash = hashlib.sha256(source_code.encode("utf-8")).hexdigest()
-
-            # Register tool metadata
-            self.registered_tools[function_name] = {
-                "function": func,
-                "params": params,
-                "required_params": required_params,
-                "description": description,
-                "auth_provider": auth_provider,
-                "auth_type": auth_type,
-                "auth_with": auth_with,
-                "source_code": source_code,
-                "code_hash": code_hash,
-                "function_id": function_name,
-            }
+        if code_hash is None:
+            text = source_code() if callable(source_code) else source_code
+            code_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        tool_data = {
+            "function": func,
+            "params": params,
+            "required_params": required_params,
+            "description": description,
+            "auth_provider": auth_provider,
+            "auth_type": auth_type,
+            "auth_with": auth_with,
+            "source_code": source_code,
+            "code_hash": code_hash,
+            "function_id": function_name,
+            "is_async": inspect.iscoroutinefunction(func),
+        }
 
-            # 🌟 NEW: Compute the current overall hash
-            self.toolkit_hash = self._compute_toolkit_hash()
+        reloading = getattr(_reload_state, "client", None)
+        if reloading is not None and (reloading.api_key, reloading.app_name) == (self.api_key, self.app_name):
+            # Re-executed by a module reload: hand the tool to the reloading client's swap
+            reloading._staged_tools[function_name] = (tool_data, (max_concurrency, max_queue, queue_timeout))
+            return
 
-            if self._verify_toolkit_hash():
-                logger.info(f"Tool '{function_name}' registration skipped (Toolkit hash match).")
-                return func
+        # Register tool metadata
+        self._store_tool(function_name, tool_data)
+        self._set_tool_limits(function_name, max_concurrency, max_queue, queue_timeout)
 
-            # Register with server
-            self._register_with_server(function_name, self.toolkit_hash)
-            return func
+        if defer_registration or self.deferred_registration or self.registration_cache:
+            # Registered in bulk by register_toolkit() once every tool is known
+            self._registration_pending = True
+            return
+
+        # 🌟 NEW: Compute the current overall hash
+        self.toolkit_hash = self._compute_toolkit_hash()
+
+        if self._verify_toolkit_hash():
+            logger.info(f"Tool '{function_name}' registration skipped (Toolkit hash match).")
+            return
+        if self._acknowledged_hashes.get(function_name) == code_hash:
+            logger.info(f"Tool '{function_name}' registration skipped (tool hash match).")
+            return
+
+        # Register with server
+        self._register_with_server(function_name, self.toolkit_hash)
+
+    def register_data_table(
+        self,
+        table_id,
+        fetch=None,
+        count=None,
+        columns=None,
+        page_size=50,
+        max_window=500,
+        cache_size=256,
+        cache_ttl=None,
+        cache_key=None,
+    ):
+        """
+        Register the data source of a virtualized table (`atp_ui.contents.Content.VirtualTable`).
+
+        App actions of the form {"type": "table_window", "table_id": ..., "offset": ...,
+        "limit": ..., "sort_key": ..., "descending": ...} are answered by the SDK with
+        {"table_window": {...}} holding only the requested rows; the app function is not called.
+
+        Args:
+            table_id (str): Identifier used by the table component and its actions.
+            fetch (callable, optional): `fetch(offset, limit, sort_key, descending, state)` returning
+                the rows of a range; `state` is the app state of the session. `sort_key` is
+                always one of the sortable column keys when `columns` is given. When omitted,
+                a decorator is returned.
+            count (callable, optional): `count(state)` returning the total number of rows. Defaults to None (unknown).
+            columns (list, optional): Column definitions sent with the component. Defaults to None.
+            page_size (int, optional): Rows per fetched and cached block. Defaults to 50.
+            max_window (int, optional): Largest window one action may request. Defaults to 500.
+            cache_size (int, optional): Number of row blocks kept in the LRU cache; 0 disables it. Defaults to 256.
+            cache_ttl (float, optional): Seconds cached rows stay valid. Defaults to None (until evicted).
+            cache_key (callable, optional): `cache_key(state)` returning the hashable part of the app
+                state the rows depend on; rows are cached per key. Defaults to None (one cache for all sessions).
+
+        Returns:
+            DataTable: The registered table (or a decorator producing it when `fetch` is omitted).
+            Use `table.component(state=...)` to put it in an app's `ui_content`.
+        """
+        if fetch is None:
+            return lambda func: self.register_data_table(
+                table_id, func, count, columns, page_size, max_window, cache_size, cache_ttl, cache_key
+            )
+        table = DataTable(
+            table_id,
+            fetch,
+            count=count,
+            columns=columns,
+            page_size=page_size,
+            max_window=max_window,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            cache_key=cache_key,
+        )
+        self.data_tables[table_id] = table
+        logger.info(f"Data table '{table_id}' registered")
+        return table
+
+    def register_toolkit(self):
+        """
+        Verify the final toolkit hash once and upload the tools that changed since the
+        server last acknowledged them, in a single bulk request.
+
+        Tools whose `code_hash` matches the last acknowledged hash are skipped, and tools
+        that were acknowledged but are no longer registered are removed. Falls back to
+        concurrent per-tool requests when the server has no bulk endpoint. Called by
+        `start()` when `deferred_registration` is enabled; call it yourself when serving
+        through `django_atp` instead of `start()`.
+
+        With a `registration_cache` whose toolkit hash matches, no request is made at all
+        (the server is optionally re-checked in the background).
+
+        Returns:
+            bool: True if the server already had this toolkit or every changed tool registered.
+        """
+        self._registration_pending = False
+        if not self.registered_tools:
+            return True
+
+        self.toolkit_hash = self._compute_toolkit_hash()
+        if self._load_cached_registration():
+            logger.info("✅ Toolkit hash matches the registration cache — skipping verification.")
+            if self.verify_cached_registration:
+                self._verify_thread = threading.Thread(
+                    target=self._sync_toolkit, name="atp-verify", daemon=True
+                )
+                self._verify_thread.start()
+            return True
+        return self._sync_toolkit()
+
+    def _sync_toolkit(self):
+        """Verify the toolkit hash with the server and register what changed."""
+        if self._verify_toolkit_hash():
+            self._save_cached_registration()
+            return True
+
+        changed, removed = self._diff_registered_tools()
+        if not changed and not removed:
+            # Our acknowledged hashes disagree with the server's toolkit hash: resync fully
+            logger.info("Acknowledged tool hashes are out of sync — registering all tools.")
+            changed = list(self.registered_tools)
+        logger.info(
+            f"Registering {len(changed)} changed tool(s), removing {len(removed)} tool(s)..."
+        )
+        with self.lock:
+            for function_name in changed + removed:
+                self.exchange_tokens.pop(function_name, None)
+
+        registered = self._register_bulk_with_server(changed, self.toolkit_hash, removed)
+        if registered is None:
+            registered = self._register_concurrently(changed, self.toolkit_hash)
+            for function_name in removed:
+                self._unregister_with_server(function_name, self.toolkit_hash)
+        logger.info(f"Registered {registered}/{len(changed)} changed tools")
+        if registered == len(changed):
+            self._save_cached_registration()
+            return True
+        return False
+
+    def _load_cached_registration(self):
+        """
+        Seed acknowledged hashes and exchange tokens from the registration cache.
+
+        Returns:
+            bool: True if the cached toolkit hash equals the current one.
+        """
+        if not self.registration_cache:
+            return False
+        entry = self.registration_cache.load(self.api_key, self.app_name)
+        if not entry:
+            return False
+        hit = entry["toolkit_hash"] == self.toolkit_hash
+        with self.lock:
+            self._acknowledged_hashes = entry["tool_hashes"]
+            for function_name, token in entry["exchange_tokens"].items():
+                tool = self.registered_tools.get(function_name)
+                if tool and entry["tool_hashes"].get(function_name) == tool["code_hash"]:
+                    self.exchange_tokens.setdefault(function_name, token)
+        return hit
+
+    def _save_cached_registration(self):
+        if not self.registration_cache:
+            return
+        with self.lock:
+            tool_hashes = dict(self._acknowledged_hashes)
+            exchange_tokens = dict(self.exchange_tokens)
+        self.registration_cache.save(
+            self.api_key, self.app_name, self.toolkit_hash, tool_hashes, exchange_tokens
+        )
+
+    def _diff_registered_tools(self):
+        """
+        Compare the registered tools with the last acknowledged per-tool hashes.
+
+        Returns:
+            tuple: (changed, removed) lists of function names. `changed` holds added and
+                   modified tools.
+        """
+        with self.lock:
+            acknowledged = dict(self._acknowledged_hashes)
+        changed = [
+            function_name
+            for function_name, data in self.registered_tools.items()
+            if acknowledged.get(function_name) != data["code_hash"]
+        ]
+        removed = [
+            function_name
+            for function_name in acknowledged
+            if function_name not in self.registered_tools
+        ]
+        return changed, removed
+
+    def _acknowledge(self, function_name, code_hash):
+        with self.lock:
+            if code_hash is None:
+                self._acknowledged_hashes.pop(function_name, None)
+            else:
+                self._acknowledged_hashes[function_name] = code_hash
+
+    def _register_bulk_with_server(self, function_names, toolkit_hash, removed=()):
+        """
+        Register several tools, and remove stale ones, with one `register_toolkit` request.
+
+        Returns:
+            int: Number of `function_names` the server accepted (tokens it returned for
+                 other tools are not counted), or None if bulk registration is unsupported.
+        """
+        payload = {
+            "api_key": self.api_key,
+            "app_name": self.app_name,
+            "toolkit_hash": toolkit_hash,
+            "tools": [
+                self._build_registration_payload(function_name, toolkit_hash)
+                for function_name in function_names
+            ],
+            "removed_tools": list(removed),
+        }
+        url = f"{self.base_url}/api/v1/register_toolkit"
+        try:
+            resp = self.session.post(url, json=payload, timeout=60)
+        except requests.RequestException as e:
+            logger.warning(f"Bulk registration failed: {e}")
+            return None
+        if resp.status_code in (404, 405):
+            logger.info("Server does not support bulk registration, registering tools one by one")
+            return None
+        if resp.status_code != 200:
+            logger.info(
+                f"⚠️ Bulk registration failed ❌: {resp.status_code} - {resp.text}"
+            )
+            return None
+
+        exchange_tokens = resp.json().get("exchange_tokens", {})
+        with self.lock:
+            self.exchange_tokens.update(exchange_tokens)
+        accepted, rejected = 0, []
+        for function_name in function_names:
+            if function_name in exchange_tokens:
+                self._acknowledge(function_name, self.registered_tools[function_name]["code_hash"])
+                accepted += 1
+            else:
+                rejected.append(function_name)
+        if rejected:
+            logger.warning(f"⚠️ Bulk registration did not accept {len(rejected)} tool(s) ❌: {rejected}")
+        for function_name in removed:
+            self._acknowledge(function_name, None)
+        return accepted
+
+    def _register_concurrently(self, function_names, toolkit_hash, max_workers=8):
+        """Register tools one request each, a few at a time."""
+        def register(function_name):
+            try:
+                return self._register_with_server(function_name, toolkit_hash)
+            except requests.RequestException as e:
+                logger.info(f"⚠️ Failed to register tool '{function_name}' ❌: {e}")
+                return False
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(function_names))),
+            thread_name_prefix="atp-register",
+        ) as pool:
+            return sum(1 for ok in pool.map(register, function_names) if ok)
+
+    def _set_tool_limits(self, function_name, max_concurrency, max_queue, queue_timeout):
+        """Install, replace or remove the ToolLimiter of a tool."""
+        if max_concurrency is None:
+            self.tool_limiters.pop(function_name, None)
+            return
+        limiter = self.tool_limiters.get(function_name)
+        if limiter and (limiter.max_concurrency, limiter.max_queue, limiter.queue_timeout) == (
+            max_concurrency, max_queue or 0, queue_timeout
+        ):
+            return  # unchanged: keep the limiter and the calls queued on it
+        self.tool_limiters[function_name] = ToolLimiter(max_concurrency, max_queue, queue_timeout)
+        if queue_timeout is not None:
+            self._start_queue_reaper()
+
+    def _store_tool(self, function_name, tool_data):
+        """Add or replace a tool's metadata and fold its code hash into the toolkit hash."""
+        self.registered_tools[function_name] = tool_data
+        self._toolkit_hasher.update(function_name, tool_data["code_hash"])
+        self._watch_tool_source(tool_data["function"])
 
-        return decorator
-    
     def _compute_toolkit_hash(self):
-        """Compute a single hash from all tool source codes."""
-        combined_code = ""
-        for fn, data in sorted(self.registered_tools.items()):
-            combined_code += data["source_code"]
-        return hashlib.sha256(combined_code.encode("utf-8")).hexdigest()
+        """Return the toolkit hash of all registered tools under `toolkit_hash_scheme`."""
+        if self.toolkit_hash_scheme == "merkle":
+            return self._toolkit_hasher.hexdigest()
+        # Legacy: sha256 of all sources concatenated in name order, streamed instead of joined
+        digest = hashlib.sha256()
+        for function_name in sorted(self.registered_tools):
+            source_code = self.registered_tools[function_name]["source_code"]
+            if callable(source_code):
+                source_code = source_code()
+            digest.update(source_code.encode("utf-8"))
+        return digest.hexdigest()
     
 
     def _verify_toolkit_hash(self):
-        """Check with server if toolkit hash matches last registered version."""
+        """
+        Check with server if toolkit hash matches last registered version.
+
+        Also refreshes the acknowledged per-tool hashes: all current tools when the
+        toolkit is up to date, or the server's `tool_hashes` when it reports them.
+        """
         url = f"{self.base_url}/api/v1/toolkit/verify_hash"
         payload = {"api_key": self.api_key, "app_name": self.app_name, "toolkit_hash": self.toolkit_hash}
         try:
-            resp = requests.post(url, json=payload, timeout=15)
-            if resp.status_code == 200 and resp.json().get("up_to_date", False):
+            resp = self.session.post(url, json=payload, timeout=15)
+            data = resp.json() if resp.status_code == 200 else {}
+            if data.get("up_to_date", False):
+                with self.lock:
+                    self._acknowledged_hashes = {
+                        fn: tool["code_hash"] for fn, tool in self.registered_tools.items()
+                    }
                 logger.info("✅ Toolkit hash matches server — skipping re-registration.")
                 return True
+            if isinstance(data.get("tool_hashes"), dict):
+                with self.lock:
+                    self._acknowledged_hashes = dict(data["tool_hashes"])
             return False
         except Exception as e:
             logger.warning(f"Hash verification failed: {e}")
             return False
 
-    def _register_with_server(self, function_name, toolkit_hash=None):
-        """
-        Register the tool with the backend server.
-
-        Args:
-            function_name (str): Name of the tool to register.
-        """
+    def _build_registration_payload(self, function_name, toolkit_hash=None):
+        """Build the registration payload of a single tool."""
         tool_data = self.registered_tools[function_name]
-        func = tool_data["function"]
         source_code = tool_data["source_code"]
+        if callable(source_code):  # built on demand, see add_tool()
+            source_code = source_code()
         code_hash = tool_data["code_hash"]
 
         # # Generate a sample response for registration
@@ -311,7 +1446,7 @@ class ToolKitClient:
 
         response = "" # New
 
-        payload = {
+        return {
             "function_id": function_name,
             "api_key": self.api_key,
             "app_name": self.app_name,
@@ -330,22 +1465,68 @@ class ToolKitClient:
             },
         }
 
+    def _register_with_server(self, function_name, toolkit_hash=None):
+        """
+        Register the tool with the backend server.
+
+        Args:
+            function_name (str): Name of the tool to register.
+
+        Returns:
+            bool: True if the server accepted the tool.
+        """
+        payload = self._build_registration_payload(function_name, toolkit_hash)
+
         url = f"{self.base_url}/api/v1/register_tool"
         headers = {
             "Content-Type": "application/json",
         }
 
-        resp = requests.post(url, json=payload, headers=headers)
+        resp = self.session.post(url, json=payload, headers=headers)
         if resp.status_code == 200:
             exchange_token = resp.json().get("exchange_token")
             with self.lock:
                 self.exchange_tokens[function_name] = exchange_token
+            self._acknowledge(function_name, payload["code_hash"])
             logger.info(f" Tool '{function_name}' registered successfully. ✔️")
+            return True
         else:
             # logger.error(f"Failed to register tool '{function_name}': {resp.status_code} - {resp.text}")
             logger.info(
                 f"⚠️ Failed to register tool '{function_name}' ❌: {resp.status_code} - {resp.text}"
             )
+            return False
+
+    def _unregister_with_server(self, function_name, toolkit_hash=None):
+        """
+        Remove a tool that is no longer part of the toolkit from the backend server.
+
+        Args:
+            function_name (str): Name of the tool to remove.
+
+        Returns:
+            bool: True if the server removed the tool.
+        """
+        payload = {
+            "function_id": function_name,
+            "api_key": self.api_key,
+            "app_name": self.app_name,
+            "toolkit_hash": toolkit_hash,
+        }
+        url = f"{self.base_url}/api/v1/unregister_tool"
+        try:
+            resp = self.session.post(url, json=payload, timeout=30)
+        except requests.RequestException as e:
+            logger.warning(f"Failed to unregister tool '{function_name}': {e}")
+            return False
+        if resp.status_code == 200:
+            self._acknowledge(function_name, None)
+            logger.info(f"Tool '{function_name}' unregistered.")
+            return True
+        logger.warning(
+            f"Failed to unregister tool '{function_name}': {resp.status_code} - {resp.text}"
+        )
+        return False
 
     def _generate_sample_params(self, param_defs):
         """
@@ -376,6 +1557,9 @@ class ToolKitClient:
         """
         with self.lock:
             exchange_token = self.exchange_tokens.pop(function_id, None)
+        if exchange_token and self.registration_cache:
+            # Single-use: drop it from the cache too, so a restart does not reuse it
+            self.registration_cache.discard_token(self.api_key, self.app_name, function_id, exchange_token)
 
         if not exchange_token:
             logger.warning(
@@ -395,7 +1579,7 @@ class ToolKitClient:
         }
 
         try:
-            resp = requests.post(url, json=payload, headers=headers)
+            resp = self.session.post(url, json=payload, headers=headers)
             if resp.status_code == 200:
                 logger.info(f"Execution of '{function_id}' reported successfully.")
             else:
@@ -417,12 +1601,12 @@ class ToolKitClient:
         try:
             data = json.loads(message)
             message_type = data["message_type"]
+            payload = data.get("payload", {})
             if message_type == "atp_client_connected":
-                logger.info(f"Server message: {data['payload']['message']}")
+                logger.info(f"Server message: {payload['message']}")
 
-            # --- START: Standard Tool Execution (Existing Logic) ---
+            # --- START: Standard Tool Execution ---
             elif message_type == "atp_tool_request":
-                payload = data["payload"]
                 request_id = payload.get("request_id")
                 tool_name = payload.get("tool_name")
                 params = payload.get("params", {})
@@ -430,171 +1614,41 @@ class ToolKitClient:
                 logger.info(
                     f"Received tool request for '{tool_name}' with params: {params}"
                 )
-
-                if tool_name in self.registered_tools:
-                    tool_data = self.registered_tools[tool_name]
-                    func = tool_data["function"]
-                    sig = inspect.signature(func)
-                    try:
-                        if auth_token:
-                            # Prepare arguments based on function signature
-                            call_params = params.copy()
-                            if "auth_token" in sig.parameters and auth_token:
-                                call_params["auth_token"] = auth_token
-                            elif (
-                                any(
-                                    p.kind == inspect.Parameter.VAR_KEYWORD
-                                    for p in sig.parameters.values()
-                                )
-                                and auth_token
-                            ):
-                                call_params["auth_token"] = auth_token
-                            elif "auth_token" in sig.parameters and not auth_token:
-                                error_result = {
-                                    "error": f"Function '{tool_name}' requires 'auth_token', but none was provided."
-                                }
-                                ws.send(
-                                    json.dumps(
-                                        {
-                                            "type": "tool_response",
-                                            "request_id": request_id,
-                                            "result": error_result,
-                                        }
-                                    )
-                                )
-                            # Call function with auth_token if not in signature
-                            result = func(**call_params)
-                            # Send response
-                            ws.send(
-                                json.dumps(
-                                    {
-                                        "type": "tool_response",
-                                        "request_id": request_id,
-                                        "result": result,
-                                    }
-                                )
-                            )
-                            # self._report_execution(tool_name, result)
-                        else:
-                            # Call function without auth_token if not in signature
-                            result = func(**params)
-                            # Send response
-                            ws.send(
-                                json.dumps(
-                                    {
-                                        "type": "tool_response",
-                                        "request_id": request_id,
-                                        "result": result,
-                                    }
-                                )
-                            )
-                            # self._report_execution(tool_name, result)
-                    except Exception as e:
-                        error_result = {"error": str(e)}
-                        ws.send(
-                            json.dumps(
-                                {
-                                    "type": "tool_response",
-                                    "request_id": request_id,
-                                    "result": error_result,
-                                }
-                            )
-                        )
-                        # self._report_execution(tool_name, error_result)
-                else:
-                    logger.info(f"Unknown tool requested: {tool_name}")
+                # Hand the call to the worker pool so the socket thread stays free
+                self._dispatch_tool_request(
+                    request_id,
+                    tool_name,
+                    params,
+                    auth_token,
+                    partial(self._send_tool_response, ws),
+                )
             # --- END: Standard Tool Execution ---
             
             # --- START: Interactive App Session (New Logic) ---
             elif message_type == "atp_app_request":
                 # Message to start a new interactive app session
-                request_id = payload.get("request_id")
-                app_name = payload.get("tool_name")
-                initial_params = payload.get("params", {})
-                auth_token = payload.get("auth_token")
-
-                logger.info(f"Received APP START request for '{app_name}' (Session ID: {request_id})")
-
-                if app_name in self.registered_tools:
-                    app_func = self.registered_tools[app_name]["function"]
-                    
-                    # 1. Prepare initial call parameters
-                    call_params = initial_params.copy()
-                    if auth_token:
-                        call_params["auth_token"] = auth_token
-                    
-                    try:
-                        # 2. Call the app's entry function. 
-                        # It should return { 'ui_content': ..., 'app_state': ... }
-                        app_result = app_func(action="start", **call_params)
-                        
-                        # 3. Store the session state
-                        self.active_app_sessions[request_id] = {
-                            "tool_name": app_name,
-                            "function": app_func,
-                            "state": app_result.get('app_state', {}),
-                            "auth_token": auth_token,
-                        }
-                        
-                        # 4. Send the initial UI back to the server
-                        self._send_app_response(ws, request_id, app_result.get('ui_content', {}))
-                        
-                    except Exception as e:
-                        error_result = {"error": f"App initialization failed: {e}"}
-                        self._send_app_response(ws, request_id, error_result)
-                        logger.error(f"App '{app_name}' init error: {e}", exc_info=True)
-                else:
-                    logger.warning(f"Unknown app requested: {app_name}")
+                self._schedule_app_message(
+                    payload.get("request_id"),
+                    self._start_app_session,
+                    payload.get("tool_name"),
+                    payload.get("params", {}),
+                    payload.get("auth_token"),
+                    partial(self._send_app_response, ws),
+                )
 
             elif message_type == "atp_app_action":
                 # Message for user interaction within an active app session
-                request_id = payload.get("request_id")
-                action_data = payload.get("action_data") # User action details (e.g., button_id, form_data)
-
-                logger.info(f"Received APP ACTION for session ID: {request_id} with action: {action_data}")
-
-                if request_id in self.active_app_sessions:
-                    session = self.active_app_sessions[request_id]
-                    app_func = session["function"]
-                    current_state = session["state"]
-                    auth_token = session["auth_token"]
-                    
-                    try:
-                        # 1. Call the app function with the action and current state
-                        # It should return { 'ui_content': ..., 'app_state': ... }
-                        app_result = app_func(
-                            action="user_action", 
-                            action_data=action_data, 
-                            current_state=current_state,
-                            auth_token=auth_token # Pass token if the app function accepts it
-                        )
-                        
-                        # 2. Update the session state
-                        session["state"] = app_result.get('app_state', current_state)
-                        
-                        # 3. Send the updated UI back to the server
-                        self._send_app_response(ws, request_id, app_result.get('ui_content', {}))
-                        
-                        # Optional: If the app terminates itself, delete the session:
-                        if app_result.get('terminate', False):
-                            del self.active_app_sessions[request_id]
-                            logger.info(f"App session {request_id} terminated by app logic.")
-
-                    except Exception as e:
-                        error_result = {"error": f"App action processing failed: {e}"}
-                        self._send_app_response(ws, request_id, error_result)
-                        logger.error(f"App action error for {request_id}: {e}", exc_info=True)
+                self._schedule_app_message(
+                    payload.get("request_id"),
+                    self._handle_app_action,
+                    payload.get("action_data"),  # User action details (e.g., button_id, form_data)
+                    partial(self._send_app_response, ws),
+                )
 
-                else:
-                    logger.warning(f"Received action for unknown session ID: {request_id}")
-                    
             elif message_type == "atp_app_terminate":
                 # Message from server to explicitly terminate a session
-                request_id = payload.get("request_id")
-                if request_id in self.active_app_sessions:
-                    del self.active_app_sessions[request_id]
-                    logger.info(f"App session {request_id} terminated by server request.")
-                
+                self._schedule_app_message(payload.get("request_id"), self._terminate_app_session)
+
             # --- END: Interactive App Session ---
 
             else:
@@ -602,113 +1656,476 @@ class ToolKitClient:
         except Exception as e:
             logger.info(f"Error handling WebSocket message: {e}")
 
+    def _build_call_params(self, func, params, auth_token=None):
+        """
+        Prepare the keyword arguments for a tool call.
+
+        `auth_token` is only injected when the function declares it or accepts **kwargs.
+        """
+        call_params = dict(params or {})
+        if auth_token:
+            sig = inspect.signature(func)
+            if "auth_token" in sig.parameters or any(
+                p.kind == inspect.Parameter.VAR_KEYWORD for p in sig.parameters.values()
+            ):
+                call_params["auth_token"] = auth_token
+        return call_params
+
+    def _execute_tool(self, tool_name, params, auth_token=None):
+        """
+        Run a registered tool and return its result.
+
+        Returns:
+            The tool result, or {"error": ...} if the tool raised.
+        """
+        func = self.registered_tools[tool_name]["function"]
+        try:
+            with self._tracked_call():
+                result = func(**self._build_call_params(func, params, auth_token))
+                if inspect.isawaitable(result):
+                    result = self.run_coroutine(result)
+            return result
+        except Exception as e:
+            logger.error(f"Error executing tool {tool_name}: {e}", exc_info=True)
+            return {"error": str(e)}
+
+    async def _execute_tool_async(self, tool_name, params, auth_token=None):
+        """
+        Await a registered `async def` tool and return its result.
+
+        Returns:
+            The tool result, or {"error": ...} if the tool raised.
+        """
+        func = self.registered_tools[tool_name]["function"]
+        try:
+            with self._tracked_call():
+                return await func(**self._build_call_params(func, params, auth_token))
+        except Exception as e:
+            logger.error(f"Error executing tool {tool_name}: {e}", exc_info=True)
+            return {"error": str(e)}
+
+    def _ensure_loop(self):
+        """Return the client's asyncio event loop, starting it in a background thread on first use."""
+        with self._loop_lock:
+            if self.loop is None or self.loop.is_closed():
+                self.loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._run_event_loop,
+                    args=(self.loop,),
+                    name="atp-asyncio",
+                    daemon=True,
+                )
+                self._loop_thread.start()
+            return self.loop
+
+    @staticmethod
+    def _run_event_loop(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def run_coroutine(self, coro, timeout=None):
+        """
+        Run a coroutine on the client's event loop and wait for its result.
+
+        Useful to call `async def` tools from synchronous code, e.g. framework views.
+
+        Args:
+            coro: The coroutine to run.
+            timeout (float, optional): Seconds to wait for the result. Defaults to None (no limit).
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+
+    def _submit(self, job, on_done=None):
+        """
+        Submit a job without blocking the caller.
+
+        Sync tools run on the executor; `async def` tools are scheduled on the client's
+        event loop, so many I/O-bound calls can be in flight on a single thread.
+
+        Args:
+            job (_ToolJob): The job to start.
+            on_done (callable, optional): Called without arguments once the job has finished.
+
+        Returns:
+            bool: False if the pool and its queue are full and the job was rejected.
+        """
+        admission = self._async_admission if job.is_async else self._admission
+        if not admission.acquire(blocking=False):
+            return False
+        try:
+            if job.is_async:
+                future = asyncio.run_coroutine_threadsafe(job.run(), self._ensure_loop())
+            else:
+                future = self.executor.submit(job.run)
+        except RuntimeError as e:
+            # Executor has been shut down
+            admission.release()
+            logger.error(f"Failed to submit job to tool executor: {e}")
+            return False
+        future.add_done_callback(partial(self._on_job_done, admission, on_done))
+        return True
+
+    def _on_job_done(self, admission, on_done, future):
+        """Release the admission slot of a finished job and log unexpected failures."""
+        admission.release()
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Unhandled error in tool job: {future.exception()}")
+        if on_done:
+            on_done()
+
+    def _dispatch_tool_request(self, request_id, tool_name, params, auth_token, respond):
+        """
+        Run a tool request on the worker pool and deliver its result with `respond`.
+
+        Per-tool limits registered via `register_tool` are enforced here; rejected calls
+        are answered right away with a busy error instead of waiting for a thread.
+
+        Args:
+            request_id (str): ID of the request, echoed back in the response.
+            tool_name (str): Name of the registered tool.
+            params (dict): Tool parameters.
+            auth_token (str): Optional auth token for the tool.
+            respond (callable): Called as respond(request_id, result) once the tool finishes.
+        """
+        if tool_name not in self.registered_tools:
+            logger.info(f"Unknown tool requested: {tool_name}")
+            return
+
+        if self.registered_tools[tool_name].get("is_async"):
+            async def run():
+                result = await self._execute_tool_async(tool_name, params, auth_token)
+                # Responding does blocking I/O, keep it off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    None, respond, request_id, result
+                )
+        else:
+            def run():
+                respond(request_id, self._execute_tool(tool_name, params, auth_token))
+
+        limiter = self.tool_limiters.get(tool_name)
+        job = _ToolJob(
+            request_id=request_id,
+            run=run,
+            reject=lambda reason: respond(
+                request_id, self._busy_error(tool_name, reason)
+            ),
+            is_async=self.registered_tools[tool_name].get("is_async", False),
+        )
+
+        if limiter is None:
+            if not self._submit(job):
+                self._reject_job(tool_name, job, "pool_full")
+            return
+
+        admission = limiter.admit(job)
+        if admission == "run":
+            self._start_limited_job(tool_name, limiter, job)
+        elif admission == "busy":
+            self._reject_job(tool_name, job, "queue_full")
+        else:
+            logger.info(f"Queued request {request_id} for '{tool_name}' (tool at max concurrency)")
+
+    def _start_limited_job(self, tool_name, limiter, job):
+        """Submit a job that holds a slot of `limiter`, handing the slot on when it finishes."""
+        release = partial(self._release_tool_slot, tool_name, limiter)
+        if not self._submit(job, on_done=release):
+            self._reject_job(tool_name, job, "pool_full")
+            release()
+
+    def _release_tool_slot(self, tool_name, limiter):
+        """Free a tool slot, starting the next queued call and failing expired ones."""
+        next_job, expired = limiter.release()
+        for job in expired:
+            self._reject_job(tool_name, job, "queue_timeout")
+        if next_job is not None:
+            self._start_limited_job(tool_name, limiter, next_job)
+
+    def _reject_job(self, tool_name, job, reason):
+        logger.warning(f"Rejecting request {job.request_id} for '{tool_name}': {reason}")
+        try:
+            job.reject(reason)
+        except Exception as e:
+            logger.error(f"Failed to send busy response for {job.request_id}: {e}")
+
+    def _busy_error(self, tool_name, reason):
+        """Build the structured error returned when a call is rejected by admission control."""
+        return {
+            "error": f"Tool '{tool_name}' is busy, the request was not executed. Try again later.",
+            "code": "tool_busy",
+            "tool_name": tool_name,
+            "reason": reason,  # "pool_full", "queue_full" or "queue_timeout"
+        }
+
+    def _start_queue_reaper(self):
+        """Start the thread that fails queued calls whose `queue_timeout` has passed."""
+        if self._reaper_thread and self._reaper_thread.is_alive():
+            return
+        self._reaper_thread = threading.Thread(target=self._reap_queued_calls, daemon=True)
+        self._reaper_thread.start()
+
+    def _stop_queue_reaper(self):
+        """Stop the queue reaper thread and wait for it to exit."""
+        self._reaper_stop.set()
+        reaper = self._reaper_thread
+        if reaper and reaper is not threading.current_thread():
+            reaper.join(timeout=1)
+
+    def _resume_queue_reaper(self):
+        """Restart the queue reaper after a stop() if any tool has a `queue_timeout`."""
+        self._reaper_stop.clear()
+        if any(limiter.queue_timeout is not None for limiter in list(self.tool_limiters.values())):
+            self._start_queue_reaper()
+
+    def _reap_queued_calls(self):
+        while not self._reaper_stop.wait(0.25):
+            for tool_name, limiter in list(self.tool_limiters.items()):
+                for job in limiter.expire():
+                    self._reject_job(tool_name, job, "queue_timeout")
+
+    def _send_tool_response(self, ws, request_id, result):
+        """
+        Send a tool result back to the server via WebSocket.
+        """
+        try:
+            message = json.dumps(
+                {"type": "tool_response", "request_id": request_id, "result": result}
+            )
+        except (TypeError, ValueError) as e:
+            message = json.dumps(
+                {
+                    "type": "tool_response",
+                    "request_id": request_id,
+                    "result": {"error": f"Tool result is not JSON serializable: {e}"},
+                }
+            )
+        try:
+            with self._send_lock:
+                ws.send(message)
+        except Exception as e:
+            logger.error(f"Failed to send tool response for {request_id}: {e}")
+
     def _watch_idle(self):
         """Monitor for inactivity and close the connection if idle for too long."""
         while self.running:
+            self.active_app_sessions.evict_expired()
             if time.time() - self.last_activity_time > self.idle_timeout:
                 logger.info("WebSocket idle timeout reached. Closing connection...")
                 self.stop()
                 break
             time.sleep(10)  # Check every 10 seconds
 
-    def _send_app_response(self, ws, request_id, result):
+    def _send_app_response(self, ws, request_id, result):
+        """
+        Send the result of an app interaction (new UI state) back to the server via WebSocket.
+        """
+        response_payload = {
+            "type": "app_response", 
+            "request_id": request_id, 
+            "result": result
+        }
+        try:
+            message = to_json(response_payload)  # reuses the cached JSON of unchanged components
+            with self._send_lock:
+                ws.send(message)
+            logger.info(f"App response sent for request_id: {request_id}")
+        except Exception as e:
+            logger.error(f"Failed to send app response for {request_id}: {e}")
+
+
+
+    def _schedule_app_message(self, request_id, handler, *args):
+        """
+        Run `handler(request_id, *args)` on the worker pool after the session's earlier
+        messages, so actions of one session never race on its state.
+        """
+        self.app_scheduler.submit(request_id, partial(handler, request_id, *args))
+
+    def _call_app(self, app_func, **kwargs):
+        """Call an app function; `async def` apps are awaited on the client's event loop, like async tools."""
+        result = app_func(**kwargs)
+        if inspect.iscoroutine(result):
+            result = self.run_coroutine(result)
+        return result
+
+    def _start_app_session(self, request_id, app_name, initial_params, auth_token, respond):
+        """
+        Start an interactive app session and send its initial UI with `respond(request_id, ui)`.
+        """
+        logger.info(f"Received APP START request for '{app_name}' (Session ID: {request_id})")
+        if app_name not in self.registered_tools:
+            logger.warning(f"Unknown app requested: {app_name}")
+            return
+
+        app_func = self.registered_tools[app_name]["function"]
+
+        # 1. Prepare initial call parameters
+        call_params = dict(initial_params or {})
+        if auth_token:
+            call_params["auth_token"] = auth_token
+
+        try:
+            # 2. Call the app's entry function.
+            # It should return { 'ui_content': ..., 'app_state': ... }
+            app_result = self._call_app(app_func, action="start", **call_params)
+
+            # 3. Store the session state
+            self.active_app_sessions.put(request_id, {
+                "tool_name": app_name,
+                "state": app_result.get('app_state', {}),
+                "auth_token": auth_token,
+            })
+
+            # 4. Send the initial UI back to the server
+            if self.ui_encoder:
+                self.ui_encoder.forget(request_id)
+            respond(request_id, self._encode_ui(request_id, app_result.get('ui_content', {})))
+
+        except Exception as e:
+            error_result = {"error": f"App initialization failed: {e}"}
+            respond(request_id, error_result)
+            logger.error(f"App '{app_name}' init error: {e}", exc_info=True)
+
+    def _handle_app_action(self, request_id, action_data, respond):
         """
-        Send the result of an app interaction (new UI state) back to the server via WebSocket.
+        Run a user action in an active app session and send the updated UI with `respond`.
         """
-        response_payload = {
-            "type": "app_response", 
-            "request_id": request_id, 
-            "result": result
-        }
+        logger.info(f"Received APP ACTION for session ID: {request_id} with action: {action_data}")
+
+        session = self.active_app_sessions.get(request_id)
+        if session is None:
+            logger.warning(f"Received action for unknown session ID: {request_id}")
+            return
+
+        tool = self.registered_tools.get(session["tool_name"])
+        if tool is None:
+            respond(request_id, {"error": f"App '{session['tool_name']}' is not registered."})
+            logger.warning(f"Action for session {request_id} of unknown app '{session['tool_name']}'")
+            return
+        app_func = tool["function"]
+        current_state = session["state"]
+        auth_token = session["auth_token"]
+        if self.ui_encoder and isinstance(action_data, dict) and action_data.get("ui_resync"):
+            self.ui_encoder.reset(request_id)  # the receiver lost track of the UI version
+
+        if is_window_action(action_data):
+            self._send_table_window(request_id, action_data, current_state, respond)
+            return
+
         try:
-            ws.send(json.dumps(response_payload))
-            logger.info(f"App response sent for request_id: {request_id}")
-        except Exception as e:
-            logger.error(f"Failed to send app response for {request_id}: {e}")
+            # 1. Call the app function with the action and current state
+            # It should return { 'ui_content': ..., 'app_state': ... }
+            app_result = self._call_app(
+                app_func,
+                action="user_action",
+                action_data=action_data,
+                current_state=current_state,
+                auth_token=auth_token # Pass token if the app function accepts it
+            )
 
+            # 2. Update the session state
+            self.active_app_sessions.update_state(
+                request_id, app_result.get('app_state', current_state)
+            )
 
+            # 3. Send the updated UI back to the server
+            respond(request_id, self._encode_ui(request_id, app_result.get('ui_content', {})))
 
-    def _handle_app_request_http(self, req):
-        """Handle the start of a new app session via HTTP polling."""
-        # This mirrors the 'atp_app_request' part of the revised on_message, 
-        # but uses the HTTP response method.
-        request_id = req.get("request_id")
-        app_name = req.get("tool_name")
-        initial_params = req.get("params", {})
-        auth_token = req.get("auth_token")
+            # Optional: If the app terminates itself, delete the session:
+            if app_result.get('terminate', False):
+                self.active_app_sessions.pop(request_id)
+                if self.ui_encoder:
+                    self.ui_encoder.forget(request_id)
+                logger.info(f"App session {request_id} terminated by app logic.")
 
-        if app_name in self.registered_tools:
-            app_func = self.registered_tools[app_name]["function"]
-            call_params = initial_params.copy()
-            if auth_token:
-                call_params["auth_token"] = auth_token
-            
-            try:
-                # App logic call
-                app_result = app_func(action="start", **call_params)
-                
-                # Store state
-                self.active_app_sessions[request_id] = {
-                    "tool_name": app_name,
-                    "function": app_func,
-                    "state": app_result.get('app_state', {}),
-                    "auth_token": auth_token,
-                }
-                
-                # Use HTTP to send the initial UI response (app_response payload)
-                self._send_tool_result_inbox(request_id, app_result.get('ui_content', {}))
-                
-            except Exception as e:
-                error_result = {"error": f"App initialization failed: {e}"}
-                self._send_tool_result_inbox(request_id, error_result)
-                logger.error(f"HTTP App '{app_name}' init error: {e}", exc_info=True)
+        except Exception as e:
+            error_result = {"error": f"App action processing failed: {e}"}
+            respond(request_id, error_result)
+            logger.error(f"App action error for {request_id}: {e}", exc_info=True)
+
+    def _send_table_window(self, request_id, action_data, state, respond):
+        """Answer a `table_window` action with the requested rows of a registered data table."""
+        try:
+            table_id, window_args = parse_window_action(action_data)
+        except ValueError as e:
+            respond(request_id, {"error": f"Invalid table window request: {e}", "code": "invalid_table_window"})
+            logger.warning(f"Invalid table window request for session {request_id}: {e}")
+            return
+        table = self.data_tables.get(table_id)
+        if table is None:
+            respond(request_id, {"error": f"Data table '{table_id}' is not registered.", "code": "unknown_table"})
+            logger.warning(f"Window requested for unknown data table '{table_id}' (session {request_id})")
+            return
+        if not table.sortable(window_args["sort_key"]):
+            respond(request_id, {
+                "error": f"Data table '{table_id}' cannot be sorted by {window_args['sort_key']!r}.",
+                "code": "invalid_table_window",
+            })
+            return
+        try:
+            window = table.window(state=state, **window_args)
+        except Exception as e:
+            respond(request_id, {"error": f"Data table '{table_id}' failed: {e}", "code": "table_window_failed"})
+            logger.error(f"Data table '{table_id}' error for {request_id}: {e}", exc_info=True)
+            return
+        respond(request_id, {"table_window": window})
+
+    def _encode_ui(self, request_id, ui_content):
+        """Return the UI payload to send: the tree itself, or a snapshot/delta message with `ui_delta`."""
+        if not self.ui_encoder:
+            return ui_content
+        return self.ui_encoder.encode(request_id, ui_content)
+
+    def _terminate_app_session(self, request_id):
+        """Drop an app session the server terminated."""
+        if self.ui_encoder:
+            self.ui_encoder.forget(request_id)
+        if self.active_app_sessions.pop(request_id) is not None:
+            logger.info(f"App session {request_id} terminated by server request.")
+
+    def _on_app_session_evicted(self, request_id, session, reason):
+        """Tell the server that an app session was dropped because it expired or the store was full."""
+        if self.ui_encoder:
+            self.ui_encoder.forget(request_id)
+        result = {
+            "error": f"App session ended ({reason}).",
+            "code": "app_session_evicted",
+            "reason": reason,
+            "terminate": True,
+        }
+        if self.protocol.startswith("http"):
+            self._respond_inbox(request_id, result)
+        elif self.ws:
+            self._send_app_response(self.ws, request_id, result)
 
+    def _handle_app_request_http(self, req):
+        """Handle the start of a new app session via HTTP polling."""
+        self._schedule_app_message(
+            req.get("request_id"),
+            self._start_app_session,
+            req.get("tool_name"),
+            req.get("params", {}),
+            req.get("auth_token"),
+            self._respond_inbox,
+        )
 
     def _handle_app_action_http(self, req):
         """Handle a user action within an active app session via HTTP polling."""
-        # This mirrors the 'atp_app_action' part of the revised on_message.
-        request_id = req.get("request_id")
-        action_data = req.get("action_data")
-
-        if request_id in self.active_app_sessions:
-            session = self.active_app_sessions[request_id]
-            app_func = session["function"]
-            current_state = session["state"]
-            auth_token = session["auth_token"]
-            
-            try:
-                # App logic call
-                app_result = app_func(
-                    action="user_action", 
-                    action_data=action_data, 
-                    current_state=current_state,
-                    auth_token=auth_token
-                )
-                
-                # Update state
-                session["state"] = app_result.get('app_state', current_state)
-                
-                # Use HTTP to send the updated UI response
-                self._send_tool_result_inbox(request_id, app_result.get('ui_content', {}))
-                
-                # Clean up if app terminates
-                if app_result.get('terminate', False):
-                    del self.active_app_sessions[request_id]
-                    logger.info(f"HTTP App session {request_id} terminated by app logic.")
-
-            except Exception as e:
-                error_result = {"error": f"App action processing failed: {e}"}
-                self._send_tool_result_inbox(request_id, error_result)
-                logger.error(f"HTTP App action error for {request_id}: {e}", exc_info=True)
-        else:
-            logger.warning(f"Received action for unknown HTTP session ID: {request_id}")
+        self._schedule_app_message(
+            req.get("request_id"), self._handle_app_action, req.get("action_data"), self._respond_inbox
+        )
 
     def _handle_app_terminate_http(self, req):
         """Handle server-side termination of an app session."""
-        request_id = req.get("request_id")
-        if request_id in self.active_app_sessions:
-            del self.active_app_sessions[request_id]
-            logger.info(f"HTTP App session {request_id} terminated by server request.")
+        self._schedule_app_message(req.get("request_id"), self._terminate_app_session)
+
+    def _post_json(self, url, payload, timeout):
+        """POST `payload` as JSON, reusing the cached JSON of `atp_ui` components and nodes."""
+        return self.session.post(
+            url,
+            data=to_json(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
 
     def _send_tool_result_http(self, request_id, result):
         """
@@ -717,7 +2134,7 @@ class ToolKitClient:
         if not self.endpoint_url:
             raise ValueError("No endpoint_url configured for HTTP mode.")
         payload = {"request_id": request_id, "result": result}
-        resp = requests.post(self.endpoint_url, json=payload, timeout=30)
+        resp = self._post_json(self.endpoint_url, payload, timeout=30)
         resp.raise_for_status()
         return resp.json()
 
@@ -731,7 +2148,7 @@ class ToolKitClient:
             f"Sending result to inbox: request_id={request_id}, result={result}"
         )
         try:
-            resp = requests.post(url, json=payload, timeout=30)
+            resp = self._post_json(url, payload, timeout=30)
             logger.info(
                 f"Inbox response: status={resp.status_code}, content={resp.text}"
             )
@@ -741,28 +2158,61 @@ class ToolKitClient:
             logger.error(f"Error sending result to inbox: {e}")
             raise
 
-    def poll_inbox_for_requests(self):
+    def _send_tool_results_inbox_batch(self, responses):
         """
-        Poll the ATP server for pending tool requests.
+        Send several inbox results in one `inbox/respond/batch` post, falling back to one
+        post per result when the server does not support batches.
+
+        Args:
+            responses (list): Items of the form {"request_id": ..., "response": ...}.
         """
+        if self._inbox_batch_supported:
+            url = f"{self.base_url}/api/v1/toolkit/{self.api_key}/inbox/respond/batch"
+            logger.info(f"Sending {len(responses)} result(s) to inbox in one batch")
+            try:
+                resp = self._post_json(url, {"responses": responses}, timeout=30)
+                if resp.status_code in (404, 405):
+                    logger.info(
+                        "Server does not support batched inbox responses, sending them one by one"
+                    )
+                    self._inbox_batch_supported = False
+                else:
+                    resp.raise_for_status()
+                    return
+            except requests.RequestException as e:
+                logger.error(f"Error sending batched results to inbox: {e}")
+
+        for item in responses:
+            self._respond_inbox_now(item["request_id"], item["response"])
+
+    def _respond_inbox_now(self, request_id, result):
+        try:
+            self._send_tool_result_inbox(request_id, result)
+            logger.info(f"Sent result for request_id={request_id} to inbox")
+        except requests.RequestException:
+            pass  # already logged by _send_tool_result_inbox
+
+    def _respond_inbox(self, request_id, result):
+        """Send a result to the inbox from a worker thread, logging instead of raising."""
+        if self.inbox_batcher:
+            self.inbox_batcher.add(request_id, result)
+        else:
+            self._respond_inbox_now(request_id, result)
+
+    def _fetch_inbox(self, params, wait=None):
+        """GET the inbox and return the decoded body, or None when nothing usable came back."""
         url = f"{self.base_url}/api/v1/toolkit/{self.api_key}/inbox"
-        logger.info(f"Polling inbox at {url}")
+        logger.debug(f"Polling inbox at {url}")
+        if wait:
+            params = dict(params, wait=wait)
         try:
-            resp = requests.get(url, timeout=30)
-            logger.info(
+            resp = self.session.get(url, params=params or None, timeout=(wait or 0) + 30)
+            logger.debug(
                 f"Inbox poll response: status={resp.status_code}, content={resp.text}"
             )
             if resp.status_code == 200:
                 try:
-                    response_data = resp.json()
-                    if response_data:
-                        logger.info(
-                            f"Received inbox request: {json.dumps(response_data, indent=2)}"
-                        )
-                        return response_data
-                    else:
-                        logger.debug("Inbox is empty")
-                        return None
+                    return resp.json()
                 except json.JSONDecodeError as e:
                     logger.error(
                         f"Failed to parse inbox response JSON: {e}, response={resp.text}"
@@ -777,6 +2227,70 @@ class ToolKitClient:
             logger.error(f"Error polling inbox: {e}")
             return None
 
+    def poll_inbox_for_requests(self, wait=None):
+        """
+        Poll the ATP server for pending tool requests.
+
+        Args:
+            wait (float, optional): Ask the server to hold the request open for up to `wait`
+                seconds until work arrives (long-poll). Defaults to None (return immediately).
+        """
+        response_data = self._fetch_inbox({}, wait=wait)
+        if response_data:
+            logger.info(f"Received inbox request: {json.dumps(response_data, indent=2)}")
+            return response_data
+        logger.debug("Inbox is empty")
+        return None
+
+    def poll_inbox_batch(self, limit=None, wait=None):
+        """
+        Claim up to `limit` pending tool requests in a single inbox poll.
+
+        Args:
+            limit (int, optional): Maximum number of requests to claim. Defaults to `inbox_batch_size`.
+            wait (float, optional): Long-poll timeout in seconds, as for `poll_inbox_for_requests`.
+
+        Returns:
+            list: The claimed requests, empty when the inbox is empty.
+        """
+        response_data = self._fetch_inbox(
+            {"limit": limit or self.inbox_batch_size}, wait=wait
+        )
+        requests_batch = self._normalize_inbox_batch(response_data)
+        if requests_batch:
+            logger.info(f"Received {len(requests_batch)} inbox request(s)")
+        else:
+            logger.debug("Inbox is empty")
+        return requests_batch
+
+    @staticmethod
+    def _normalize_inbox_batch(response_data):
+        """Accept a list, a {"requests": [...]} envelope, or a single request (older servers)."""
+        if not response_data:
+            return []
+        if isinstance(response_data, list):
+            return [req for req in response_data if req]
+        if "requests" in response_data:
+            return [req for req in response_data["requests"] or [] if req]
+        return [response_data]
+
+    def _handle_inbox_request(self, req):
+        request_id = req.get("request_id")
+        tool_name = req.get("tool_name")
+        params = req.get("params", {})
+        auth_token = req.get("auth_token")
+        logger.info(
+            f"Processing inbox request: request_id={request_id}, tool_name={tool_name}, params={params}, auth_token={'<hidden>' if auth_token else None}"
+        )
+
+        if tool_name in self.registered_tools:
+            logger.info(f"Found registered tool: {tool_name}")
+            self._dispatch_tool_request(
+                request_id, tool_name, params, auth_token, self._respond_inbox
+            )
+        else:
+            logger.warning(f"Tool {tool_name} not found in registered tools")
+
     def _poll_inbox_loop(self):
         """
         Poll the ATP server for pending tool requests (Inbox Mode).
@@ -784,69 +2298,59 @@ class ToolKitClient:
         logger.info("Starting inbox polling loop")
         while self.running:
             try:
-                req = self.poll_inbox_for_requests()
-                if req:
-                    request_id = req.get("request_id")
-                    tool_name = req.get("tool_name")
-                    params = req.get("params", {})
-                    auth_token = req.get("auth_token")
-                    logger.info(
-                        f"Processing inbox request: request_id={request_id}, tool_name={tool_name}, params={params}, auth_token={'<hidden>' if auth_token else None}"
-                    )
-
-                    if tool_name in self.registered_tools:
-                        logger.info(f"Found registered tool: {tool_name}")
-                        func = self.registered_tools[tool_name]["function"]
-                        sig = inspect.signature(func)
-                        try:
-                            call_params = params.copy()
-                            if auth_token and (
-                                "auth_token" in sig.parameters
-                                or any(
-                                    p.kind == inspect.Parameter.VAR_KEYWORD
-                                    for p in sig.parameters.values()
-                                )
-                            ):
-                                call_params["auth_token"] = auth_token
-                                logger.debug(
-                                    f"Added auth_token to call parameters for {tool_name}"
-                                )
-                            logger.info(
-                                f"Executing tool {tool_name} with params: {call_params}"
-                            )
-                            result = func(**call_params)
-                            logger.info(
-                                f"Tool {tool_name} executed successfully, result: {result}"
-                            )
-                            self._send_tool_result_inbox(request_id, result)
-                            logger.info(
-                                f"Sent result for request_id={request_id} to inbox"
-                            )
-                        except Exception as e:
-                            logger.error(
-                                f"Error executing tool {tool_name}: {e}", exc_info=True
-                            )
-                            error_result = {"error": str(e)}
-                            self._send_tool_result_inbox(request_id, error_result)
-                    else:
-                        logger.warning(
-                            f"Tool {tool_name} not found in registered tools"
-                        )
+                started = time.monotonic()
+                batch = self.poll_inbox_batch(wait=self.inbox_wait)
+                if batch:
+                    self.last_activity_time = time.time()
+                    for req in batch:
+                        self._handle_inbox_request(req)
                 else:
                     logger.debug("No pending requests in inbox")
-                time.sleep(30)  # Poll every 30 seconds
+                delay = self._next_inbox_poll_delay(bool(batch), time.monotonic() - started)
+                if delay:
+                    self._transport_stop.wait(delay)
             except Exception as e:
                 logger.error(f"Inbox polling loop error: {e}", exc_info=True)
-                time.sleep(30)  # Wait 30 seconds after an error
+                self._transport_stop.wait(self.max_poll_interval)  # Wait longer after an error
+
+    def _next_inbox_poll_delay(self, found_work, elapsed):
+        """
+        Decide how long to wait before the next inbox poll.
+
+        After a hit, or when the server held a long-poll open, the inbox is polled again
+        right away. Otherwise the server answered immediately with nothing to do, so the
+        interval doubles up to `max_poll_interval` while idle.
+
+        Args:
+            found_work (bool): Whether the last poll returned a request.
+            elapsed (float): Seconds the last poll took.
+
+        Returns:
+            float: Seconds to sleep before polling again.
+        """
+        if found_work or (self.inbox_wait and elapsed >= self.inbox_wait * 0.8):
+            self._poll_interval = self.min_poll_interval
+            return 0
+        delay = self._poll_interval
+        self._poll_interval = min(self._poll_interval * 2, self.max_poll_interval)
+        return delay
 
     def start(self):
         """
         Start the WebSocket client and listen for tool requests.
         """
+        self._ensure_executor()
+        if self.inbox_batcher:
+            self.inbox_batcher.open()
+        if self._registration_pending:
+            self.register_toolkit()
+        self._resume_queue_reaper()
+
         # Start idle watcher thread
         idle_thread = threading.Thread(target=self._watch_idle, daemon=True)
         idle_thread.start()
         self.running = True
+        self._transport_stop.clear()
 
         # Start file watcher if auto-restart is enabled
         if self.file_watcher:
@@ -868,7 +2372,7 @@ class ToolKitClient:
         elif self.base_url.startswith("http://"):
             ws_url = self.base_url.replace("http://", "ws://")
         url = f"{ws_url}/ws/v1/atp/toolkit-client/{self.api_key}/"
-        while True:
+        while not self._transport_stop.is_set():
             try:
                 logger.info(f"Connecting to: {url}")
                 self.ws = websocket.WebSocketApp(
@@ -878,12 +2382,16 @@ class ToolKitClient:
                     on_error=on_error,
                     on_close=on_close,
                 )
+                if self._transport_stop.is_set():  # stop() ran before this socket existed
+                    break
                 self.ws.run_forever(ping_interval=30)
+                if self._transport_stop.is_set():
+                    break
                 logger.warning("WebSocket disconnected. Reconnecting in 5 seconds...")
             except Exception as e:
                 logger.exception("Exception in WebSocket thread")
 
-                time.sleep(5)  # delay before trying again
+            self._transport_stop.wait(5)  # delay before trying again
 
     def _run_http_loop(self):
         """Poll the ATP server for incoming tool requests over HTTP."""
@@ -892,7 +2400,7 @@ class ToolKitClient:
 
         while self.running:
             try:
-                resp = requests.get(url, timeout=60)  # long-poll up to 60s
+                resp = self.session.get(url, timeout=60)  # long-poll up to 60s
                 if resp.status_code == 200:
                     data = resp.json()
                     if data:
@@ -916,30 +2424,13 @@ class ToolKitClient:
                 params = payload.get("params", {})
                 auth_token = payload.get("auth_token")
 
-                if tool_name in self.registered_tools:
-                    tool_data = self.registered_tools[tool_name]
-                    func = tool_data["function"]
-                    sig = inspect.signature(func)
-
-                    try:
-                        call_params = params.copy()
-                        if auth_token and (
-                            "auth_token" in sig.parameters
-                            or any(
-                                p.kind == inspect.Parameter.VAR_KEYWORD
-                                for p in sig.parameters.values()
-                            )
-                        ):
-                            call_params["auth_token"] = auth_token
-
-                        result = func(**call_params)
-                        self._report_execution(tool_name, result)
-
-                    except Exception as e:
-                        error_result = {"error": str(e)}
-                        self._report_execution(tool_name, error_result)
-                else:
-                    logger.warning(f"Unknown tool requested: {tool_name}")
+                self._dispatch_tool_request(
+                    request_id,
+                    tool_name,
+                    params,
+                    auth_token,
+                    lambda _request_id, result: self._report_execution(tool_name, result),
+                )
             else:
                 logger.info(f"Unknown HTTP message type: {message_type}")
         except Exception as e:
@@ -960,15 +2451,27 @@ class ToolKitClient:
         Stop the WebSocket client and close the connection.
         """
         self.running = False
+        self._stop_queue_reaper()
 
         # Stop file watcher
         if self.file_watcher:
             self.file_watcher.stop()
 
+        # Deliver inbox results still waiting for their batch and stop the flush thread
+        if self.inbox_batcher:
+            self.inbox_batcher.close()
+
+        self._transport_stop.set()
         if self.ws:
             self.ws.close()
-        if self.ws_thread:
-            self.ws_thread.join()
+        if self.ws_thread and self.ws_thread is not threading.current_thread():
+            # An inbox long-poll in flight is not interrupted; don't wait for it
+            self.ws_thread.join(timeout=5)
+            if self.ws_thread.is_alive():
+                logger.warning("Transport thread still busy after stop(); leaving it to finish")
+        self._shutdown_executor()
+        if self.registration_cache:
+            self.registration_cache.flush()  # write out the used exchange tokens now
         logger.info("WebSocket connection stopped.")
 
 
@@ -1003,6 +2506,10 @@ class LLMClient:
         protocol: str = "https",
         base_url: str = "https://api.chat-atp.com",
         idle_timeout: int = 300,
+        max_parallel_calls: int = 8,
+        session: Optional[requests.Session] = None,
+        http_pool_size: Optional[int] = None,
+        http_max_retries: int = 3,
     ):
         """
         Initialize the LLMClient.
@@ -1013,18 +2520,38 @@ class LLMClient:
                           Defaults to "https".
             base_url (str): Server URL. Defaults to "https://api.chat-atp.com".
             idle_timeout (int): Idle timeout in seconds. Defaults to 300.
+            max_parallel_calls (int): Maximum number of HTTP tool calls sent concurrently by
+                          a non-sequential `call_tool`. Defaults to 8; 1 disables fan-out.
+            session (requests.Session, optional): HTTP session used for all requests; it is left
+                          open by `close()`. Defaults to a pooled keep-alive session from
+                          `create_http_session`, closed by `close()`.
+            http_pool_size (int, optional): Connection pool size of the default session.
+                          Defaults to `max(10, max_parallel_calls)`.
+            http_max_retries (int): Retries of the default session for connection errors and
+                          502/503/504 responses. Defaults to 3.
         """
         self.api_key = api_key
         self.protocol = protocol.lower()
         self.base_url = base_url.rstrip("/")
         self.idle_timeout = idle_timeout
         self.last_activity_time = time.time()
+        self.max_parallel_calls = max_parallel_calls
+        self._http_executor = None
+        self._owns_session = session is None
+        self.session = session or create_http_session(
+            pool_size=http_pool_size or max(10, max_parallel_calls),
+            max_retries=http_max_retries,
+        )
 
         # Connection management
         self.ws = None
         self.lock = threading.Lock()
-        self.response_data = {}
         self.authenticated = False
+        self._auth_event = threading.Event()
+        # Correlation table: each in-flight WebSocket request waits on its own future. Keyed by
+        # connection, so a closing socket only fails the requests that were sent over it
+        self._pending: Dict[websocket.WebSocketApp, Dict[str, Future]] = {}
+        self._pending_lock = threading.Lock()
 
         # Initialize based on protocol
         if self.protocol in ["ws", "wss"]:
@@ -1051,6 +2578,28 @@ class LLMClient:
         """Initialize HTTP-specific attributes."""
         self.http_url = f"{self.base_url}/api/v1/atp/llm-client/"
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        Close the WebSocket connection, shut down the HTTP fan-out pool after the calls in
+        flight finish, and close the HTTP session unless it was passed in.
+        """
+        with self.lock:
+            ws, self.ws = self.ws, None
+            self.authenticated = False
+            executor, self._http_executor = self._http_executor, None
+        if ws is not None:
+            ws.close()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if self._owns_session:
+            self.session.close()
+
     def _connect(self):
         """Establish a WebSocket connection with authentication."""
         with self.lock:
@@ -1062,6 +2611,7 @@ class LLMClient:
             ):
                 return
             try:
+                self._auth_event.clear()
                 self.ws = websocket.WebSocketApp(
                     self.ws_url,
                     on_open=self._on_open,
@@ -1069,16 +2619,15 @@ class LLMClient:
                     on_error=self._on_error,
                     on_close=self._on_close,
                 )
+                with self._pending_lock:
+                    self._pending[self.ws] = {}
                 ws_thread = threading.Thread(
                     target=self.ws.run_forever, kwargs={"ping_interval": 30}
                 )
                 ws_thread.daemon = True
                 ws_thread.start()
                 # Wait for authentication
-                start_time = time.time()
-                while not self.authenticated and time.time() - start_time < 10:
-                    time.sleep(0.1)
-                if not self.authenticated:
+                if not self._auth_event.wait(timeout=10) or not self.authenticated:
                     raise WebSocketException("Authentication timed out.")
             except Exception as e:
                 logger.error(f"Failed to initiate WebSocket connection: {e}")
@@ -1109,11 +2658,18 @@ class LLMClient:
                         f"Authentication failed: {data.get('error', 'Unknown error')}"
                     )
                     ws.close()
-                else:
+                elif ws is self.ws:
                     logger.info("Authentication successful.")
                     self.authenticated = True
+                self._auth_event.set()
             elif message_type in ["toolkit_context", "task_response"]:
-                self.response_data[request_id] = data
+                with self._pending_lock:
+                    future = self._pending.get(ws, {}).pop(request_id, None)
+                if future is not None:
+                    future.set_result(data)
+                else:
+                    # Caller timed out or never existed; drop it instead of keeping it forever
+                    logger.debug(f"Dropping response for unknown or expired request {request_id}")
             else:
                 logger.warning(f"Received unknown message type: {message_type}")
         except json.JSONDecodeError:
@@ -1124,23 +2680,81 @@ class LLMClient:
     def _on_error(self, ws: websocket.WebSocketApp, error: Exception):
         """Handle WebSocket errors."""
         logger.error(f"WebSocket error: {error}, type: {type(error).__name__}")
-        with self.lock:
-            self.ws = None
-            self.authenticated = False
+        self._drop_connection(ws, WebSocketException(f"WebSocket error: {error}"))
 
     def _on_close(
         self, ws: websocket.WebSocketApp, close_status_code: int, close_msg: str
     ):
         """Handle WebSocket connection closure."""
         logger.info(f"WebSocket closed with code {close_status_code}: {close_msg}")
-        with self.lock:
-            self.ws = None
-            self.authenticated = False
+        self._drop_connection(ws, WebSocketException("WebSocket connection is closed."))
+
+    def _drop_connection(self, ws: websocket.WebSocketApp, error: Exception):
+        """
+        Forget a closed or failed connection and fail the requests sent over it.
+
+        A late close or error of a replaced socket leaves the current connection alone.
+        """
+        with self._pending_lock:
+            pending = self._pending.pop(ws, {})
+        if ws is self.ws:
+            self._auth_event.set()  # a _connect() waiting for this socket fails right away
+            with self.lock:
+                if ws is self.ws:
+                    self.ws = None
+                    self.authenticated = False
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _send_ws_request(self, request_id: str, message: str) -> Future:
+        """
+        Register a waiter for `request_id` and send the request.
+
+        Returns:
+            Future: Completed by _on_message with the response frame.
+        """
+        future = Future()
+        try:
+            with self.lock:
+                ws = self.ws
+                if not ws or not ws.sock or not ws.sock.connected:
+                    raise WebSocketException("WebSocket connection is closed.")
+                with self._pending_lock:
+                    if ws not in self._pending:
+                        raise WebSocketException("WebSocket connection is closed.")
+                    self._pending[ws][request_id] = future
+                ws.send(message)
+        except Exception:
+            self._discard_pending(request_id)
+            raise
+        return future
+
+    def _wait_ws_response(self, request_id: str, future: Future, timeout: float) -> dict:
+        """
+        Wait for the response to a request sent with _send_ws_request.
+
+        Raises:
+            TimeoutError: If no response arrived within `timeout` seconds. The waiter is
+                removed, so a late response is dropped.
+        """
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Timed out waiting for response to {request_id}.")
+        finally:
+            self._discard_pending(request_id)
+
+    def _discard_pending(self, request_id: str):
+        with self._pending_lock:
+            for pending in self._pending.values():
+                pending.pop(request_id, None)
 
     def _http_request(
-        self, endpoint: str, payload: dict, method: str = "POST", stream: bool = False
+        self, endpoint: str, payload: dict, method: str = "POST", stream: bool = False,
+        timeout: Optional[float] = None,
     ):
-        """Make an HTTP request to the server."""
+        """Make an HTTP request to the server, waiting at most `timeout` seconds (None: no limit)."""
         url = f"{self.http_url}{endpoint}"
         headers = {
             "Authorization": f"ApiKey {self.api_key}",
@@ -1153,8 +2767,8 @@ class LLMClient:
 
         try:
             if stream:
-                return requests.post(url, json=payload, headers=headers, stream=True) if method == "POST" else requests.get(url, headers=headers, stream=True)
-            resp = requests.post(url, json=payload, headers=headers) if method == "POST" else requests.get(url, headers=headers)
+                return self.session.post(url, json=payload, headers=headers, stream=True, timeout=timeout) if method == "POST" else self.session.get(url, headers=headers, stream=True, timeout=timeout)
+            resp = self.session.post(url, json=payload, headers=headers, timeout=timeout) if method == "POST" else self.session.get(url, headers=headers, timeout=timeout)
             resp.raise_for_status()
             return resp.json()
         except requests.RequestException as e:
@@ -1333,21 +2947,16 @@ class LLMClient:
             }
         )
         try:
-            with self.lock:
-                if not self.ws or not self.ws.sock or not self.ws.sock.connected:
-                    raise WebSocketException("WebSocket connection is closed.")
-                self.ws.send(message)
+            future = self._send_ws_request(request_id, message)
         except Exception as e:
             logger.error(f"Error sending get_toolkit_context message: {e}")
             raise WebSocketException(f"Failed to send request: {e}")
         # Wait for response
-        timeout = 30
-        start_time = time.time()
-        while request_id not in self.response_data:
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Timed out waiting for toolkit context response.")
-            time.sleep(0.1)
-        return self.response_data.pop(request_id).get("payload", {})
+        try:
+            response = self._wait_ws_response(request_id, future, timeout=30)
+        except TimeoutError:
+            raise TimeoutError("Timed out waiting for toolkit context response.")
+        return response.get("payload", {})
 
     def _get_toolkit_context_http(
         self, toolkit_id: str, user_prompt: str, provider: str
@@ -1397,6 +3006,7 @@ class LLMClient:
         user_prompt: str = None,
         timeout: int = 120,
         sequential: bool = False,
+        total_timeout: Optional[float] = None,
     ) -> list:
         """
         Execute tool calls from LLM providers on the server.
@@ -1408,6 +3018,8 @@ class LLMClient:
             user_prompt (str, optional): Original user prompt. Defaults to None.
             timeout (int): Maximum time to wait for tool execution in seconds. Defaults to 120.
             sequential (bool): Whether to execute tool calls sequentially. Defaults to False.
+            total_timeout (float, optional): Overall deadline in seconds for all tool calls of a
+                non-sequential WebSocket batch. Defaults to None (only the per-call `timeout` applies).
         """
         if not tool_calls:
             logger.warning("No tool calls provided")
@@ -1430,6 +3042,7 @@ class LLMClient:
                     auth_token,
                     user_prompt,
                     timeout,
+                    total_timeout,
                 )
             elif self.protocol in ["http", "https"]:
                 tool_results = self._call_tool_http(
@@ -1443,6 +3056,19 @@ class LLMClient:
             else:
                 raise ValueError(f"Unsupported protocol: {self.protocol}")
 
+        return self._format_tool_results(tool_results, provider)
+
+    def _format_tool_results(self, tool_results: list, provider: str) -> list:
+        """
+        Convert raw tool results into the provider's tool result message format.
+
+        Args:
+            tool_results (list): [{"tool_call_id": str, "result": dict}, ...] as returned by the server.
+            provider (str): Provider name ("openai", "anthropic", "mistralai", "mistral").
+
+        Returns:
+            list: Messages ready to be appended to the provider conversation.
+        """
         # ✅ Standardize results for re-injection
         formatted_responses = []
 
@@ -1609,6 +3235,30 @@ class LLMClient:
 
         return formatted_calls
 
+    def _build_task_request(
+        self,
+        request_id: str,
+        toolkit_id: str,
+        tool_call: dict,
+        auth_token: str,
+        user_prompt: str,
+    ) -> dict:
+        """Build the task_request message for one formatted tool call."""
+        return {
+            "type": "task_request",
+            "request_id": request_id,
+            "toolkit_id": toolkit_id,
+            "auth_token": auth_token,
+            "user_prompt": user_prompt,
+            "api_key": self.api_key,
+            "payload": {
+                "function": tool_call["function"],
+                "parameters": tool_call["parameters"],
+                "auth_token": tool_call.get("auth_token") or auth_token,
+                "tool_call_id": tool_call["tool_call_id"]  # Use formatted tool_call_id
+            }
+        }
+
     def _call_tool_sequential(
         self,
         toolkit_id: str,
@@ -1659,48 +3309,67 @@ class LLMClient:
         auth_token: str,
         user_prompt: str,
         timeout: int,
+        total_timeout: Optional[float] = None,
     ) -> list:
-        """Execute tool calls using WebSocket."""
+        """
+        Execute tool calls using WebSocket.
+
+        All task_request frames are sent up front and the responses are collected as they
+        arrive, so independent calls overlap. Results keep the order of `formatted_calls`;
+        a call that misses its deadline gets an error result instead of failing the batch.
+
+        Args:
+            timeout (int): Seconds each call may take, counted from when it was sent.
+            total_timeout (float, optional): Overall deadline in seconds for the whole batch.
+        """
         self._connect()
         if not self.authenticated:
             raise WebSocketException("WebSocket not authenticated.")
 
-        results = []
+        start = time.monotonic()
+        sent = []  # [(request_id, future, sent_at)]
 
         for i, tool_call in enumerate(formatted_calls):
             request_id = f"task_{toolkit_id}_{i}_{str(uuid.uuid4())}"
-            payload = {
-                "type": "task_request",
-                "request_id": request_id,
-                "toolkit_id": toolkit_id,
-                "auth_token": auth_token,
-                "user_prompt": user_prompt,
-                "api_key": self.api_key,
-                "payload": {
-                    "function": tool_call["function"],
-                    "parameters": tool_call["parameters"],
-                    "auth_token": tool_call.get("auth_token") or auth_token,
-                    "tool_call_id": tool_call["tool_call_id"]  # Use formatted tool_call_id
-                }
-            }
+            payload = self._build_task_request(
+                request_id, toolkit_id, tool_call, auth_token, user_prompt
+            )
 
             try:
-                with self.lock:
-                    if not self.ws or not self.ws.sock or not self.ws.sock.connected:
-                        raise WebSocketException("WebSocket connection is closed.")
-                    self.ws.send(json.dumps(payload))
+                future = self._send_ws_request(request_id, json.dumps(payload))
             except Exception as e:
+                for sent_request_id, _, _ in sent:
+                    self._discard_pending(sent_request_id)
                 logger.error(f"Error sending task_request message: {e}")
                 raise WebSocketException(f"Failed to send request: {e}")
+            sent.append((request_id, future, time.monotonic()))
+
+        results = []
+        for i, (tool_call, (request_id, future, sent_at)) in enumerate(zip(formatted_calls, sent)):
+            deadline = sent_at + timeout
+            if total_timeout is not None:
+                deadline = min(deadline, start + total_timeout)
 
             # Wait for response
-            start_time = time.time()
-            while request_id not in self.response_data:
-                if time.time() - start_time > timeout:
-                    raise TimeoutError(f"Timed out waiting for task response {i+1}.")
-                time.sleep(0.1)
+            try:
+                response = self._wait_ws_response(
+                    request_id, future, max(0.0, deadline - time.monotonic())
+                )
+            except TimeoutError:
+                logger.error(f"Timed out waiting for task response {i+1}.")
+                results.append({
+                    "tool_call_id": tool_call["tool_call_id"],
+                    "result": {"error": f"Timed out waiting for task response {i+1}."}
+                })
+                continue
+            except WebSocketException as e:
+                logger.error(f"Task {i+1} failed: {e}")
+                results.append({
+                    "tool_call_id": tool_call["tool_call_id"],
+                    "result": {"error": str(e)}
+                })
+                continue
 
-            response = self.response_data.pop(request_id)
             if response.get("status") == "error":
                 logger.error(f"Task response error: {response.get('message')}")
                 results.append({
@@ -1724,46 +3393,50 @@ class LLMClient:
         user_prompt: str,
         timeout: int,
     ) -> list:
-        """Execute tool calls using HTTP."""
-        results = []
+        """
+        Execute tool calls using HTTP.
 
-        for i, tool_call in enumerate(formatted_calls):
+        Independent calls are sent concurrently on a pool of up to `max_parallel_calls`
+        threads. Results keep the order of `formatted_calls`.
+        """
+        def execute(indexed_call):
+            i, tool_call = indexed_call
             request_id = f"task_{toolkit_id}_{i}_{str(uuid.uuid4())}"
-            payload = {
-                "type": "task_request",
-                "request_id": request_id,
-                "toolkit_id": toolkit_id,
-                "auth_token": auth_token,
-                "user_prompt": user_prompt,
-                "payload": {
-                    "function": tool_call["function"],
-                    "parameters": tool_call["parameters"],
-                    "auth_token": tool_call.get("auth_token") or auth_token,
-                    "tool_call_id": tool_call["tool_call_id"]  # Use formatted tool_call_id
-                }
-            }
+            payload = self._build_task_request(
+                request_id, toolkit_id, tool_call, auth_token, user_prompt
+            )
 
             try:
-                response = self._http_request("process/", payload, stream=False)
+                response = self._http_request("process/", payload, stream=False, timeout=timeout)
                 if response.get("status") == "error":
                     logger.error(f"Task response error: {response.get('message')}")
-                    results.append({
+                    return {
                         "tool_call_id": tool_call["tool_call_id"],  # Use formatted tool_call_id
                         "result": {"error": response.get("message", "Unknown error")}
-                    })
-                else:
-                    results.append({
-                        "tool_call_id": tool_call["tool_call_id"],  # Use formatted tool_call_id
-                        "result": response.get("result", "")
-                    })
+                    }
+                return {
+                    "tool_call_id": tool_call["tool_call_id"],  # Use formatted tool_call_id
+                    "result": response.get("result", "")
+                }
             except Exception as e:
                 logger.error(f"Error executing tool call {i+1}: {e}")
-                results.append({
+                return {
                     "tool_call_id": tool_call["tool_call_id"],  # Use formatted tool_call_id
                     "result": {"error": str(e)}
-                })
+                }
 
-        return results
+        if len(formatted_calls) <= 1 or self.max_parallel_calls <= 1:
+            return [execute(indexed_call) for indexed_call in enumerate(formatted_calls)]
+        return list(self._get_http_executor().map(execute, enumerate(formatted_calls)))
+
+    def _get_http_executor(self) -> ThreadPoolExecutor:
+        """Return the pool used to fan out HTTP tool calls, creating it on first use."""
+        with self.lock:
+            if self._http_executor is None:
+                self._http_executor = ThreadPoolExecutor(
+                    max_workers=self.max_parallel_calls, thread_name_prefix="atp-llm-http"
+                )
+            return self._http_executor
 
     def call_tool_streaming(
         self,
@@ -1798,26 +3471,16 @@ class LLMClient:
         formatted_calls = self._format_tool_calls(tool_calls, provider)
         tool_call = formatted_calls[0]  # Support one tool call for streaming
         request_id = f"task_{toolkit_id}_{str(uuid.uuid4())}"
-        payload = {
-            "type": "task_request",
-            "request_id": request_id,
-            "toolkit_id": toolkit_id,
-            "auth_token": auth_token,
-            "user_prompt": user_prompt,
-            "payload": {
-                "function": tool_call["function"],
-                "parameters": tool_call["parameters"],
-                "auth_token": tool_call.get("auth_token") or auth_token,
-                "tool_call_id": tool_call["tool_call_id"]  # Use formatted tool_call_id
-            }
-        }
+        payload = self._build_task_request(
+            request_id, toolkit_id, tool_call, auth_token, user_prompt
+        )
 
         return self._http_stream_request("process/", payload, timeout)
 
     def _http_stream_request(self, endpoint: str, payload: dict, timeout: int):
         """Make an HTTP POST request and yield SSE events as dicts."""
         try:
-            resp = self._http_request(endpoint, payload, stream=True)
+            resp = self._http_request(endpoint, payload, stream=True, timeout=timeout)
             if resp.status_code != 200:
                 raise Exception(f"Streaming request failed: {resp.status_code} {resp.text}")
 
@@ -0,0 +1,333 @@
+"""
+OpenAPIToolkit
+"""
+
+import hashlib
+import json
+import logging
+import re
+from functools import partial
+from urllib.parse import quote
+
+from .clients import create_http_session
+
+logger = logging.getLogger(__name__)
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+def _canonical_json(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def load_openapi_spec(source, session=None):
+    """
+    Load an OpenAPI document.
+
+    Args:
+        source (dict | str): The parsed spec, a path to a .json/.yaml file, or an http(s) URL.
+        session (requests.Session, optional): Session used to download URLs.
+
+    Returns:
+        dict: The parsed spec.
+    """
+    if isinstance(source, dict):
+        return source
+    if source.startswith(("http://", "https://")):
+        resp = (session or create_http_session()).get(source, timeout=30)
+        resp.raise_for_status()
+        text = resp.text
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            text = f.read()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            "YAML OpenAPI specs require PyYAML. Install it with: pip install AgentToolProtocol[openapi]"
+        )
+    return yaml.safe_load(text)
+
+
+class OpenAPIOperation:
+    """
+    Callable tool for one OpenAPI operation.
+
+    Registration only creates this small stub holding the method and path. Where each
+    argument goes in the request ("path", "query", "header", "body" for the whole JSON
+    body, or "body_property") is read from the spec on the first call.
+    """
+    __slots__ = ("toolkit", "method", "path", "_locations")
+
+    def __init__(self, toolkit, method, path):
+        self.toolkit = toolkit
+        self.method = method
+        self.path = path
+        self._locations = None
+
+    @property
+    def locations(self):
+        locations = self._locations
+        if locations is None:
+            locations = self._locations = self.toolkit._locations(self.method, self.path)
+        return locations
+
+    def __call__(self, auth_token=None, **kwargs):
+        toolkit = self.toolkit
+
+        url = toolkit.base_url + self.path
+        query, headers, body = {}, {}, None
+        for name, value in kwargs.items():
+            location = self.locations.get(name)
+            if location == "path":
+                # Quoted so that "/", "?", "#" or ".." cannot point the call at another endpoint
+                url = url.replace("{" + name + "}", quote(str(value), safe=""))
+            elif location == "query":
+                query[name] = value
+            elif location == "header":
+                headers[name] = str(value)
+            elif location == "body":
+                body = value
+            elif location == "body_property":
+                if body is None:
+                    body = {}
+                body[name] = value
+        if auth_token and toolkit.auth_header:
+            scheme = f"{toolkit.auth_scheme} " if toolkit.auth_scheme else ""
+            headers[toolkit.auth_header] = f"{scheme}{auth_token}"
+
+        resp = toolkit.session.request(
+            self.method.upper(),
+            url,
+            params=query or None,
+            headers=headers or None,
+            json=body,
+            timeout=toolkit.timeout,
+        )
+        try:
+            data = resp.json()
+        except ValueError:
+            data = {"status_code": resp.status_code, "text": resp.text}
+        if resp.status_code >= 400:
+            return {"error": f"{resp.status_code} {resp.reason}", "status_code": resp.status_code, "response": data}
+        return data
+
+
+class OpenAPIToolkit:
+    """
+    Registers every operation of an OpenAPI document as a tool of a ToolKitClient.
+
+    `params` and `required_params` come from the operation's parameters and JSON
+    request body, all calls share one pooled HTTP session, and each tool's code hash is
+    derived from its part of the spec instead of Python source. Tools are registered as
+    small `OpenAPIOperation` stubs; argument locations are read on the first call and the
+    spec excerpt sent as source code is only rebuilt when the tool is uploaded.
+
+    Example:
+        toolkit = OpenAPIToolkit(client, "openapi.json", auth_provider="github",
+                                 auth_type="OAuth2", auth_with="access_token")
+        toolkit.register()
+        client.start()
+    """
+    def __init__(
+        self,
+        client,
+        spec,
+        base_url=None,
+        session=None,
+        auth_provider=None,
+        auth_type=None,
+        auth_with=None,
+        auth_header="Authorization",
+        auth_scheme="Bearer",
+        include=None,
+        prefix="",
+        timeout=30,
+    ):
+        """
+        Args:
+            client (ToolKitClient): Client the tools are registered on.
+            spec (dict | str): OpenAPI document, file path or URL (see `load_openapi_spec`).
+            base_url (str, optional): API base URL. Defaults to the spec's first server.
+            session (requests.Session, optional): Session for API calls. Defaults to a new pooled session.
+            auth_provider (str, optional): Auth provider of every generated tool.
+            auth_type (str, optional): Auth type of every generated tool.
+            auth_with (str, optional): How authentication is performed.
+            auth_header (str, optional): Header carrying the user's auth token. Defaults to "Authorization".
+            auth_scheme (str, optional): Prefix of the auth header value. Defaults to "Bearer".
+            include (callable, optional): `include(function_name, method, path, operation)` returning
+                False skips an operation. Defaults to None (register everything).
+            prefix (str, optional): Prefix added to every generated tool name. Defaults to "".
+            timeout (float, optional): Timeout of each API call in seconds. Defaults to 30.
+        """
+        self.client = client
+        self.session = session or create_http_session()
+        self.spec = load_openapi_spec(spec, self.session)
+        self.base_url = (base_url or self._default_base_url()).rstrip("/")
+        self.auth_provider = auth_provider
+        self.auth_type = auth_type
+        self.auth_with = auth_with
+        self.auth_header = auth_header
+        self.auth_scheme = auth_scheme
+        self.include = include
+        self.prefix = prefix
+        self.timeout = timeout
+        self.spec_hash = hashlib.sha256(_canonical_json(self.spec).encode("utf-8")).hexdigest()
+        self.operations = {}  # {function_name: OpenAPIOperation}
+
+    def _default_base_url(self):
+        servers = self.spec.get("servers") or []
+        if servers and servers[0].get("url"):
+            return servers[0]["url"]
+        if self.spec.get("host"):  # Swagger 2.0
+            scheme = (self.spec.get("schemes") or ["https"])[0]
+            return f"{scheme}://{self.spec['host']}{self.spec.get('basePath', '')}"
+        raise ValueError("The OpenAPI spec declares no server; pass base_url explicitly.")
+
+    def _resolve(self, node):
+        """Follow local `$ref` pointers such as "#/components/schemas/Repo"."""
+        seen = 0
+        while isinstance(node, dict) and "$ref" in node:
+            ref = node["$ref"]
+            if not ref.startswith("#/") or seen > 32:
+                return {}
+            node = self.spec
+            for part in ref[2:].split("/"):
+                node = node.get(part.replace("~1", "/").replace("~0", "~"), {})
+            seen += 1
+        return node
+
+    def _parameters(self, operation, path_params):
+        merged = {}
+        for param in list(path_params or []) + list(operation.get("parameters") or []):
+            param = self._resolve(param)
+            if param.get("name"):
+                merged[(param["name"], param.get("in"))] = param
+        return list(merged.values())
+
+    def _json_body_schema(self, operation):
+        body = self._resolve(operation.get("requestBody"))
+        if not body:
+            return None
+        content = body.get("content") or {}
+        media = content.get("application/json") or next(iter(content.values()), None)
+        if not media or "schema" not in media:
+            return None
+        return self._resolve(media["schema"])
+
+    def _function_name(self, method, path, operation):
+        name = operation.get("operationId") or f"{method} {path}"
+        name = re.sub(r"\W+", "_", name).strip("_")
+        name = f"{self.prefix}{name}"
+        unique, n = name, 2
+        while unique in self.operations:
+            unique, n = f"{name}_{n}", n + 1
+        return unique
+
+    def _operation(self, method, path):
+        """Return (operation, path-level parameters) of `method path` in the spec."""
+        path_item = self._resolve(self.spec["paths"][path])
+        return path_item[method], path_item.get("parameters")
+
+    def _locations(self, method, path):
+        operation, path_params = self._operation(method, path)
+        return self._describe(method, path, operation, path_params)[3]
+
+    def _source(self, method, path, operation=None, path_params=None):
+        """Canonical JSON of the part of the spec an operation depends on; hashed, never stored."""
+        if operation is None:
+            operation, path_params = self._operation(method, path)
+        return _canonical_json(
+            {
+                "base_url": self.base_url,
+                "method": method,
+                "path": path,
+                "parameters": self._parameters(operation, path_params),
+                "operation": operation,
+            }
+        )
+
+    def _describe(self, method, path, operation, path_params):
+        """Return (params, required_params, description, locations) of an operation."""
+        params, required, locations = [], [], {}
+        for param in self._parameters(operation, path_params):
+            if param.get("in") not in ("path", "query", "header", "body"):
+                continue
+            if param["name"] not in params:
+                params.append(param["name"])
+                locations[param["name"]] = param["in"]  # "body" is a Swagger 2.0 body parameter
+                if param.get("required") or param.get("in") == "path":
+                    required.append(param["name"])
+
+        schema = self._json_body_schema(operation)
+        if schema is not None:
+            properties = schema.get("properties")
+            if schema.get("type", "object") == "object" and properties:
+                for name in properties:
+                    if name not in params:
+                        params.append(name)
+                        locations[name] = "body_property"
+                for name in schema.get("required") or []:
+                    if name in params and name not in required:
+                        required.append(name)
+            elif "body" not in params:
+                params.append("body")
+                locations["body"] = "body"
+                if self._resolve(operation.get("requestBody")).get("required"):
+                    required.append("body")
+
+        description = (
+            operation.get("summary")
+            or operation.get("description")
+            or f"{method.upper()} {path}"
+        ).strip()
+        return params, required, description, locations
+
+    def register(self):
+        """
+        Register every (included) operation on the client.
+
+        Tools are recorded first and uploaded together by `client.register_toolkit()`,
+        which runs here unless the client already defers registration to `start()`.
+
+        Returns:
+            list: Names of the registered tools.
+        """
+        for path, path_item in (self.spec.get("paths") or {}).items():
+            path_item = self._resolve(path_item)
+            path_params = path_item.get("parameters")
+            for method in HTTP_METHODS:
+                operation = path_item.get(method)
+                if not operation:
+                    continue
+                function_name = self._function_name(method, path, operation)
+                if self.include and not self.include(function_name, method, path, operation):
+                    continue
+
+                params, required, description, _ = self._describe(method, path, operation, path_params)
+                source = self._source(method, path, operation, path_params)
+                code_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+                func = OpenAPIOperation(self, method, path)
+                self.operations[function_name] = func
+                self.client.add_tool(
+                    function_name,
+                    func,
+                    params,
+                    required,
+                    description,
+                    self.auth_provider,
+                    self.auth_type,
+                    self.auth_with,
+                    source_code=partial(self._source, method, path),  # rebuilt only for upload
+                    code_hash=code_hash,
+                    defer_registration=True,
+                )
+
+        logger.info(f"Loaded {len(self.operations)} tools from OpenAPI spec {self.spec_hash[:12]}")
+        if not (self.client.deferred_registration or self.client.registration_cache):
+            self.client.register_toolkit()
+        return list(self.operations)
@@ -0,0 +1,544 @@
+"""
+App session stores: SessionStore, InMemorySessionStore, SQLiteSessionStore,
+RedisSessionStore and CachedSessionStore
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Interface of the store that keeps interactive app sessions.
+
+    A session is a JSON-serializable dict ({"tool_name", "state", "auth_token"}), so
+    stores shared between toolkit replicas can persist it. Implementations provide
+    `get`, `put`, `update_state`, `pop` and `evict_expired`; the dict-style operations
+    (`store[id]`, `id in store`, ...) are built on top of them.
+    """
+    on_evict = None
+
+    def get(self, session_id, default=None):
+        """Return a live session and mark it as used, or `default` if unknown or expired."""
+        raise NotImplementedError
+
+    def touch(self, session_id):
+        """Mark a live session as used without reading it; returns False if it is gone."""
+        return self.get(session_id) is not None
+
+    def _as_stored(self, session):
+        """`session` as `get` will return it after `put`."""
+        return session
+
+    def put(self, session_id, session):
+        """Add or replace a session."""
+        raise NotImplementedError
+
+    def update_state(self, session_id, state):
+        """Replace the `state` of a live session; returns False if the session is gone."""
+        raise NotImplementedError
+
+    def pop(self, session_id, default=None):
+        """Remove and return a session without calling `on_evict`."""
+        raise NotImplementedError
+
+    def evict_expired(self):
+        """Evict idle sessions; returns how many were evicted."""
+        return 0
+
+    def _notify(self, evicted):
+        for session_id, session, reason in evicted:
+            logger.info(f"App session {session_id} evicted ({reason})")
+            if self.on_evict:
+                try:
+                    self.on_evict(session_id, session, reason)
+                except Exception as e:
+                    logger.error(f"App session eviction callback failed for {session_id}: {e}")
+
+    def __getitem__(self, session_id):
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id, session):
+        self.put(session_id, session)
+
+    def __delitem__(self, session_id):
+        if self.pop(session_id) is None:
+            raise KeyError(session_id)
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Thread-safe in-process store of interactive app sessions with an idle TTL and LRU eviction.
+
+    Sessions are kept in least-recently-used order: every read or write moves a session
+    to the end, so expired sessions are always found at the front. When the store is full
+    the least recently used session is evicted. Evicted sessions are reported to
+    `on_evict(session_id, session, reason)` with reason "expired" or "capacity"; the
+    callback runs outside the store's lock.
+
+    Sessions are kept as Python objects and are only visible to this process.
+    """
+    def __init__(self, max_entries=1000, ttl=1800, on_evict=None):
+        """
+        Args:
+            max_entries (int, optional): Maximum number of live sessions. Defaults to 1000.
+            ttl (float, optional): Seconds a session may stay idle before it expires.
+                None disables expiry. Defaults to 1800 (30 minutes).
+            on_evict (callable, optional): Called as on_evict(session_id, session, reason).
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.sessions = OrderedDict()  # {session_id: (last_used, session)}
+        self.lock = threading.Lock()
+
+    def get(self, session_id, default=None):
+        """Return a live session and mark it as used, or `default` if unknown or expired."""
+        evicted = []
+        with self.lock:
+            evicted.extend(self._pop_expired())
+            entry = self.sessions.get(session_id)
+            if entry is not None:
+                self.sessions[session_id] = (time.monotonic(), entry[1])
+                self.sessions.move_to_end(session_id)
+        self._notify(evicted)
+        return entry[1] if entry is not None else default
+
+    def put(self, session_id, session):
+        """Add or replace a session, evicting expired and least recently used ones as needed."""
+        evicted = []
+        with self.lock:
+            evicted.extend(self._pop_expired())
+            self.sessions[session_id] = (time.monotonic(), session)
+            self.sessions.move_to_end(session_id)
+            while self.max_entries and len(self.sessions) > self.max_entries:
+                old_id, (_, old_session) = self.sessions.popitem(last=False)
+                evicted.append((old_id, old_session, "capacity"))
+        self._notify(evicted)
+
+    def update_state(self, session_id, state):
+        """Replace the `state` of a live session; returns False if the session is gone."""
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return False
+            entry[1]["state"] = state
+            self.sessions[session_id] = (time.monotonic(), entry[1])
+            self.sessions.move_to_end(session_id)
+            return True
+
+    def pop(self, session_id, default=None):
+        """Remove and return a session without calling `on_evict`."""
+        with self.lock:
+            entry = self.sessions.pop(session_id, None)
+        return entry[1] if entry is not None else default
+
+    def evict_expired(self):
+        """Evict every session idle for longer than `ttl`; returns how many were evicted."""
+        with self.lock:
+            evicted = self._pop_expired()
+        self._notify(evicted)
+        return len(evicted)
+
+    def touch(self, session_id):
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return False
+            self.sessions[session_id] = (time.monotonic(), entry[1])
+            self.sessions.move_to_end(session_id)
+            return True
+
+    def _pop_expired(self):
+        if self.ttl is None:
+            return []
+        cutoff = time.monotonic() - self.ttl
+        evicted = []
+        while self.sessions:
+            session_id, (last_used, session) = next(iter(self.sessions.items()))
+            if last_used > cutoff:
+                break
+            del self.sessions[session_id]
+            evicted.append((session_id, session, "expired"))
+        return evicted
+
+    def __len__(self):
+        with self.lock:
+            return len(self.sessions)
+
+
+class _SerializedSessionStore(SessionStore):
+    """
+    Base of the stores that keep sessions as JSON outside the process.
+
+    The user's `auth_token` is never written in plaintext: it is stored as
+    `encrypt_token(token)` and read back with `decrypt_token`, or left out (read back as
+    None) when no hooks are given.
+    """
+    def _init_token_hooks(self, encrypt_token, decrypt_token):
+        if (encrypt_token is None) != (decrypt_token is None):
+            raise ValueError("Pass both encrypt_token and decrypt_token, or neither.")
+        self.encrypt_token = encrypt_token
+        self.decrypt_token = decrypt_token
+
+    def _dumps(self, session):
+        token = session.get("auth_token")
+        if token is not None:
+            session = dict(session, auth_token=self.encrypt_token(token) if self.encrypt_token else None)
+        return json.dumps(session)
+
+    def _loads(self, data):
+        session = json.loads(data)
+        if session.get("auth_token") is not None and self.decrypt_token:
+            session["auth_token"] = self.decrypt_token(session["auth_token"])
+        return session
+
+    def _as_stored(self, session):
+        if session.get("auth_token") is not None and not self.encrypt_token:
+            return dict(session, auth_token=None)
+        return session
+
+
+class SQLiteSessionStore(_SerializedSessionStore):
+    """
+    App sessions in a SQLite database, shared by every toolkit process on the same host
+    (or on a shared volume). Sessions are stored as JSON, the auth token only when
+    `encrypt_token` is given. Changes run in `BEGIN IMMEDIATE` transactions, so
+    processes sharing the file never evict or pop the same session twice.
+    """
+    def __init__(self, path="atp_sessions.db", ttl=1800, max_entries=None, on_evict=None,
+                 encrypt_token=None, decrypt_token=None):
+        """
+        Args:
+            path (str, optional): Database file. Defaults to "atp_sessions.db".
+            ttl (float, optional): Seconds a session may stay idle. None disables expiry. Defaults to 1800.
+            max_entries (int, optional): Maximum number of sessions; least recently used ones
+                are evicted beyond it. Defaults to None (unbounded).
+            on_evict (callable, optional): Called as on_evict(session_id, session, reason).
+            encrypt_token (callable, optional): `encrypt_token(str) -> str` applied to the auth
+                token before it is stored. Without it the token is not stored.
+            decrypt_token (callable, optional): Inverse of `encrypt_token`.
+        """
+        self._init_token_hooks(encrypt_token, decrypt_token)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS atp_app_sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS atp_app_sessions_last_used ON atp_app_sessions (last_used)"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # Takes the database write lock up front, so no other process changes rows in between
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def get(self, session_id, default=None):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data, last_used FROM atp_app_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return default
+            now = time.time()
+            if self.ttl is not None and row[1] <= now - self.ttl:
+                return default  # left for evict_expired, which notifies
+            self.conn.execute(
+                "UPDATE atp_app_sessions SET last_used = ? WHERE session_id = ?", (now, session_id)
+            )
+        return self._loads(row[0])
+
+    def touch(self, session_id):
+        with self.lock:
+            return self.conn.execute(
+                "UPDATE atp_app_sessions SET last_used = ? WHERE session_id = ? AND last_used > ?",
+                (time.time(), session_id, time.time() - self.ttl if self.ttl is not None else float("-inf")),
+            ).rowcount > 0
+
+    def put(self, session_id, session):
+        data = self._dumps(session)
+        evicted = []
+        with self.lock, self._transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO atp_app_sessions (session_id, data, last_used) VALUES (?, ?, ?)",
+                (session_id, data, time.time()),
+            )
+            if self.max_entries:
+                rows = self.conn.execute(
+                    "SELECT session_id, data FROM atp_app_sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                    (self.max_entries,),
+                ).fetchall()
+                evicted = self._delete(rows, "capacity")
+        self._notify(evicted)
+
+    def update_state(self, session_id, state):
+        with self.lock, self._transaction():
+            row = self.conn.execute(
+                "SELECT data FROM atp_app_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            session = json.loads(row[0])  # the stored auth token is kept as is
+            session["state"] = state
+            self.conn.execute(
+                "UPDATE atp_app_sessions SET data = ?, last_used = ? WHERE session_id = ?",
+                (json.dumps(session), time.time(), session_id),
+            )
+            return True
+
+    def pop(self, session_id, default=None):
+        with self.lock, self._transaction():
+            row = self.conn.execute(
+                "SELECT data FROM atp_app_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return default
+            self.conn.execute("DELETE FROM atp_app_sessions WHERE session_id = ?", (session_id,))
+        return self._loads(row[0])
+
+    def evict_expired(self):
+        if self.ttl is None:
+            return 0
+        with self.lock, self._transaction():
+            rows = self.conn.execute(
+                "SELECT session_id, data FROM atp_app_sessions WHERE last_used <= ?",
+                (time.time() - self.ttl,),
+            ).fetchall()
+            evicted = self._delete(rows, "expired")
+        self._notify(evicted)
+        return len(evicted)
+
+    def _delete(self, rows, reason):
+        if rows:
+            self.conn.executemany(
+                "DELETE FROM atp_app_sessions WHERE session_id = ?", [(row[0],) for row in rows]
+            )
+        return [(row[0], self._loads(row[1]), reason) for row in rows]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM atp_app_sessions").fetchone()[0]
+
+
+def _is_watch_error(error):
+    # redis.exceptions.WatchError, without importing redis for injected clients
+    return type(error).__name__ == "WatchError"
+
+
+class RedisSessionStore(_SerializedSessionStore):
+    """
+    App sessions in Redis (or any server speaking the Redis protocol), shared by every
+    toolkit replica. Sessions are stored as JSON under `prefix + session_id` with an
+    expiry of `ttl` seconds that is renewed on every use. The auth token is only stored
+    when `encrypt_token` is given.
+
+    Redis removes expired sessions itself, so `on_evict` is not called for them; cap
+    memory with the server's `maxmemory` policy rather than `max_entries`.
+    """
+    def __init__(self, client=None, url="redis://localhost:6379/0", prefix="atp:session:", ttl=1800,
+                 encrypt_token=None, decrypt_token=None):
+        """
+        Args:
+            client (optional): A redis-py compatible client (needs get, set with `ex`, expire,
+                delete, scan_iter and transactional pipelines with watch). Defaults to `redis.Redis.from_url(url)`, which requires the `redis` package.
+            url (str, optional): Redis URL used when no client is given.
+            prefix (str, optional): Key prefix. Defaults to "atp:session:".
+            ttl (float, optional): Idle expiry in seconds. None keeps sessions until popped. Defaults to 1800.
+            encrypt_token (callable, optional): `encrypt_token(str) -> str` applied to the auth
+                token before it is stored. Without it the token is not stored.
+            decrypt_token (callable, optional): Inverse of `encrypt_token`.
+        """
+        self._init_token_hooks(encrypt_token, decrypt_token)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError(
+                    "RedisSessionStore requires redis. Install it with: pip install AgentToolProtocol[redis]"
+                )
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, session_id):
+        return f"{self.prefix}{session_id}"
+
+    def _ex(self):
+        return max(1, int(self.ttl)) if self.ttl is not None else None
+
+    def get(self, session_id, default=None):
+        data = self.client.get(self._key(session_id))
+        if data is None:
+            return default
+        if self.ttl is not None:
+            self.client.expire(self._key(session_id), self._ex())
+        return self._loads(data)
+
+    def touch(self, session_id):
+        if self.ttl is None:
+            return self.client.get(self._key(session_id)) is not None
+        return bool(self.client.expire(self._key(session_id), self._ex()))
+
+    def put(self, session_id, session):
+        self.client.set(self._key(session_id), self._dumps(session), ex=self._ex())
+
+    def update_state(self, session_id, state):
+        # WATCH/MULTI: retried when another replica changes the session in between
+        key = self._key(session_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    if data is None:
+                        pipe.unwatch()
+                        return False
+                    session = json.loads(data)  # the stored auth token is kept as is
+                    session["state"] = state
+                    pipe.multi()
+                    pipe.set(key, json.dumps(session), ex=self._ex())
+                    pipe.execute()
+                    return True
+                except Exception as e:
+                    if not _is_watch_error(e):
+                        raise
+                    logger.debug(f"App session {session_id} changed concurrently, retrying state update")
+
+    def pop(self, session_id, default=None):
+        with self.client.pipeline() as pipe:  # GET and DELETE in one MULTI/EXEC
+            pipe.get(self._key(session_id))
+            pipe.delete(self._key(session_id))
+            data, _ = pipe.execute()
+        return default if data is None else self._loads(data)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*"))
+
+
+class CachedSessionStore(SessionStore):
+    """
+    Keeps recently fetched sessions in process memory in front of a shared store.
+
+    A cached copy is used for at most `local_ttl` seconds after it was fetched or written,
+    however often it is read, and is then fetched from the shared store again. Every write
+    goes through to the shared store, so a replica picking up a session after a failover
+    sees its latest state, and a replica that cached a session sees changes made by other
+    replicas within `local_ttl` seconds. Reads served from memory still renew the
+    session's expiry in the shared store (at most every `ttl / 2` seconds of the backend),
+    so a session that is only ever read from the cache does not expire there.
+    """
+    def __init__(self, backend, local_max_entries=256, local_ttl=5):
+        """
+        Args:
+            backend (SessionStore): The shared store.
+            local_max_entries (int, optional): Sessions kept in memory. Defaults to 256.
+            local_ttl (float, optional): Maximum age in seconds of a cached copy. Defaults to 5.
+        """
+        self.backend = backend
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self.local = OrderedDict()  # {session_id: (fetched_at, session, renewed_at)}
+        self.lock = threading.Lock()
+
+    @property
+    def on_evict(self):
+        return self.backend.on_evict
+
+    @on_evict.setter
+    def on_evict(self, callback):
+        self.backend.on_evict = callback
+
+    def _cached(self, session_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.local.get(session_id)
+            if entry is None:
+                return None
+            if now - entry[0] > self.local_ttl:
+                del self.local[session_id]
+                return None
+            self.local.move_to_end(session_id)  # LRU order only; the age is unchanged
+            ttl = getattr(self.backend, "ttl", None)
+            renew = ttl is not None and now - entry[2] >= ttl / 2
+            if renew:
+                self.local[session_id] = (entry[0], entry[1], now)
+        if renew and not self.backend.touch(session_id):
+            self._uncache(session_id)  # expired or evicted in the shared store meanwhile
+            return None
+        return entry[1]
+
+    def _cache(self, session_id, session):
+        now = time.monotonic()
+        with self.lock:
+            self.local[session_id] = (now, session, now)
+            self.local.move_to_end(session_id)
+            while len(self.local) > self.local_max_entries:
+                self.local.popitem(last=False)
+
+    def _uncache(self, session_id):
+        with self.lock:
+            self.local.pop(session_id, None)
+
+    def get(self, session_id, default=None):
+        session = self._cached(session_id)
+        if session is None:
+            session = self.backend.get(session_id)
+            if session is None:
+                return default
+            self._cache(session_id, session)
+        return session
+
+    def put(self, session_id, session):
+        self.backend.put(session_id, session)
+        self._cache(session_id, self.backend._as_stored(session))
+
+    def update_state(self, session_id, state):
+        if not self.backend.update_state(session_id, state):
+            self._uncache(session_id)
+            return False
+        with self.lock:
+            entry = self.local.get(session_id)
+            if entry is not None:
+                # Keep the original fetch time: other replicas may write after us
+                self.local[session_id] = (entry[0], dict(entry[1], state=state), time.monotonic())
+        return True
+
+    def pop(self, session_id, default=None):
+        self._uncache(session_id)
+        return self.backend.pop(session_id, default)
+
+    def evict_expired(self):
+        with self.lock:
+            cutoff = time.monotonic() - self.local_ttl
+            for session_id in [sid for sid, (fetched_at, _, _) in self.local.items() if fetched_at < cutoff]:
+                del self.local[session_id]
+        return self.backend.evict_expired()
+
+    def __len__(self):
+        return len(self.backend)
@@ -3,7 +3,7 @@ from typing import Any, Dict, List, Optional, Union
 
 # --- Utility Functions and Base Structure ---
 
-from.utils import component_definition
+from.utils import component_definition, memoized_component
 
 
 # --- 2. Content Classes ---
@@ -15,6 +15,7 @@ class Content:
     CATEGORY = "Content"
 
     @staticmethod
+    @memoized_component
     def Reboot() -> Dict[str, Any]:
         """Configuration for CSS resets/normalizes and base styling."""
         return component_definition(Content.CATEGORY, "Reboot", {
@@ -52,6 +53,23 @@ class Content:
             "data_preview_schema": data[0] if data else [] # Show schema of the first row
         })
 
+    @staticmethod
+    def VirtualTable(table_id: str, columns: List[Any], total_rows: Optional[int] = None, page_size: int = 50,
+                     rows: Optional[List[Any]] = None, offset: int = 0, sort_key: Optional[str] = None,
+                     descending: bool = False, height: int = 400) -> Dict[str, Any]:
+        """Scrollable table that only holds the visible rows and requests others with 'table_window' actions."""
+        return component_definition(Content.CATEGORY, "Virtual table", {
+            "table_id": table_id,
+            "columns": columns, # [{"key": "name", "label": "Name", "sortable": True}]
+            "total_rows": total_rows, # None if unknown
+            "page_size": page_size,
+            "offset": offset,
+            "rows": rows if rows is not None else [], # the window starting at 'offset'
+            "sort_key": sort_key,
+            "descending": descending,
+            "height": height
+        })
+
     @staticmethod
     def Figures(img_src: str, caption: str) -> Dict[str, Any]:
         """Defines a component for displaying an image with an associated caption."""
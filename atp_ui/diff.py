@@ -0,0 +1,175 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from.nodes import Node
+from.utils import thaw, to_json
+
+# --- JSON-Patch (RFC 6902) diffs of UI trees ---
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _kind(value: Any) -> type:
+    # Frozen components compare like the plain dicts and lists they stand for.
+    if isinstance(value, Node):
+        return Node
+    if isinstance(value, dict):
+        return dict
+    if isinstance(value, (list, tuple)):
+        return list
+    return type(value)
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute a JSON-Patch turning `old` into `new`.
+
+    Dicts are compared key by key and lists index by index (items appended or removed
+    at the end become "add"/"remove" operations), so an unchanged subtree costs nothing
+    and a changed leaf costs one "replace". Components shared by both trees (e.g.
+    memoized ones) are skipped by identity without being walked. A node is compared with
+    a dict component by its dict form, so converting a tree with `from_definition` is
+    not a change.
+    """
+    if old is new:
+        return []
+
+    if _kind(old) is not _kind(new):
+        # A node and a dict component are two forms of the same JSON: compare them as dicts.
+        if isinstance(old, Node) and isinstance(new, dict):
+            old = old.to_dict()
+        elif isinstance(new, Node) and isinstance(old, dict):
+            new = new.to_dict()
+        else:
+            return [{"op": "replace", "path": path, "value": new}]
+
+    if isinstance(new, Node):
+        if old.node_type is not new.node_type:
+            return [{"op": "replace", "path": path, "value": new}]
+        ops = []
+        for name, old_value, new_value in zip(new.node_type.prop_names, old.values, new.values):
+            ops.extend(diff(old_value, new_value, f"{path}/props/{_escape(name)}"))
+        return ops
+
+    if isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+
+    if isinstance(new, (list, tuple)):
+        ops = []
+        common = min(len(old), len(new))
+        for index in range(common):
+            ops.extend(diff(old[index], new[index], f"{path}/{index}"))
+        for index in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/-", "value": new[index]})
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        return ops
+
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Apply a patch produced by `diff` and return the new document (the input is not modified)."""
+    document = thaw(document)
+    for op in patch:
+        if op["path"] == "":
+            document = thaw(op.get("value"))
+            continue
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                value = thaw(op["value"])
+                if last == "-":
+                    parent.append(value)
+                else:
+                    parent.insert(int(last), value)
+            elif op["op"] == "remove":
+                del parent[int(last)]
+            else:
+                parent[int(last)] = thaw(op["value"])
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = thaw(op["value"])
+    return document
+
+
+class UIDeltaEncoder:
+    """
+    Remembers the last UI tree sent to each app session and encodes the next one as a
+    patch against it.
+
+    Messages are either a snapshot, {"ui_version": n, "ui_snapshot": tree}, or a delta,
+    {"ui_version": n, "ui_base_version": n - 1, "ui_patch": [...]}. A snapshot is sent for
+    the first update of a session, every `resync_every` updates, after `reset()`, and
+    whenever the patch would not be meaningfully smaller than the tree itself.
+    """
+
+    def __init__(self, resync_every: int = 20, max_patch_ratio: float = 0.5, max_sessions: int = 1000):
+        self.resync_every = resync_every
+        self.max_patch_ratio = max_patch_ratio
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # {session_id: [version, tree, updates_since_snapshot]}
+        self.lock = threading.Lock()
+
+    def encode(self, session_id: str, ui_content: Any) -> Dict[str, Any]:
+        """Return the message to send for `ui_content` and remember it as the session's base."""
+        with self.lock:
+            entry = self.sessions.get(session_id)
+        version = entry[0] + 1 if entry else 1
+        message = None
+
+        if entry and entry[2] < self.resync_every:
+            patch = diff(entry[1], ui_content)
+            if len(to_json(patch)) <= self.max_patch_ratio * len(to_json(ui_content)):
+                message = {"ui_version": version, "ui_base_version": entry[0], "ui_patch": patch}
+
+        if message is None:
+            message = {"ui_version": version, "ui_snapshot": ui_content}
+            updates = 0
+        else:
+            updates = entry[2] + 1
+
+        tree = copy.deepcopy(ui_content)  # frozen components are shared, not copied
+        with self.lock:
+            self.sessions[session_id] = [version, tree, updates]
+            self.sessions.move_to_end(session_id)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        return message
+
+    def reset(self, session_id: str) -> None:
+        """Make the next update of a session a full snapshot."""
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry:
+                entry[2] = self.resync_every
+
+    def forget(self, session_id: str) -> Optional[List[Any]]:
+        """Drop everything remembered about a session."""
+        with self.lock:
+            return self.sessions.pop(session_id, None)
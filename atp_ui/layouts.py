@@ -1,7 +1,7 @@
 import json
 from typing import Any, Dict, List, Optional, Union
 
-from.utils import component_definition
+from.utils import component_definition, memoized_component
 
 # --- 1. Layout Classes ---
 
@@ -12,6 +12,7 @@ class Layout:
     CATEGORY = "Layout"
 
     @staticmethod
+    @memoized_component
     def Breakpoints(extra_breakpoints: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Defines the core responsive screen sizes for media queries."""
         defaults = {
@@ -27,6 +28,7 @@ class Layout:
         return component_definition(Layout.CATEGORY, "Breakpoints", {"definitions": defaults})
 
     @staticmethod
+    @memoized_component
     def Container(fluid: bool = False, max_width: Optional[str] = None) -> Dict[str, Any]:
         """A responsive fixed-width or fluid container for page content."""
         return component_definition(Layout.CATEGORY, "Container", {
@@ -36,6 +38,7 @@ class Layout:
         })
 
     @staticmethod
+    @memoized_component
     def Grid(columns: int = 12, direction: str = 'row') -> Dict[str, Any]:
         """Defines the base grid system properties."""
         return component_definition(Layout.CATEGORY, "Grid", {
@@ -54,6 +57,7 @@ class Layout:
         })
 
     @staticmethod
+    @memoized_component
     def Gutters(spacing_unit: str = 'rem', spacing_map: Dict[str, float] = None) -> Dict[str, Any]:
         """Configuration for spacing utilities between grid elements (gutters)."""
         if spacing_map is None:
@@ -64,6 +68,7 @@ class Layout:
         })
 
     @staticmethod
+    @memoized_component
     def ZIndex(layers: Dict[str, int]) -> Dict[str, Any]:
         """Configuration for the Z-index layering utility for overlays and modals."""
         return component_definition(Layout.CATEGORY, "Z-index", {
@@ -71,6 +76,7 @@ class Layout:
         })
 
     @staticmethod
+    @memoized_component
     def CSSGrid(template_columns: str = 'repeat(12, 1fr)', template_rows: str = 'auto') -> Dict[str, Any]:
         """Alternative configuration for pure CSS Grid layout."""
         return component_definition(Layout.CATEGORY, "CSS Grid", {
@@ -0,0 +1,232 @@
+import threading
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, Optional, Tuple
+
+from.utils import _ENCODERS, freeze, to_json
+
+# --- Compact Component Nodes ---
+#
+# A plain component definition is two dicts: {"category", "component_type", "props"}
+# and the props themselves. A Node keeps a reference to a shared NodeType (category,
+# component type and prop names, interned once per schema) and a tuple of prop values,
+# and serializes to exactly the same JSON.
+
+def _literal(text: str) -> str:
+    return encode_basestring_ascii(text).replace("%", "%%")
+
+
+class NodeType:
+    """Shared schema of all nodes with the same category, component type and prop names."""
+    __slots__ = ("category", "component_type", "prop_names", "template")
+
+    _registry = {}
+    _lock = threading.Lock()
+
+    def __init__(self, category: str, component_type: str, prop_names: Tuple[str, ...]):
+        self.category = category
+        self.component_type = component_type
+        self.prop_names = prop_names
+        # Pre-encoded JSON with a %s slot per prop, so serializing a node only encodes its values.
+        self.template = (
+            '{"category":' + _literal(category)
+            + ',"component_type":' + _literal(component_type)
+            + ',"props":{' + ",".join(_literal(name) + ":%s" for name in prop_names) + "}}"
+        )
+
+    @classmethod
+    def get(cls, category: str, component_type: str, prop_names: Tuple[str, ...]) -> "NodeType":
+        """Return the interned NodeType for a schema."""
+        key = (category, component_type, prop_names)
+        node_type = cls._registry.get(key)
+        if node_type is None:
+            with cls._lock:
+                node_type = cls._registry.setdefault(key, cls(category, component_type, prop_names))
+        return node_type
+
+    def __repr__(self) -> str:
+        return f"NodeType({self.category!r}, {self.component_type!r}, {self.prop_names!r})"
+
+
+class Node:
+    """
+    Immutable, slotted component node with the same wire format as `component_definition`.
+
+    Nodes can be mixed freely with dict components: `to_json`, `atp_ui.diff` and the
+    ATP clients accept both. Props are read with `node.props` (a new dict) or `node.get()`.
+    """
+    __slots__ = ("node_type", "values", "_json")
+
+    CATEGORY = None
+
+    def __init__(self, category: str, component_type: str, props: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        if kwargs:
+            props = dict(props or {}, **kwargs)
+        props = props or {}
+        self.node_type = NodeType.get(category, component_type, tuple(props))
+        self.values = tuple(freeze(value) for value in props.values())
+        self._json = None
+
+    @classmethod
+    def _from_values(cls, node_type: NodeType, values: Tuple[Any, ...]) -> "Node":
+        node = cls.__new__(cls)
+        node.node_type = node_type
+        node.values = values
+        node._json = None
+        return node
+
+    @property
+    def category(self) -> str:
+        return self.node_type.category
+
+    @property
+    def component_type(self) -> str:
+        return self.node_type.component_type
+
+    @property
+    def props(self) -> Dict[str, Any]:
+        return dict(zip(self.node_type.prop_names, self.values))
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Return the value of one prop."""
+        try:
+            return self.values[self.node_type.prop_names.index(name)]
+        except ValueError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the component as a dict (child nodes are left as nodes; see `thaw()` for a deep copy)."""
+        return {"category": self.category, "component_type": self.component_type, "props": self.props}
+
+    def to_json(self) -> str:
+        """Return the compact JSON of the node, computed on the first call and cached."""
+        text = self._json
+        if text is None:
+            text = self._json = self.node_type.template % tuple(map(to_json, self.values))
+        return text
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Node):
+            return NotImplemented
+        return self.node_type is other.node_type and self.values == other.values
+
+    def __hash__(self) -> int:
+        return hash((self.node_type, self.values))
+
+    def __copy__(self) -> "Node":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "Node":
+        return self
+
+    def __reduce__(self):
+        return (node, (self.category, self.component_type, self.props))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.component_type!r}, {self.props!r})"
+
+
+class _CategoryNode(Node):
+    __slots__ = ()
+
+    def __init__(self, component_type: str, props: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        super().__init__(self.CATEGORY, component_type, props, **kwargs)
+
+
+class LayoutNode(_CategoryNode):
+    """Node of the `Layout` category."""
+    __slots__ = ()
+    CATEGORY = "Layout"
+
+
+class ContentNode(_CategoryNode):
+    """Node of the `Content` category."""
+    __slots__ = ()
+    CATEGORY = "Content"
+
+
+class ComponentNode(_CategoryNode):
+    """Node of the `Components` category."""
+    __slots__ = ()
+    CATEGORY = "Components"
+
+
+class FormNode(_CategoryNode):
+    """Node of the `Forms` category."""
+    __slots__ = ()
+    CATEGORY = "Forms"
+
+
+NODE_CLASSES = {cls.CATEGORY: cls for cls in (LayoutNode, ContentNode, ComponentNode, FormNode)}
+
+_ENCODERS.update({cls: cls.to_json for cls in (Node, LayoutNode, ContentNode, ComponentNode, FormNode)})
+
+
+def node(category: str, component_type: str, props: Optional[Dict[str, Any]] = None) -> Node:
+    """Create a node of the class matching `category` (plain `Node` for unknown categories)."""
+    props = props or {}
+    node_type = NodeType.get(category, component_type, tuple(props))
+    cls = NODE_CLASSES.get(category, Node)
+    return cls._from_values(node_type, tuple(freeze(value) for value in props.values()))
+
+
+def from_definition(tree: Any) -> Any:
+    """Convert a tree of dict components (as built by `Layout`, `Components`, ...) into nodes."""
+    if isinstance(tree, Node):
+        return tree
+    if isinstance(tree, dict):
+        if len(tree) == 3 and "category" in tree and "component_type" in tree and "props" in tree:
+            props = {name: from_definition(value) for name, value in tree["props"].items()}
+            return node(tree["category"], tree["component_type"], props)
+        return freeze({key: from_definition(value) for key, value in tree.items()})
+    if isinstance(tree, (list, tuple)):
+        return freeze([from_definition(item) for item in tree])
+    return tree
+
+
+# --- Builder ---
+
+class NodeBuilder:
+    """
+    Fast factory for many nodes of one component type.
+
+    The schema is resolved once, so each call only packs its arguments into the value
+    tuple. Arguments follow the order of `prop_names`; omitted props take their default.
+
+    Example:
+        Alert = NodeBuilder("Components", "Alerts", "message", "type", "dismissible",
+                            type="info", dismissible=False)
+        rows = [Alert(f"Row {i}") for i in range(1000)]
+        tree = LayoutNode("Column", size=12, breakpoint="default", content=rows)
+    """
+    __slots__ = ("node_class", "node_type", "defaults")
+
+    def __init__(self, category: str, component_type: str, *prop_names: str, **defaults: Any):
+        unknown = set(defaults) - set(prop_names)
+        if unknown:
+            raise ValueError(f"Defaults given for unknown props: {sorted(unknown)}")
+        self.node_class = NODE_CLASSES.get(category, Node)
+        self.node_type = NodeType.get(category, component_type, tuple(prop_names))
+        self.defaults = {name: freeze(value) for name, value in defaults.items()}
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Node:
+        names = self.node_type.prop_names
+        if len(args) > len(names):
+            raise TypeError(f"{self.node_type.component_type} takes at most {len(names)} props ({len(args)} given)")
+        if not kwargs and len(args) == len(names):
+            return self.node_class._from_values(self.node_type, tuple(freeze(value) for value in args))
+
+        values = []
+        for index, name in enumerate(names):
+            if index < len(args):
+                if name in kwargs:
+                    raise TypeError(f"Prop {name!r} given twice")
+                values.append(freeze(args[index]))
+            elif name in kwargs:
+                values.append(freeze(kwargs.pop(name)))
+            elif name in self.defaults:
+                values.append(self.defaults[name])
+            else:
+                raise TypeError(f"Missing prop {name!r} for {self.node_type.component_type}")
+        if kwargs:
+            raise TypeError(f"Unknown props for {self.node_type.component_type}: {sorted(kwargs)}")
+        return self.node_class._from_values(self.node_type, tuple(values))
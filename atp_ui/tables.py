@@ -0,0 +1,252 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from.contents import Content
+
+# --- Virtualized Data Tables ---
+
+class DataTable:
+    """
+    Toolkit-side data source of a `Content.VirtualTable`.
+
+    The UI only holds the rows it displays and asks for others with a `table_window` app
+    action ({"type": "table_window", "table_id": ..., "offset": ..., "limit": ...,
+    "sort_key": ..., "descending": ...}); the SDK answers with that slice only. Rows are
+    fetched in blocks of `page_size` aligned rows, and the most recently used blocks are
+    kept in an LRU cache, so scrolling back and forth does not query the source again.
+
+    Callbacks:
+        fetch(offset, limit, sort_key, descending, state) -> list of rows (lists or dicts).
+        count(state) -> total number of rows, or None when unknown.
+
+    `state` is the app state of the session asking, for sources that depend on it (e.g.
+    the results of a query entered by the user). Cached rows are shared by all sessions
+    unless `cache_key(state)` is given: it returns the hashable part of the state the rows
+    depend on (e.g. `lambda state: state.get("query")`), and rows are cached per key.
+    """
+
+    def __init__(
+        self,
+        table_id: str,
+        fetch: Callable[..., List[Any]],
+        count: Optional[Callable[..., Optional[int]]] = None,
+        columns: Optional[List[Any]] = None,
+        page_size: int = 50,
+        max_window: int = 500,
+        cache_size: int = 256,
+        cache_ttl: Optional[float] = None,
+        cache_key: Optional[Callable[[Any], Hashable]] = None,
+    ):
+        """
+        Args:
+            table_id (str): Identifier the UI uses in `table_window` actions.
+            fetch (callable): Returns the rows of a range; see the class docstring.
+            count (callable, optional): Returns the total row count. Defaults to None (unknown).
+            columns (list, optional): Column definitions sent with the component,
+                e.g. [{"key": "name", "label": "Name", "sortable": True}].
+            page_size (int, optional): Rows per cached block and default window size. Defaults to 50.
+            max_window (int, optional): Largest window a single action may request. Defaults to 500.
+            cache_size (int, optional): Cached blocks; 0 disables caching. Defaults to 256.
+            cache_ttl (float, optional): Seconds a cached block stays valid. Defaults to None (until evicted).
+            cache_key (callable, optional): `cache_key(state)` returning a hashable key that
+                separates cached rows and counts by state. Defaults to None (state is not part of the key).
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.table_id = table_id
+        self.fetch = fetch
+        self.count = count
+        self.columns = columns or []
+        self.page_size = page_size
+        self.max_window = max_window
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache_key = cache_key
+        self.cache = OrderedDict()  # {(state_key, sort_key, descending, block): (stored_at, rows)}
+        self.counts = OrderedDict()  # {state_key: (stored_at, total_rows)}
+        self.lock = threading.Lock()
+
+    def _state_key(self, state: Any) -> Hashable:
+        return None if self.cache_key is None else self.cache_key(state)
+
+    def _cached(self, table: OrderedDict, key: Any) -> Any:
+        with self.lock:
+            entry = table.get(key)
+            if entry is None:
+                return None
+            if self.cache_ttl is not None and time.monotonic() - entry[0] > self.cache_ttl:
+                del table[key]
+                return None
+            table.move_to_end(key)
+            return entry
+
+    def _store(self, table: OrderedDict, key: Any, value: Any) -> None:
+        if self.cache_size <= 0:
+            return
+        with self.lock:
+            table[key] = (time.monotonic(), value)
+            table.move_to_end(key)
+            while len(table) > self.cache_size:
+                table.popitem(last=False)
+
+    def sortable(self, sort_key: Optional[str]) -> bool:
+        """
+        Return True if the UI may sort by `sort_key`: a column key whose definition does not
+        set "sortable": False. Any key is accepted when no columns are defined.
+        """
+        if sort_key is None or not self.columns:
+            return True
+        for column in self.columns:
+            if isinstance(column, dict):
+                if column.get("key") == sort_key:
+                    return column.get("sortable", True) is not False
+            elif column == sort_key:
+                return True
+        return False
+
+    def total_rows(self, state: Any = None) -> Optional[int]:
+        """Return the row count reported by `count`, cached like the rows."""
+        if self.count is None:
+            return None
+        state_key = self._state_key(state)
+        entry = self._cached(self.counts, state_key)
+        if entry is not None:
+            return entry[1]
+        total = self.count(state)
+        self._store(self.counts, state_key, total)
+        return total
+
+    def rows(
+        self,
+        offset: int,
+        limit: int,
+        sort_key: Optional[str] = None,
+        descending: bool = False,
+        state: Any = None,
+    ) -> List[Any]:
+        """Return rows [offset, offset + limit), fetching only the blocks that are not cached."""
+        if limit <= 0:
+            return []
+        state_key = self._state_key(state)
+        first, last = offset // self.page_size, (offset + limit - 1) // self.page_size
+        blocks = {}
+        missing = []
+        for block in range(first, last + 1):
+            entry = self._cached(self.cache, (state_key, sort_key, descending, block))
+            if entry is None:
+                missing.append(block)
+            else:
+                blocks[block] = entry[1]
+
+        # Fetch each run of consecutive missing blocks with a single call.
+        runs = []
+        for block in missing:
+            if runs and runs[-1][1] == block - 1:
+                runs[-1][1] = block
+            else:
+                runs.append([block, block])
+        for start, end in runs:
+            fetched = list(self.fetch(
+                start * self.page_size, (end - start + 1) * self.page_size, sort_key, descending, state
+            ))
+            for block in range(start, end + 1):
+                begin = (block - start) * self.page_size
+                chunk = fetched[begin:begin + self.page_size]
+                blocks[block] = chunk
+                self._store(self.cache, (state_key, sort_key, descending, block), chunk)
+
+        rows = []
+        for block in range(first, last + 1):
+            rows.extend(blocks[block])
+            if len(blocks[block]) < self.page_size:
+                break  # end of the data
+        skip = offset - first * self.page_size
+        return rows[skip:skip + limit]
+
+    def window(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_key: Optional[str] = None,
+        descending: bool = False,
+        state: Any = None,
+    ) -> Dict[str, Any]:
+        """
+        Return the window message sent in reply to a `table_window` action.
+
+        Returns:
+            dict: {"table_id", "offset", "limit", "sort_key", "descending", "total_rows",
+                   "has_more", "rows"}.
+        """
+        offset = max(0, offset)
+        limit = min(limit if limit is not None else self.page_size, self.max_window)
+        total = self.total_rows(state)
+        rows = self.rows(offset, limit, sort_key, descending, state)
+        if total is not None:
+            has_more = offset + len(rows) < total
+        else:
+            has_more = len(rows) == limit
+        return {
+            "table_id": self.table_id,
+            "offset": offset,
+            "limit": limit,
+            "sort_key": sort_key,
+            "descending": bool(descending),
+            "total_rows": total,
+            "has_more": has_more,
+            "rows": rows,
+        }
+
+    def component(
+        self,
+        sort_key: Optional[str] = None,
+        descending: bool = False,
+        state: Any = None,
+        height: int = 400,
+    ) -> Dict[str, Any]:
+        """Return a `Content.VirtualTable` showing the first window of the table."""
+        window = self.window(0, self.page_size, sort_key, descending, state)
+        return Content.VirtualTable(
+            self.table_id,
+            self.columns,
+            total_rows=window["total_rows"],
+            page_size=self.page_size,
+            rows=window["rows"],
+            sort_key=sort_key,
+            descending=descending,
+            height=height,
+        )
+
+    def invalidate(self) -> None:
+        """Drop every cached row block and count, e.g. after the underlying data changed."""
+        with self.lock:
+            self.cache.clear()
+            self.counts.clear()
+
+
+def is_window_action(action_data: Any) -> bool:
+    """Return True if `action_data` is a `table_window` action."""
+    return isinstance(action_data, dict) and action_data.get("type") == "table_window"
+
+
+def parse_window_action(action_data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Return (table_id, keyword arguments of `DataTable.window`) of a `table_window` action.
+
+    Raises:
+        ValueError: If the offset or limit is not an integer.
+    """
+    limit = action_data.get("limit")
+    try:
+        offset = int(action_data.get("offset") or 0)
+        limit = int(limit) if limit is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("offset and limit must be integers")
+    return action_data.get("table_id"), {
+        "offset": offset,
+        "limit": limit,
+        "sort_key": action_data.get("sort_key"),
+        "descending": bool(action_data.get("descending", False)),
+    }
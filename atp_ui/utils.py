@@ -1,4 +1,199 @@
-from typing import Any, Dict, List, Optional, Union
+import json
+import threading
+from collections import OrderedDict
+from functools import wraps
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# --- Immutable Component Values ---
+
+class FrozenDict(dict):
+    """
+    Read-only, hashable dict used for component definitions and their props.
+
+    It is still a dict, so `json.dumps`, `atp_ui.diff` and the transport layer treat it
+    like any other mapping. Its hash and its JSON text (see `to_json`) are computed once
+    and cached on the instance.
+    """
+    _hash = None
+    _json = None
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("atp_ui components are immutable; use thaw() to get an editable copy")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __copy__(self) -> "FrozenDict":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenDict":
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(tuple):
+    """Read-only list of component values. Serializes to a JSON array and caches its JSON text."""
+    _json = None
+
+    def __copy__(self) -> "FrozenList":
+        return self
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FrozenList":
+        return self
+
+
+_SCALAR_ENCODERS = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    bool: lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+}
+
+# Exact-type encoders of immutable values; atp_ui.nodes registers its node classes here.
+_ENCODERS = dict(_SCALAR_ENCODERS)
+
+
+def freeze(value: Any) -> Any:
+    """Return `value` with every dict and list (recursively) replaced by its frozen counterpart."""
+    if type(value) in _ENCODERS or isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    # Scalars and nodes are checked inline, saving a call per leaf
+    if isinstance(value, dict):
+        return FrozenDict([
+            (key, item if type(item) in _ENCODERS else freeze(item)) for key, item in value.items()
+        ])
+    if isinstance(value, (list, tuple)):
+        return FrozenList([item if type(item) in _ENCODERS else freeze(item) for item in value])
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a plain, mutable deep copy of a (possibly frozen) component tree, nodes included."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is not None:
+        return thaw(to_dict())
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """`default=` hook for `json.dumps` that encodes `atp_ui.nodes` nodes as component dicts."""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def _json_key(key: Any) -> str:
+    # Non-string keys are converted the way json.dumps converts them.
+    return encode_basestring_ascii(key if isinstance(key, str) else json.dumps(key))
+
+
+def to_json(value: Any) -> str:
+    """
+    Serialize a UI tree (or any message containing one) to compact JSON.
+
+    Frozen subtrees and nodes are serialized once and their text is reused afterwards, so
+    re-sending a tree that shares most of its components with the previous render only
+    serializes the parts that changed. Lists of plain data go through the C encoder.
+    """
+    encode = _ENCODERS.get(type(value))
+    if encode is not None:
+        return encode(value)
+    if isinstance(value, (FrozenDict, FrozenList)):
+        text = value._json
+        if text is None:
+            text = value._json = _serialize(value)
+        return text
+    return _serialize(value)
+
+
+def _has_cached_json(value: Any) -> bool:
+    return isinstance(value, (FrozenDict, FrozenList)) or (
+        type(value) in _ENCODERS and type(value) not in _SCALAR_ENCODERS
+    )
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=json_default)
+
+
+def _serialize(value: Any) -> str:
+    if isinstance(value, dict):
+        return "{" + ",".join([
+            (encode_basestring_ascii(key) if type(key) is str else _json_key(key)) + ":" + to_json(item)
+            for key, item in value.items()
+        ]) + "}"
+    if isinstance(value, (list, tuple)):
+        if value and not _has_cached_json(value[0]):
+            # Plain data (e.g. table rows in a tool result): the C encoder is much faster
+            return _dumps(value)
+        return "[" + ",".join(map(to_json, value)) + "]"
+    encode = getattr(value, "to_json", None)  # atp_ui.nodes.Node
+    if encode is not None:
+        return encode()
+    return json.dumps(value)
+
+
+# --- Memoization ---
+
+def _memo_key(args: tuple, kwargs: Dict[str, Any]) -> Any:
+    items = sorted(kwargs.items()) if kwargs else ()
+    if all(type(value) in _SCALAR_ENCODERS for value in args) and all(
+        type(value) in _SCALAR_ENCODERS for _, value in items
+    ):
+        # Types are part of the key so that 1 and True stay distinct.
+        return (args, tuple(map(type, args)), tuple(items), tuple(type(value) for _, value in items))
+    return None
+
+
+def memoized_component(func: Optional[Callable[..., Any]] = None, maxsize: int = 256) -> Callable[..., Any]:
+    """
+    Cache the result of a pure component constructor called with scalar arguments
+    (str, int, bool, None); calls with any other argument bypass the cache, so building
+    a key never serializes anything. Meant for static configuration pieces such as
+    `Content.Reboot()` that every render recreates identically. Use it below `@staticmethod`:
+
+        @staticmethod
+        @memoized_component
+        def Reboot() -> Dict[str, Any]: ...
+    """
+    if func is None:
+        return lambda f: memoized_component(f, maxsize)
+
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = _memo_key(args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        result = func(*args, **kwargs)
+        with lock:
+            cache[key] = result
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
 
 # --- Utility Functions and Base Structure ---
 
@@ -11,9 +206,12 @@ def component_definition(
     Standard structure for component definitions sent to the frontend.
     The frontend layer (React/Vue/etc.) maps 'component_type' to a specific
     visual component and applies the 'props'.
+
+    The definition is an immutable `FrozenDict`; nothing is serialized until the tree is
+    sent, and `to_json` then caches the text on it. Use `thaw()` for an editable copy.
     """
-    return {
-        "category": category,
-        "component_type": component_type,
-        "props": props
-    }
\ No newline at end of file
+    return FrozenDict((
+        ("category", category),
+        ("component_type", component_type),
+        ("props", freeze(props)),
+    ))
@@ -1,3 +1,5 @@
+import inspect
+
 from django.shortcuts import render
 from django.http import JsonResponse, HttpResponseNotAllowed
 from django.views.decorators.csrf import csrf_exempt
@@ -44,6 +46,9 @@ class ToolView(View):
                 params = json.loads(request.body.decode())
             func = tool["function"]
             result = func(**params)
+            if inspect.isawaitable(result):
+                # async def tools run on the client's own event loop
+                result = client.run_coroutine(result)
             return JsonResponse({"result": result})
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
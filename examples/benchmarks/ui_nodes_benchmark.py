@@ -0,0 +1,74 @@
+"""
+Compare memory and serialization time of a 1,000-node atp_ui tree built from
+plain dicts, from the atp_ui constructors (FrozenDicts) and from nodes.
+
+    python examples/benchmarks/ui_nodes_benchmark.py
+"""
+
+import json
+import time
+import tracemalloc
+
+from atp_ui.components import Components
+from atp_ui.layouts import Layout
+from atp_ui.nodes import LayoutNode, NodeBuilder
+from atp_ui.utils import to_json
+
+ROWS = 1000
+REPEAT = 20
+
+
+def build_dicts():
+    rows = [
+        {"category": "Components", "component_type": "Alerts",
+         "props": {"message": f"Row {i}", "type": "info", "dismissible": False}}
+        for i in range(ROWS)
+    ]
+    return {"category": "Layout", "component_type": "Column",
+            "props": {"size": 12, "breakpoint": "default", "content": rows}}
+
+
+def build_components():
+    return Layout.Column(12, content=[Components.Alerts(f"Row {i}") for i in range(ROWS)])
+
+
+Alert = NodeBuilder("Components", "Alerts", "message", "type", "dismissible", type="info", dismissible=False)
+
+
+def build_nodes():
+    return LayoutNode("Column", size=12, breakpoint="default", content=[Alert(f"Row {i}") for i in range(ROWS)])
+
+
+def measure(name, build, serialize):
+    tracemalloc.start()
+    tree = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+
+    build_time = serialize_time = 0.0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        tree = build()
+        build_time += time.perf_counter() - start
+        start = time.perf_counter()
+        serialize(tree)
+        serialize_time += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        serialize(tree)  # the same, unchanged tree again
+    resend_time = time.perf_counter() - start
+
+    print(
+        f"{name:<24}{memory / 1024:>10.1f} KiB{build_time / REPEAT * 1000:>10.2f} ms"
+        f"{serialize_time / REPEAT * 1000:>10.2f} ms{resend_time / REPEAT * 1000:>10.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    print(f"{ROWS + 1} components, mean of {REPEAT} runs\n")
+    print(f"{'':<24}{'memory':>14}{'build':>13}{'serialize':>13}{'re-send':>13}")
+    measure("dicts + json.dumps", build_dicts, json.dumps)
+    measure("atp_ui constructors", build_components, to_json)
+    measure("nodes", build_nodes, to_json)
@@ -0,0 +1,127 @@
+"""
+Dict-backed stand-in for the subset of redis-py used by RedisSessionStore.
+"""
+
+import fnmatch
+import threading
+import time
+
+
+class WatchError(Exception):
+    """Raised by `execute()` when a watched key changed, like redis.exceptions.WatchError."""
+
+
+class FakeRedis:
+    """In-process Redis with expiry, SCAN and WATCH/MULTI/EXEC transactions."""
+
+    def __init__(self):
+        self.data = {}  # {key: (value, expires_at or None)}
+        self.versions = {}  # {key: number of writes}, checked by WATCH
+        self.lock = threading.RLock()
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            self._touch(key)
+            entry = None
+        return entry
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def get(self, key):
+        with self.lock:
+            entry = self._live(key)
+            return None if entry is None else entry[0]
+
+    def set(self, key, value, ex=None):
+        with self.lock:
+            if isinstance(value, str):
+                value = value.encode("utf-8")
+            self.data[key] = (value, time.monotonic() + ex if ex else None)
+            self._touch(key)
+            return True
+
+    def expire(self, key, seconds):
+        with self.lock:
+            entry = self._live(key)
+            if entry is None:
+                return False
+            self.data[key] = (entry[0], time.monotonic() + seconds)
+            return True
+
+    def delete(self, *keys):
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._live(key) is not None:
+                    del self.data[key]
+                    self._touch(key)
+                    removed += 1
+            return removed
+
+    def scan_iter(self, match="*"):
+        with self.lock:
+            keys = [key for key in list(self.data) if self._live(key) is not None]
+        return iter([key for key in keys if fnmatch.fnmatchcase(key, match)])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Pipeline: commands run immediately while watching, and are queued after `multi()`."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.watched = {}
+        self.queue = []
+        self.buffered = True
+        self.watching = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.reset()
+
+    def reset(self):
+        self.watched, self.queue, self.buffered, self.watching = {}, [], True, False
+
+    def watch(self, *keys):
+        with self.redis.lock:
+            for key in keys:
+                self.watched[key] = self.redis.versions.get(key, 0)
+        self.watching, self.buffered = True, False
+
+    def unwatch(self):
+        self.reset()
+
+    def multi(self):
+        self.buffered = True
+
+    def _command(self, name, *args, **kwargs):
+        if not self.buffered:
+            return getattr(self.redis, name)(*args, **kwargs)
+        self.queue.append((name, args, kwargs))
+        return self
+
+    def get(self, key):
+        return self._command("get", key)
+
+    def set(self, key, value, ex=None):
+        return self._command("set", key, value, ex=ex)
+
+    def delete(self, *keys):
+        return self._command("delete", *keys)
+
+    def execute(self):
+        with self.redis.lock:
+            try:
+                for key, version in self.watched.items():
+                    if self.redis.versions.get(key, 0) != version:
+                        raise WatchError(f"Watched key {key} changed")
+                return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.queue]
+            finally:
+                self.reset()
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from atp_sdk.async_clients import AsyncLLMClient
+
+
+class FakeWebSocket:
+    """Yields queued messages until `finish()`; stands in for aiohttp's ClientWebSocketResponse."""
+
+    close_code = 1000
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.closed = False
+
+    def finish(self):
+        self.messages.put_nowait(None)
+
+    async def close(self):
+        self.closed = True
+        self.finish()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.messages.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+def test_old_reader_only_fails_its_own_requests():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        client = AsyncLLMClient("key", protocol="wss")
+        auth = loop.create_future()
+        auth.set_result(True)
+
+        old_ws, old_pending = FakeWebSocket(), {"old": loop.create_future()}
+        reader = asyncio.ensure_future(client._read_loop(old_ws, old_pending, auth))
+        await asyncio.sleep(0)
+
+        # A new connection is up before the old reader gets to its cleanup
+        client.ws, client.authenticated = FakeWebSocket(), True
+        client._pending = {"new": loop.create_future()}
+        old_ws.finish()
+        await reader
+
+        assert old_pending == {}
+        assert client._pending["new"].done() is False
+        assert client.authenticated
+        await client.close()
+        assert client.ws is None and client.aio_session is None
+
+    asyncio.run(scenario())
+
+
+def test_inherits_llm_client_state():
+    client = AsyncLLMClient("key", protocol="wss", max_parallel_calls=3)
+    assert client.ws is None and client.ws_url.endswith("/llm-client/key/")
+    assert client.max_parallel_calls == 3
+    assert client.session is not None and client.lock is not None and client._http_executor is None
+
+
+def test_call_tool_total_timeout_and_parallel_limit():
+    async def scenario():
+        client = AsyncLLMClient("key", protocol="https", max_parallel_calls=2)
+        client._format_tool_calls = lambda calls, provider: calls
+        client._format_tool_results = lambda results, provider: results
+        running, peak = 0, 0
+
+        async def fake_http_request(endpoint, payload, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                await asyncio.sleep(0.05 if payload["request_id"].startswith("task_tk_0_") else 5)
+            finally:
+                running -= 1
+            return {"result": "ok"}
+
+        client._http_request = fake_http_request
+        calls = [{"function": "f", "parameters": {}, "tool_call_id": f"call_{i}"} for i in range(3)]
+        results = await client.call_tool("tk", calls, timeout=30, total_timeout=0.2)
+        await client.close()
+        return results, peak
+
+    results, peak = asyncio.run(scenario())
+    assert results[0] == {"tool_call_id": "call_0", "result": "ok"}
+    assert all("Timed out" in r["result"]["error"] for r in results[1:])
+    assert peak == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from atp_sdk.async_clients import AsyncToolKitClient
+
+
+def test_inbox_loop_survives_errors():
+    client = AsyncToolKitClient("key", "app", auto_restart=False, max_poll_interval=0, min_poll_interval=0)
+    handled = []
+    polls = iter([RuntimeError("boom"), [{"request_id": "r1"}]])
+
+    async def poll():
+        result = next(polls)
+        if isinstance(result, Exception):
+            raise result
+        client.running = False
+        return result
+
+    client._poll_inbox_async = poll
+    client._handle_inbox_request = handled.append
+    client.running = True
+    asyncio.run(client._poll_inbox_loop_async())
+    assert handled == [{"request_id": "r1"}]
+    client.executor.shutdown()
+
+
+def test_file_events_reach_the_loop_through_the_shared_watcher(tmp_path):
+    watched = tmp_path / "tool.py"
+    watched.write_text("x = 1\n")
+    client = AsyncToolKitClient("key", "app", auto_restart=True, reload_debounce=60)
+    client.file_watcher.poll_interval = 0.05
+    client.file_watcher.add_file(str(watched))
+    changes = []
+    client._on_code_change = lambda path: changes.append((path, asyncio.get_running_loop()))
+
+    async def scenario():
+        client.loop = asyncio.get_running_loop()
+        client.file_watcher.start()
+        try:
+            watched.write_text("x = 2  # changed\n")
+            for _ in range(100):
+                if changes:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await client.loop.run_in_executor(None, client.file_watcher.stop)
+        return client.loop
+
+    loop = asyncio.run(scenario())
+    assert changes == [(str(watched), loop)]
+    assert client.file_watcher.callback == client._on_file_event
+    client.executor.shutdown()
@@ -0,0 +1,125 @@
+from atp_sdk.clients import ToolKitClient
+
+
+def make_client():
+    client = ToolKitClient("key", "app", auto_restart=False, deferred_registration=True)
+
+    @client.register_tool(function_name="slow", params=[], required_params=[], description="Slow",
+                          auth_provider=None, auth_type=None, auth_with=None,
+                          max_concurrency=1, max_queue=1, queue_timeout=5)
+    def slow():
+        return "done"
+
+    return client
+
+
+def test_stop_ends_queue_reaper():
+    client = make_client()
+    reaper = client._reaper_thread
+    assert reaper.is_alive()
+    client.stop()
+    assert not reaper.is_alive()
+
+    client._resume_queue_reaper()
+    assert client._reaper_thread is not reaper and client._reaper_thread.is_alive()
+    client.stop()
+
+
+def test_stop_shuts_down_own_executor_and_start_recreates_it():
+    client = make_client()
+    executor = client.executor
+    client.stop()
+    assert executor._shutdown
+    client._ensure_executor()
+    assert client.executor is not executor
+    assert client.app_scheduler.executor is client.executor
+    assert client.executor.submit(lambda: 42).result() == 42
+    client.stop()
+
+
+def test_stop_leaves_custom_executor_running():
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    client = ToolKitClient("key", "app", auto_restart=False, executor=executor)
+    client.stop()
+    assert executor.submit(lambda: 1).result() == 1
+    executor.shutdown()
+
+
+def test_bulk_registration_counts_only_accepted_tools():
+    client = make_client()
+
+    @client.register_tool(function_name="fast", params=[], required_params=[], description="Fast",
+                          auth_provider=None, auth_type=None, auth_with=None)
+    def fast():
+        return "done"
+
+    class Session:
+        def post(self, url, json=None, timeout=None):
+            tokens = {"slow": "t1", "unrelated": "t2"}  # "fast" rejected
+            return type("Response", (), {"status_code": 200, "json": lambda self: {"exchange_tokens": tokens}})()
+
+    client.session = Session()
+    assert client._register_bulk_with_server(["slow", "fast"], "hash") == 1
+    assert client._acknowledged_hashes == {"slow": client.registered_tools["slow"]["code_hash"]}
+    client.stop()
+
+
+def test_async_app_functions_are_awaited():
+    client = ToolKitClient("key", "app", auto_restart=False, deferred_registration=True)
+
+    @client.register_tool(function_name="counter", params=[], required_params=[], description="Counter",
+                          auth_provider=None, auth_type=None, auth_with=None)
+    async def counter(action, action_data=None, current_state=None, auth_token=None):
+        count = (current_state or {}).get("count", 0) + (1 if action == "user_action" else 0)
+        return {"ui_content": {"count": count}, "app_state": {"count": count}}
+
+    responses = []
+    respond = lambda request_id, result: responses.append(result)
+    client._start_app_session("s", "counter", {}, None, respond)
+    client._handle_app_action("s", {"type": "click"}, respond)
+    assert responses == [{"count": 0}, {"count": 1}]
+    assert client.active_app_sessions.get("s")["state"] == {"count": 1}
+    client.stop()
+    client.loop.call_soon_threadsafe(client.loop.stop)
+
+
+def test_inbox_polls_are_not_retried_after_the_request_was_sent():
+    client = ToolKitClient("key", "app", auto_restart=False, deferred_registration=True,
+                           base_url="https://atp.example.com")
+    inbox = client.session.get_adapter("https://atp.example.com/api/v1/toolkit/key/inbox?limit=10")
+    assert inbox.max_retries.total == 3 and inbox.max_retries.connect is None
+    assert inbox.max_retries.read == 0 and inbox.max_retries.status == 0
+    other = client.session.get_adapter("https://atp.example.com/api/v1/register_toolkit/")
+    assert other.max_retries.read is None and other.max_retries.status is None
+    client.stop()
+
+
+def test_stop_ends_websocket_loop(monkeypatch):
+    import threading
+    import time
+
+    import atp_sdk.clients as clients
+
+    class FakeWebSocketApp:
+        def __init__(self, url, **callbacks):
+            self.closed = threading.Event()
+
+        def run_forever(self, **kwargs):
+            self.closed.wait()
+
+        def close(self):
+            self.closed.set()
+
+    monkeypatch.setattr(clients.websocket, "WebSocketApp", FakeWebSocketApp)
+    client = ToolKitClient("key", "app", protocol="ws", auto_restart=False, deferred_registration=True)
+    client.running = True
+    client.ws_thread = threading.Thread(target=client._run_ws_loop, daemon=True)
+    client.ws_thread.start()
+    while client.ws is None:
+        time.sleep(0.01)
+    executor = client.executor
+    client.stop()
+    assert not client.ws_thread.is_alive()
+    assert executor._shutdown
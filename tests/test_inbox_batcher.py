@@ -0,0 +1,32 @@
+import time
+
+from atp_sdk.clients import InboxResponseBatcher
+
+
+def test_batches_until_max_delay():
+    sent = []
+    batcher = InboxResponseBatcher(sent.append, max_batch=10, max_delay=0.05)
+    batcher.add("a", 1)
+    batcher.add("b", 2)
+    time.sleep(0.2)
+    assert sent == [[{"request_id": "a", "response": 1}, {"request_id": "b", "response": 2}]]
+    batcher.close()
+
+
+def test_close_flushes_and_ends_flush_thread():
+    sent = []
+    batcher = InboxResponseBatcher(sent.append, max_batch=10, max_delay=60)
+    batcher.add("a", 1)
+    thread = batcher.thread
+    batcher.close()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+    assert sent == [[{"request_id": "a", "response": 1}]]
+
+    batcher.add("b", 2)  # sent right away once closed
+    assert sent[-1] == [{"request_id": "b", "response": 2}]
+    batcher.open()
+    batcher.add("c", 3)
+    assert batcher.pending == [{"request_id": "c", "response": 3}]
+    batcher.close()
+    assert sent[-1] == [{"request_id": "c", "response": 3}]
@@ -0,0 +1,57 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from atp_sdk.clients import LLMClient, WebSocketException
+
+
+class RecordingSession:
+    def __init__(self):
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: {"result": "ok"})
+
+
+def test_http_fan_out_passes_timeout():
+    session = RecordingSession()
+    client = LLMClient("key", protocol="https", session=session)
+    calls = [
+        {"function": f"tool_{i}", "parameters": {}, "tool_call_id": f"call_{i}"} for i in range(3)
+    ]
+    results = client._call_tool_http("toolkit", calls, "openai", None, "", timeout=7)
+    assert [r["tool_call_id"] for r in results] == ["call_0", "call_1", "call_2"]
+    assert [r["result"] for r in results] == ["ok"] * 3
+    assert [call["timeout"] for call in session.calls] == [7, 7, 7]
+
+
+def test_late_close_of_replaced_socket_keeps_current_connection():
+    client = LLMClient("key", protocol="https", session=RecordingSession())
+    old_ws, new_ws = object(), object()
+    old_future, new_future = Future(), Future()
+    client.ws, client.authenticated = new_ws, True
+    client._pending = {old_ws: {"old": old_future}, new_ws: {"new": new_future}}
+
+    client._on_close(old_ws, 1006, "gone")
+
+    assert client.ws is new_ws and client.authenticated
+    assert isinstance(old_future.exception(timeout=0), WebSocketException)
+    assert not new_future.done()
+    assert client._pending == {new_ws: {"new": new_future}}
+
+    client._on_error(new_ws, OSError("reset"))
+    assert client.ws is None and not client.authenticated
+    assert isinstance(new_future.exception(timeout=0), WebSocketException)
+
+
+def test_close_shuts_down_fan_out_pool_and_own_session():
+    with LLMClient("key", protocol="https", max_parallel_calls=2) as client:
+        executor = client._get_http_executor()
+        session = client.session
+        session.close = lambda: setattr(session, "closed", True)
+    assert executor._shutdown and client._http_executor is None
+    assert session.closed
+
+    custom = RecordingSession()
+    LLMClient("key", protocol="https", session=custom).close()
+    assert not hasattr(custom, "closed")
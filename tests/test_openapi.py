@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+from atp_sdk.openapi import OpenAPIOperation, OpenAPIToolkit
+
+
+class RecordingSession:
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return SimpleNamespace(status_code=200, reason="OK", json=lambda: {"ok": True}, text="")
+
+
+class RecordingClient:
+    deferred_registration = True
+    registration_cache = None
+
+    def __init__(self):
+        self.tools = {}
+
+    def add_tool(self, function_name, func, params, required, description, *auth, **kwargs):
+        self.tools[function_name] = dict(kwargs, func=func, params=params, required=required)
+
+
+SPEC = {
+    "servers": [{"url": "https://api.example.com"}],
+    "paths": {
+        "/repos/{owner}": {
+            "parameters": [{"name": "owner", "in": "path"}],
+            "get": {"operationId": "getRepo", "parameters": [{"name": "q", "in": "query"}]},
+        }
+    },
+}
+
+
+def test_path_parameters_are_quoted():
+    session = RecordingSession()
+    toolkit = SimpleNamespace(base_url="https://api.example.com", session=session, timeout=5,
+                              auth_header=None, auth_scheme=None,
+                              _locations=lambda method, path: {"owner": "path", "repo": "path", "q": "query"})
+    operation = OpenAPIOperation(toolkit, "get", "/repos/{owner}/{repo}")
+    assert operation(owner="../admin", repo="a b?x=1#y", q="v") == {"ok": True}
+    method, url, kwargs = session.calls[0]
+    assert method == "GET"
+    assert url == "https://api.example.com/repos/..%2Fadmin/a%20b%3Fx%3D1%23y"
+    assert kwargs["params"] == {"q": "v"}
+
+
+def test_register_creates_lazy_stubs():
+    client, session = RecordingClient(), RecordingSession()
+    toolkit = OpenAPIToolkit(client, SPEC, session=session)
+    toolkit.register()
+
+    tool = client.tools["getRepo"]
+    assert tool["params"] == ["owner", "q"] and tool["required"] == ["owner"]
+    assert callable(tool["source_code"]) and '"path":"/repos/{owner}"' in tool["source_code"]()
+    assert tool["func"]._locations is None
+
+    tool["func"](owner="me", q="x")
+    assert tool["func"]._locations == {"owner": "path", "q": "query"}
+    assert session.calls[0][1] == "https://api.example.com/repos/me"
@@ -0,0 +1,59 @@
+from atp_sdk.cache import RegistrationCache
+from atp_sdk.clients import ToolKitClient
+
+
+class RecordingSession:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, **kwargs):
+        self.posts.append((url, kwargs))
+        return type("Response", (), {"status_code": 200, "text": ""})()
+
+
+def test_round_trip_and_discard_token(tmp_path):
+    cache = RegistrationCache(tmp_path / "registrations.json")
+    cache.save("key", "app", "hash", {"a": "h1", "b": "h2"}, {"a": "ta", "b": "tb"})
+    assert cache.load("key", "app") == {
+        "toolkit_hash": "hash",
+        "tool_hashes": {"a": "h1", "b": "h2"},
+        "exchange_tokens": {"a": "ta", "b": "tb"},
+    }
+    assert cache.load("key", "other") is None
+    assert "key" not in (tmp_path / "registrations.json").read_text()
+
+    cache.discard_token("key", "app", "a", "ta")
+    cache.discard_token("key", "app", "b", "stale")  # not the cached token: ignored
+    assert cache.load("key", "app")["exchange_tokens"] == {"b": "tb"}
+    cache.flush()
+    assert RegistrationCache(tmp_path / "registrations.json").load("key", "app")["exchange_tokens"] == {"b": "tb"}
+
+
+def test_used_tokens_are_written_in_one_batch(tmp_path, monkeypatch):
+    cache = RegistrationCache(tmp_path / "registrations.json", flush_delay=60)
+    cache.save("key", "app", "hash", {"a": "h1", "b": "h2"}, {"a": "ta", "b": "tb"})
+    writes = []
+    original_write = cache._write
+    monkeypatch.setattr(cache, "_write", lambda data: (writes.append(data), original_write(data)))
+
+    cache.discard_token("key", "app", "a", "ta")
+    cache.discard_token("key", "app", "b", "tb")
+    cache.discard_token("key", "app", "c", "tc")  # never cached
+    assert writes == []
+    cache.flush()
+    cache.flush()
+    assert len(writes) == 1
+    assert RegistrationCache(tmp_path / "registrations.json").load("key", "app")["exchange_tokens"] == {}
+
+
+def test_report_execution_evicts_consumed_token(tmp_path):
+    cache = RegistrationCache(tmp_path / "registrations.json")
+    cache.save("key", "app", "hash", {"a": "h1"}, {"a": "ta"})
+    session = RecordingSession()
+    client = ToolKitClient("key", "app", auto_restart=False, session=session, registration_cache=cache)
+    client.exchange_tokens["a"] = "ta"
+
+    client._report_execution("a", {"ok": True})
+    assert session.posts[0][1]["json"]["exchange_token"] == "ta"
+    client.stop()
+    assert RegistrationCache(tmp_path / "registrations.json").load("key", "app")["exchange_tokens"] == {}
@@ -0,0 +1,43 @@
+import importlib
+import sys
+
+from atp_sdk.clients import ToolKitClient
+
+MODULE = '''
+from atp_sdk.clients import ToolKitClient
+
+client = ToolKitClient("key", "app", auto_restart=False, deferred_registration=True)
+
+@client.register_tool(function_name="greet", params=["name"], required_params=["name"],
+                      description="Greets", auth_provider=None, auth_type=None, auth_with=None)
+def greet(name):
+    return "{greeting} " + name
+'''
+
+
+def test_reloaded_module_reuses_running_client(tmp_path, monkeypatch):
+    module_file = tmp_path / "reload_tools.py"
+    module_file.write_text(MODULE.replace("{greeting}", "Hello"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("reload_tools")
+    try:
+        client = module.client
+        monkeypatch.setattr(client, "register_toolkit", lambda: True)
+        executor = client.executor
+
+        module_file.write_text(MODULE.replace("{greeting}", "Hi") + "\n")
+        importlib.invalidate_caches()
+        assert client.reload_modules([module])
+
+        assert module.client is client
+        assert client.executor is executor
+        assert client.registered_tools["greet"]["function"]("Ada") == "Hi Ada"
+    finally:
+        sys.modules.pop("reload_tools", None)
+        module.client.executor.shutdown(wait=False)
+
+
+def test_client_outside_reload_is_new():
+    first = ToolKitClient("key", "app", auto_restart=False)
+    second = ToolKitClient("key", "app", auto_restart=False)
+    assert first is not second
@@ -0,0 +1,168 @@
+import time
+
+import pytest
+
+from atp_sdk.sessions import (
+    CachedSessionStore,
+    InMemorySessionStore,
+    RedisSessionStore,
+    SQLiteSessionStore,
+)
+from fake_redis import FakeRedis
+
+
+def session(n=0):
+    return {"tool_name": "app", "state": {"n": n}, "auth_token": None}
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis", "cached"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionStore(max_entries=100, ttl=60)
+    if request.param == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60)
+    if request.param == "redis":
+        return RedisSessionStore(client=FakeRedis(), ttl=60)
+    return CachedSessionStore(SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl=60), local_ttl=60)
+
+
+def test_store_round_trip(store):
+    store.put("a", session(1))
+    assert store.get("a") == session(1)
+    assert "a" in store and "b" not in store
+    assert store.update_state("a", {"n": 2})
+    assert store.get("a")["state"] == {"n": 2}
+    assert not store.update_state("b", {"n": 3})
+    assert len(store) == 1
+    assert store.pop("a") == session(2)
+    assert store.pop("a") is None
+    assert len(store) == 0
+
+
+def test_in_memory_evicts_least_recently_used():
+    evicted = []
+    store = InMemorySessionStore(max_entries=2, ttl=None, on_evict=lambda *args: evicted.append(args))
+    store.put("a", session())
+    store.put("b", session())
+    store.get("a")
+    store.put("c", session())
+    assert [(sid, reason) for sid, _, reason in evicted] == [("b", "capacity")]
+    assert "a" in store and "c" in store
+
+
+def test_in_memory_expires_idle_sessions():
+    evicted = []
+    store = InMemorySessionStore(ttl=0.05, on_evict=lambda *args: evicted.append(args))
+    store.put("a", session())
+    time.sleep(0.1)
+    assert store.evict_expired() == 1
+    assert evicted[0][0] == "a" and evicted[0][2] == "expired"
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    first.put("a", session(1))
+    assert second.update_state("a", {"n": 5})
+    assert first.get("a")["state"] == {"n": 5}
+
+
+def test_cached_store_sees_other_replicas_despite_constant_reads(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    replica_a = CachedSessionStore(SQLiteSessionStore(path), local_ttl=0.2)
+    replica_b = CachedSessionStore(SQLiteSessionStore(path), local_ttl=0.2)
+    replica_a.put("s", session(0))
+    assert replica_b.update_state("s", {"n": 99})
+
+    deadline = time.monotonic() + 0.8
+    while time.monotonic() < deadline:  # keep the cached copy hot
+        state = replica_a.get("s")["state"]
+        time.sleep(0.02)
+    assert state == {"n": 99}
+
+
+def test_cached_store_update_state_keeps_copy_age(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    replica_a = CachedSessionStore(SQLiteSessionStore(path), local_ttl=0.2)
+    replica_b = CachedSessionStore(SQLiteSessionStore(path), local_ttl=0.2)
+    replica_a.put("s", session(0))
+    time.sleep(0.1)
+    replica_a.update_state("s", {"n": 1})
+    replica_b.update_state("s", {"n": 2})
+    assert replica_a.get("s")["state"] == {"n": 1}  # still within local_ttl of the fetch
+    time.sleep(0.15)
+    assert replica_a.get("s")["state"] == {"n": 2}
+
+
+def test_cached_store_len_with_redis_backend():
+    store = CachedSessionStore(RedisSessionStore(client=FakeRedis()))
+    store.put("a", session())
+    store.put("b", session())
+    assert len(store) == 2
+
+
+def test_redis_update_state_keeps_concurrent_writes():
+    redis = FakeRedis()
+    store = RedisSessionStore(client=redis)
+    store.put("s", session(0))
+    original_pipeline = redis.pipeline
+    interfered = []
+
+    def pipeline(transaction=True):
+        pipe = original_pipeline(transaction)
+        original_multi = pipe.multi
+
+        def multi():
+            if not interfered:  # another replica writes between WATCH and EXEC once
+                interfered.append(True)
+                redis.set("atp:session:s", '{"tool_name": "app", "state": {"n": 7}, "auth_token": "new"}')
+            original_multi()
+
+        pipe.multi = multi
+        return pipe
+
+    redis.pipeline = pipeline
+    assert store.update_state("s", {"n": 8})
+    assert store.get("s") == {"tool_name": "app", "state": {"n": 8}, "auth_token": "new"}
+    assert interfered
+
+
+def test_auth_token_is_never_stored_in_plaintext(tmp_path):
+    redis = FakeRedis()
+    plain = RedisSessionStore(client=redis, prefix="plain:")
+    plain.put("a", dict(session(), auth_token="secret"))
+    assert b"secret" not in redis.get("plain:a")
+    assert plain.get("a")["auth_token"] is None
+
+    sqlite = SQLiteSessionStore(str(tmp_path / "sessions.db"), encrypt_token=lambda t: t[::-1],
+                                decrypt_token=lambda t: t[::-1])
+    sqlite.put("a", dict(session(), auth_token="secret"))
+    assert "secret" not in sqlite.conn.execute("SELECT data FROM atp_app_sessions").fetchone()[0]
+    assert sqlite.update_state("a", {"n": 1})
+    assert sqlite.get("a")["auth_token"] == "secret"
+
+    cached = CachedSessionStore(RedisSessionStore(client=FakeRedis()))
+    cached.put("a", dict(session(), auth_token="secret"))
+    assert cached.get("a")["auth_token"] is None  # same answer before and after local_ttl
+
+
+def test_sqlite_replicas_evict_each_session_once(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    evicted = []
+    replicas = [SQLiteSessionStore(path, ttl=0.05, on_evict=lambda *args: evicted.append(args))
+                for _ in range(2)]
+    replicas[0].put("a", session())
+    time.sleep(0.1)
+    assert sum(replica.evict_expired() for replica in replicas) == 1
+    assert [e[0] for e in evicted] == ["a"]
+
+
+def test_cached_reads_renew_backend_expiry():
+    backend = InMemorySessionStore(ttl=0.2)
+    store = CachedSessionStore(backend, local_ttl=60)
+    store.put("s", session())
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:  # only ever served from the local copy
+        assert store.get("s") is not None
+        time.sleep(0.02)
+    assert backend.evict_expired() == 0 and "s" in backend
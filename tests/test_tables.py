@@ -0,0 +1,51 @@
+import threading
+
+from atp_ui.tables import DataTable, parse_window_action
+
+ROWS = list(range(237))
+
+
+def make_table(**kwargs):
+    fetches = []
+
+    def fetch(offset, limit, sort_key, descending, state):
+        fetches.append((offset, limit))
+        rows = sorted(ROWS, reverse=descending)
+        return rows[offset:offset + limit]
+
+    return DataTable("t", fetch, count=lambda state: len(ROWS), page_size=10, **kwargs), fetches
+
+
+def test_rows_assembles_windows_across_blocks():
+    table, fetches = make_table()
+    assert table.rows(15, 20) == list(range(15, 35))
+    assert fetches == [(10, 30)]  # blocks 1-3 in one call
+
+    assert table.rows(5, 40) == list(range(5, 45))
+    assert fetches == [(10, 30), (0, 10), (40, 10)]  # only the blocks not cached yet
+
+    assert table.rows(230, 50) == list(range(230, 237))
+    assert table.rows(20, 5, descending=True) == list(range(216, 211, -1))
+
+
+def test_window_reports_total_and_has_more():
+    table, _ = make_table()
+    window = table.window(**parse_window_action({"type": "table_window", "table_id": "t", "offset": "230", "limit": 10})[1])
+    assert window["rows"] == list(range(230, 237))
+    assert window["total_rows"] == 237 and window["has_more"] is False
+
+
+def test_state_is_not_part_of_the_cache_key_by_default():
+    table, fetches = make_table()
+    lock = threading.Lock()  # not JSON serializable
+    table.rows(0, 10, state={"lock": lock})
+    table.rows(0, 10, state={"lock": lock, "other": 1})
+    assert fetches == [(0, 10)]
+
+
+def test_cache_key_separates_states():
+    table, fetches = make_table(cache_key=lambda state: state["query"])
+    table.rows(0, 10, state={"query": "a", "lock": threading.Lock()})
+    table.rows(0, 10, state={"query": "b"})
+    table.rows(0, 10, state={"query": "a"})
+    assert fetches == [(0, 10), (0, 10)]
@@ -0,0 +1,66 @@
+from atp_sdk.clients import ToolkitHasher
+
+
+def build(tools):
+    hasher = ToolkitHasher()
+    for name, code_hash in tools:
+        hasher.update(name, code_hash)
+    return hasher
+
+
+def test_hash_is_order_independent():
+    tools = [("a", "h1"), ("b", "h2"), ("c", "h3")]
+    assert build(tools).hexdigest() == build(reversed(tools)).hexdigest()
+
+
+def test_update_and_remove_match_a_fresh_build():
+    hasher = build([("a", "h1"), ("b", "h2"), ("c", "h3")])
+    hasher.update("b", "h2-changed")
+    hasher.remove("c")
+    hasher.remove("missing")
+    assert hasher.hexdigest() == build([("a", "h1"), ("b", "h2-changed")]).hexdigest()
+
+
+def test_hash_depends_on_names_hashes_and_count():
+    base = build([("a", "h1")]).hexdigest()
+    assert build([("a", "h2")]).hexdigest() != base
+    assert build([("b", "h1")]).hexdigest() != base
+    assert build([]).hexdigest() != build([("a", "h1"), ("a", "h1")]).hexdigest()
+    assert build([("a", "h1"), ("a", "h1")]).hexdigest() == base  # update replaces
+
+
+def test_tree_matches_a_fresh_build_after_random_changes():
+    import random
+
+    rng = random.Random(7)
+    hasher, tools = ToolkitHasher(), {}
+    for step in range(600):
+        name = f"tool_{rng.randrange(80)}"
+        if name in tools and rng.random() < 0.4:
+            hasher.remove(name)
+            del tools[name]
+        else:
+            tools[name] = f"h{step}"
+            hasher.update(name, tools[name])
+    assert hasher.count == len(tools)
+    assert hasher.hexdigest() == build(sorted(tools.items())).hexdigest()
+
+
+def test_client_keeps_the_legacy_toolkit_hash_by_default():
+    import hashlib
+
+    from atp_sdk.clients import ToolKitClient
+
+    sources = {"b": "def b(): pass\n", "a": "def a(): pass\n"}
+    legacy = hashlib.sha256("".join(sources[name] for name in sorted(sources)).encode("utf-8")).hexdigest()
+    for scheme, expected in (("legacy", legacy), ("merkle", None)):
+        client = ToolKitClient("key", "app", auto_restart=False, deferred_registration=True,
+                               toolkit_hash_scheme=scheme)
+        for name, source in sources.items():
+            client.add_tool(name, lambda: None, [], [], name, None, None, None,
+                            source_code=source, defer_registration=True)
+        if expected is None:
+            expected = client._toolkit_hasher.hexdigest()
+            assert expected != legacy
+        assert client._compute_toolkit_hash() == expected
+        client.stop()
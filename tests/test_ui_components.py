@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from atp_ui.components import Components
+from atp_ui.contents import Content
+from atp_ui.layouts import Layout
+from atp_ui.nodes import from_definition
+from atp_ui.utils import FrozenDict, component_definition, memoized_component, thaw, to_json
+
+
+def test_component_definition_is_frozen_and_serialized_lazily():
+    component = component_definition("Content", "Typography", {"text": "hi", "tags": ["a"]})
+    assert isinstance(component, FrozenDict) and component._json is None
+    with pytest.raises(TypeError):
+        component["props"]["text"] = "changed"
+    editable = thaw(component)
+    editable["props"]["text"] = "changed"
+    assert component["props"]["text"] == "hi"
+
+    text = to_json(component)
+    assert component._json is text
+    assert json.loads(text) == thaw(component)
+
+
+def test_static_constructors_are_memoized():
+    assert Content.Reboot() is Content.Reboot()
+    assert Layout.Grid(12) is Layout.Grid(12)
+    assert Layout.Grid(1) is not Layout.Grid(True)
+    assert Layout.ZIndex({"modal": 10}) is not Layout.ZIndex({"modal": 10})  # non-scalar: not cached
+
+
+def test_memoized_component_bypasses_non_scalar_arguments():
+    calls = []
+
+    @memoized_component
+    def card(title, items=None):
+        calls.append(title)
+        return component_definition("Components", "Card", {"title": title, "items": items or []})
+
+    assert card("a") is card("a")
+    card("a", items=[1])
+    card("a", items=[1])
+    assert calls == ["a", "a", "a"]
+
+
+def test_to_json_matches_json_dumps():
+    ui = Layout.Column(12, content=[Components.Alerts(f"Row {i}") for i in range(3)])
+    payload = {
+        "request_id": "r",
+        "response": {
+            "ui_content": ui,
+            "nodes": from_definition(ui),
+            "rows": [{"id": 1, "v": 1.5, "name": "é"}, [1, None, True]],
+            "app_state": {1: "int key", "nested": {"x": [ui]}},
+        },
+    }
+    expected = json.dumps(thaw(payload), separators=(",", ":"))
+    assert to_json(payload) == expected
@@ -0,0 +1,56 @@
+import json
+
+from atp_ui.diff import UIDeltaEncoder, apply_patch, diff
+from atp_ui.nodes import from_definition
+from atp_ui.utils import thaw
+
+
+def component(component_type, **props):
+    return {"category": "Components", "component_type": component_type, "props": props}
+
+
+def tree(title="Orders", items=("a", "b"), extra=None):
+    props = {"title": title, "items": [component("Item", label=label) for label in items]}
+    if extra:
+        props["extra"] = extra
+    return component("Card", **props)
+
+
+def round_trip(old, new):
+    patch = diff(old, new)
+    assert json.loads(json.dumps(apply_patch(old, patch), default=thaw)) == json.loads(json.dumps(thaw(new)))
+    return patch
+
+
+def test_equal_trees_have_empty_diff():
+    assert diff(tree(), tree()) == []
+
+
+def test_round_trips():
+    assert round_trip(tree(), tree(title="Shipped")) == [
+        {"op": "replace", "path": "/props/title", "value": "Shipped"}
+    ]
+    assert len(round_trip(tree(), tree(items=("a", "b", "c")))) == 1
+    assert len(round_trip(tree(items=("a", "b", "c")), tree(items=("a",)))) == 2
+    round_trip(tree(), tree(extra={"note": "a/b~c"}))
+    round_trip(tree(extra={"note": "x"}), tree())
+    round_trip(tree(), [tree(), "swapped"])
+
+
+def test_nodes_and_dicts_compare_by_content():
+    dict_tree = tree()
+    assert diff(dict_tree, from_definition(dict_tree)) == []
+    assert diff(from_definition(dict_tree), dict_tree) == []
+    assert round_trip(dict_tree, from_definition(tree(title="Shipped"))) == [
+        {"op": "replace", "path": "/props/title", "value": "Shipped"}
+    ]
+    assert len(round_trip(from_definition(dict_tree), tree(items=("a", "z")))) == 1
+
+
+def test_delta_encoder_sends_snapshot_then_patches():
+    encoder = UIDeltaEncoder(resync_every=2)
+    base = {"layout": [tree(items=tuple("abcdefghij"))]}
+    assert "ui_snapshot" in encoder.encode("s", base)
+    message = encoder.encode("s", {"layout": [tree(title="New", items=tuple("abcdefghij"))]})
+    assert message["ui_base_version"] == 1 and message["ui_version"] == 2
+    assert message["ui_patch"] == [{"op": "replace", "path": "/layout/0/props/title", "value": "New"}]